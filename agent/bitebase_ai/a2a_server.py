@@ -12,6 +12,7 @@ import asyncio
 import logging
 from .agent import create_agent
 from .state import AgentState
+from .core.streaming import WebSocketWatcher, ClientDisconnected, get_cancellation_stats
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -225,6 +226,9 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     
     # Store the connection
     active_connections[session_id] = websocket
+
+    # Receives in the background so a disconnect cancels the running agent
+    watcher = WebSocketWatcher(websocket)
     
     try:
         # Initialize agent state if it doesn't exist
@@ -245,7 +249,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         # Main WebSocket loop
         while True:
             # Wait for a message
-            data = await websocket.receive_text()
+            data = await watcher.receive_text()
             message_data = json.loads(data)
             
             # Get current state
@@ -258,7 +262,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             })
             
             # Invoke the agent
-            result = agent.invoke(state)
+            result = await watcher.run(agent.ainvoke(state), source="ws_agent")
             
             # Update the state
             agent_states[session_id] = result
@@ -279,7 +283,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 })
                 
                 # Wait for tool result
-                tool_result_data = await websocket.receive_text()
+                tool_result_data = await watcher.receive_text()
                 tool_result = json.loads(tool_result_data)
                 
                 # Add tool message
@@ -291,7 +295,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 })
                 
                 # Invoke agent again
-                result = agent.invoke(state)
+                result = await watcher.run(agent.ainvoke(state), source="ws_agent")
                 agent_states[session_id] = result
                 
                 # Extract AI response
@@ -304,13 +308,15 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 "research_data": result.get("research_data", {})
             })
             
-    except WebSocketDisconnect:
+    except (WebSocketDisconnect, ClientDisconnected):
         # Clean up the connection
         if session_id in active_connections:
             del active_connections[session_id]
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         await websocket.close(code=1011, reason=str(e))
+    finally:
+        watcher.close()
 
 @app.get("/api/sessions/{session_id}/data", response_model=Dict[str, Any])
 async def get_session_data(session_id: str):
@@ -327,7 +333,11 @@ async def get_session_data(session_id: str):
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "active_sessions": len(agent_states)}
+    return {
+        "status": "healthy",
+        "active_sessions": len(agent_states),
+        "cancellations": get_cancellation_stats()
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -18,6 +18,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from ..core.llm_client import LLMClient
+from ..core.geo import haversine_distance, distances_from_point
 
 # Import geodesic distance calculation if available
 GEODESIC_AVAILABLE = False
@@ -57,24 +58,7 @@ def calculate_distance(coord1, coord2):
         return geodesic(coord1, coord2).kilometers
     
     # Simple approximation using the Haversine formula
-    import math
-    lat1, lon1 = coord1
-    lat2, lon2 = coord2
-    
-    # Convert latitude and longitude from degrees to radians
-    lat1 = math.radians(lat1)
-    lon1 = math.radians(lon1)
-    lat2 = math.radians(lat2)
-    lon2 = math.radians(lon2)
-    
-    # Haversine formula
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    r = 6371  # Radius of Earth in kilometers
-    
-    return c * r
+    return haversine_distance(coord1[0], coord1[1], coord2[0], coord2[1])
 
 class LocationIntelligenceAgent:
     """Agent for geospatial analysis and location-based insights."""
@@ -430,14 +414,10 @@ class LocationIntelligenceAgent:
             # Generate mock competitor data
             competitors = self._generate_mock_competitors(latitude, longitude, radius_km)
         
-        # Calculate distances to each competitor
-        for competitor in competitors:
-            if "latitude" in competitor and "longitude" in competitor:
-                competitor_coords = (competitor["latitude"], competitor["longitude"])
-                center_coords = (latitude, longitude)
-                competitor["distance_km"] = round(calculate_distance(center_coords, competitor_coords), 2)
-            else:
-                competitor["distance_km"] = None
+        # Calculate distances to all competitors in one batch
+        distances = distances_from_point(latitude, longitude, competitors)
+        for competitor, distance in zip(competitors, distances):
+            competitor["distance_km"] = None if np.isnan(distance) else round(float(distance), 2)
         
         # Count competitors by cuisine type
         cuisine_counts = {}
@@ -9,11 +9,14 @@ import os
 import json
 import logging
 import math
+import numpy as np
 from typing import Dict, List, Any, Optional, Union, Tuple
 from datetime import datetime
 
 from ..core.agent_framework import BaseAgent, AgentMetrics
 from ..core.data_processor import RestaurantDataCleaner, RestaurantMatcher
+from ..core.geo import haversine_distance, distances_from_point
+from ..core.agent_registry import get_agent
 from .restaurant_data_agent import RestaurantDataAgent
 
 # Import AIQToolkit components if available
@@ -31,7 +34,6 @@ logger = logging.getLogger("RestaurantAnalysisAgent")
 
 try:
     import pandas as pd
-    import numpy as np
     from sklearn.cluster import DBSCAN
     ADVANCED_ANALYSIS_AVAILABLE = True
 except ImportError:
@@ -54,8 +56,8 @@ class RestaurantAnalysisAgent(BaseAgent):
         """
         super().__init__(config_path, "RestaurantAnalysisAgent")
 
-        # Initialize data agent for fetching restaurant data
-        self.data_agent = RestaurantDataAgent(config_path)
+        # Shared data agent for fetching restaurant data
+        self.data_agent = get_agent(RestaurantDataAgent, config_path)
 
         # Initialize data processor components
         self.cleaner = RestaurantDataCleaner()
@@ -493,68 +495,37 @@ class RestaurantAnalysisAgent(BaseAgent):
         """
         self.logger.info("Performing location analysis")
 
-        # Calculate distance from center for each restaurant
-        for restaurant in restaurants:
-            lat = restaurant.get("latitude")
-            lon = restaurant.get("longitude")
-            if lat is not None and lon is not None:
-                distance = self._haversine_distance(center_lat, center_lon, lat, lon)
-                restaurant["distance_from_center"] = distance
-
-        # Group restaurants by distance bands
-        distance_bands = {
-            "0-0.5km": 0,
-            "0.5-1km": 0,
-            "1-2km": 0,
-            "2-3km": 0,
-            "3km+": 0
-        }
+        # Calculate distance from center for every restaurant in one batch
+        distances = distances_from_point(center_lat, center_lon, restaurants)
+        for restaurant, distance in zip(restaurants, distances):
+            if not math.isnan(distance):
+                restaurant["distance_from_center"] = float(distance)
 
-        for restaurant in restaurants:
-            distance = restaurant.get("distance_from_center", 0)
-            if distance <= 0.5:
-                distance_bands["0-0.5km"] += 1
-            elif distance <= 1:
-                distance_bands["0.5-1km"] += 1
-            elif distance <= 2:
-                distance_bands["1-2km"] += 1
-            elif distance <= 3:
-                distance_bands["2-3km"] += 1
-            else:
-                distance_bands["3km+"] += 1
+        # Group restaurants by distance bands (restaurants without coordinates count as 0km)
+        band_names = ["0-0.5km", "0.5-1km", "1-2km", "2-3km", "3km+"]
+        band_distances = np.array(
+            [r.get("distance_from_center", 0) for r in restaurants], dtype=np.float64
+        )
+        band_indices = np.digitize(band_distances, [0.5, 1, 2, 3], right=True)
+        band_counts = np.bincount(band_indices, minlength=len(band_names))
+        distance_bands = {band: int(count) for band, count in zip(band_names, band_counts)}
 
         # Identify restaurant clusters
         clusters = self._identify_restaurant_clusters(restaurants)
 
         # Calculate average rating by distance band
+        ratings = np.array([r.get("rating", 0) or 0 for r in restaurants], dtype=np.float64)
+        rated = ratings > 0
+        rating_sums = np.bincount(band_indices[rated], weights=ratings[rated], minlength=len(band_names))
+        rating_counts = np.bincount(band_indices[rated], minlength=len(band_names))
         rating_by_distance = {
-            "0-0.5km": [],
-            "0.5-1km": [],
-            "1-2km": [],
-            "2-3km": [],
-            "3km+": []
+            band: (rating_sums[i], rating_counts[i]) for i, band in enumerate(band_names)
         }
 
-        for restaurant in restaurants:
-            distance = restaurant.get("distance_from_center", 0)
-            rating = restaurant.get("rating", 0)
-
-            if rating > 0:
-                if distance <= 0.5:
-                    rating_by_distance["0-0.5km"].append(rating)
-                elif distance <= 1:
-                    rating_by_distance["0.5-1km"].append(rating)
-                elif distance <= 2:
-                    rating_by_distance["1-2km"].append(rating)
-                elif distance <= 3:
-                    rating_by_distance["2-3km"].append(rating)
-                else:
-                    rating_by_distance["3km+"].append(rating)
-
         avg_rating_by_distance = {}
-        for band, ratings in rating_by_distance.items():
-            if ratings:
-                avg_rating_by_distance[band] = sum(ratings) / len(ratings)
+        for band, (rating_sum, rating_count) in rating_by_distance.items():
+            if rating_count:
+                avg_rating_by_distance[band] = float(rating_sum / rating_count)
             else:
                 avg_rating_by_distance[band] = 0
 
@@ -702,14 +673,4 @@ class RestaurantAnalysisAgent(BaseAgent):
         Returns:
             Distance in kilometers
         """
-        # Convert decimal degrees to radians
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-
-        # Haversine formula
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        r = 6371  # Radius of earth in kilometers
-
-        return c * r
+        return haversine_distance(lat1, lon1, lat2, lon2)
@@ -7,13 +7,20 @@ and provide comprehensive analysis of the restaurant market in a specified area.
 
 import os
 import json
+import time
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional, Union, Tuple
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Any, Optional, Union, Tuple, Iterator, AsyncIterator
 from datetime import datetime
 
 from ..core.agent_framework import BaseAgent, AgentMetrics
-from ..core.api_client import APIClient
-from ..core.data_processor import RestaurantDataCleaner, RestaurantMatcher
+from ..core.api_client import APIClient, AsyncAPIClient
+from ..core.data_processor import RestaurantDataCleaner
+from ..core.entity_resolution import EntityResolver
+from ..core.restaurant_batch import as_batches
+from ..core.singleflight import SingleFlight, AsyncSingleFlight, make_key
 
 # Import AIQToolkit components if available
 try:
@@ -49,9 +56,30 @@ class RestaurantDataAgent(BaseAgent):
             "google_maps": self._create_google_maps_client()
         }
 
+        # Pooled async clients used by arun, created on first use
+        self.async_api_clients = None
+
+        # Identical searches in flight at the same time. Kept per agent because
+        # results depend on its configuration (API keys, thresholds); the agent
+        # registry shares one agent per configuration across callers.
+        self._search_flight = SingleFlight()
+        self._async_search_flight = AsyncSingleFlight()
+
         # Initialize data processor components
         self.cleaner = RestaurantDataCleaner()
-        self.matcher = RestaurantMatcher()
+
+        # Restaurants of every search are clustered into the same cross-platform
+        # entities, so a record seen again keeps its entity and entity ID
+        self.entity_resolver = EntityResolver(
+            min_score=self.config.get("matching.threshold", 0.7),
+            max_distance_km=self.config.get("matching.max_distance_km", 2.0),
+            location_scale_km=self.config.get("matching.location_scale_km", 2.0),
+            weights={
+                "name": self.config.get("matching.name_weight", 0.5),
+                "address": self.config.get("matching.address_weight", 0.3),
+                "location": self.config.get("matching.location_weight", 0.2)
+            }
+        )
         
         # Initialize AIQToolkit components if available
         if AIQ_AVAILABLE and self.config.get("use_aiq", True):
@@ -85,11 +113,26 @@ class RestaurantDataAgent(BaseAgent):
                 "robinhood": "Robinhood/2.0 iOS/15.0",
                 "default": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
             },
+            "google_maps": {
+                "max_results": 20,  # Places to return (and enrich with details) per search
+                "max_pages": 3,  # Nearby Search pages to follow via next_page_token
+                "details_workers": 8,  # Concurrent Place Details lookups
+                "rate_limit_burst": 10,  # Requests allowed back-to-back within the rate limit
+                "page_token_delay": 2.0  # Seconds before a next_page_token becomes valid
+            },
+            "search": {
+                "concurrent": True,  # Query platforms in parallel
+                "max_workers": 4,
+                "platform_timeout": 20.0,  # Seconds to wait for each platform before returning partial results
+                "coalesce": True  # Share one search between identical concurrent requests
+            },
             "matching": {
                 "threshold": 0.7,
                 "name_weight": 0.5,
                 "address_weight": 0.3,
-                "location_weight": 0.2
+                "location_weight": 0.2,
+                "max_distance_km": 2.0,  # Only score located restaurants within this distance
+                "location_scale_km": 2.0  # Distance at which location similarity reaches zero
             },
             "data_quality": {
                 "enabled": True,
@@ -100,7 +143,7 @@ class RestaurantDataAgent(BaseAgent):
         })
         return config
 
-    def _create_foodpanda_client(self) -> APIClient:
+    def _create_foodpanda_client(self, client_class: type = APIClient) -> APIClient:
         """Create API client for Foodpanda."""
         headers = {
             "User-Agent": self.config.get("user_agents.foodpanda"),
@@ -112,18 +155,20 @@ class RestaurantDataAgent(BaseAgent):
         if api_key:
             headers["Authorization"] = f"Bearer {api_key}"
 
-        return APIClient(
+        return client_class(
             base_url="https://th.fd-api.com/api/v5",
             headers=headers,
             cache_dir=self.config.get("cache_dir"),
             cache_duration_hours=self.config.get("cache_duration_hours"),
+            cache_max_stale_hours=self.config.get("cache_max_stale_hours", 0),
             requests_per_minute=30,  # Foodpanda has stricter rate limits
             timeout=self.config.get("timeout"),
             max_retries=self.config.get("max_retries"),
-            retry_delay=self.config.get("retry_delay")
+            retry_delay=self.config.get("retry_delay"),
+            rate_limit_state_path=self.config.get("rate_limit.state_path")
         )
 
-    def _create_wongnai_client(self) -> APIClient:
+    def _create_wongnai_client(self, client_class: type = APIClient) -> APIClient:
         """Create API client for Wongnai."""
         headers = {
             "User-Agent": self.config.get("user_agents.wongnai"),
@@ -131,18 +176,20 @@ class RestaurantDataAgent(BaseAgent):
             "Accept-Language": "en-US,en;q=0.9,th;q=0.8"
         }
 
-        return APIClient(
+        return client_class(
             base_url="https://api.wongnai.com",
             headers=headers,
             cache_dir=self.config.get("cache_dir"),
             cache_duration_hours=self.config.get("cache_duration_hours"),
+            cache_max_stale_hours=self.config.get("cache_max_stale_hours", 0),
             requests_per_minute=60,
             timeout=self.config.get("timeout"),
             max_retries=self.config.get("max_retries"),
-            retry_delay=self.config.get("retry_delay")
+            retry_delay=self.config.get("retry_delay"),
+            rate_limit_state_path=self.config.get("rate_limit.state_path")
         )
 
-    def _create_robinhood_client(self) -> APIClient:
+    def _create_robinhood_client(self, client_class: type = APIClient) -> APIClient:
         """Create API client for Robinhood."""
         headers = {
             "User-Agent": self.config.get("user_agents.robinhood"),
@@ -150,22 +197,24 @@ class RestaurantDataAgent(BaseAgent):
             "Accept-Language": "en-US,en;q=0.9,th;q=0.8"
         }
 
-        return APIClient(
+        return client_class(
             base_url="https://api.robinhood.in.th",
             headers=headers,
             cache_dir=self.config.get("cache_dir"),
             cache_duration_hours=self.config.get("cache_duration_hours"),
+            cache_max_stale_hours=self.config.get("cache_max_stale_hours", 0),
             requests_per_minute=60,
             timeout=self.config.get("timeout"),
             max_retries=self.config.get("max_retries"),
-            retry_delay=self.config.get("retry_delay")
+            retry_delay=self.config.get("retry_delay"),
+            rate_limit_state_path=self.config.get("rate_limit.state_path")
         )
 
-    def _create_google_maps_client(self) -> APIClient:
+    def _create_google_maps_client(self, client_class: type = APIClient) -> APIClient:
         """Create API client for Google Maps."""
         api_key = self.config.get("api_keys.google_maps")
 
-        return APIClient(
+        return client_class(
             base_url="https://maps.googleapis.com/maps/api",
             headers={
                 "User-Agent": self.config.get("user_agents.default"),
@@ -173,10 +222,13 @@ class RestaurantDataAgent(BaseAgent):
             },
             cache_dir=self.config.get("cache_dir"),
             cache_duration_hours=self.config.get("cache_duration_hours"),
+            cache_max_stale_hours=self.config.get("cache_max_stale_hours", 0),
             requests_per_minute=60,
+            burst=self.config.get("google_maps.rate_limit_burst", 10),
             timeout=self.config.get("timeout"),
             max_retries=self.config.get("max_retries"),
-            retry_delay=self.config.get("retry_delay")
+            retry_delay=self.config.get("retry_delay"),
+            rate_limit_state_path=self.config.get("rate_limit.state_path")
         )
 
     def run(self,
@@ -200,6 +252,122 @@ class RestaurantDataAgent(BaseAgent):
         Returns:
             Dictionary of restaurant data
         """
+        platforms = self._resolve_platforms(latitude, longitude, radius_km, platforms, use_real_data)
+
+        if not self.config.get("search.coalesce", True):
+            return self._search(platforms, latitude, longitude, radius_km, match)
+
+        key = make_key("search", latitude, longitude, radius_km, sorted(platforms), match)
+        result = self._search_flight.do(key, self._search, platforms, latitude, longitude, radius_km, match)
+        return self._copy_search_result(result)
+
+    async def arun(self,
+                   latitude: float,
+                   longitude: float,
+                   radius_km: float,
+                   platforms: Optional[List[str]] = None,
+                   match: bool = False,
+                   use_real_data: bool = True) -> Dict[str, Any]:
+        """
+        Run the agent to search for restaurants without blocking the event loop.
+
+        Platform requests go through pooled AsyncAPIClient instances, so every
+        platform (and every Google Maps place details lookup) is in flight at
+        once on a single thread.
+
+        Args:
+            latitude: Center point latitude
+            longitude: Center point longitude
+            radius_km: Search radius in kilometers
+            platforms: List of platforms to search (default: all available)
+            match: Whether to match restaurants across platforms
+            use_real_data: Whether to prioritize real data sources over mock data
+
+        Returns:
+            Dictionary of restaurant data
+        """
+        platforms = self._resolve_platforms(latitude, longitude, radius_km, platforms, use_real_data)
+
+        if not self.config.get("search.coalesce", True):
+            return await self._search_async(platforms, latitude, longitude, radius_km, match)
+
+        key = make_key("search", latitude, longitude, radius_km, sorted(platforms), match)
+        result = await self._async_search_flight.do(
+            key, self._search_async, platforms, latitude, longitude, radius_km, match
+        )
+        return self._copy_search_result(result)
+
+    def _search(self,
+                platforms: List[str],
+                latitude: float,
+                longitude: float,
+                radius_km: float,
+                match: bool) -> Dict[str, Any]:
+        """Search the platforms and build the result."""
+        results, failed_platforms = self._search_platforms(platforms, latitude, longitude, radius_km)
+        return self._build_search_result(results, failed_platforms, platforms, latitude, longitude, radius_km, match)
+
+    async def _search_async(self,
+                            platforms: List[str],
+                            latitude: float,
+                            longitude: float,
+                            radius_km: float,
+                            match: bool) -> Dict[str, Any]:
+        """Search the platforms on the event loop and build the result."""
+        results, failed_platforms = await self._search_platforms_async(platforms, latitude, longitude, radius_km)
+        return self._build_search_result(results, failed_platforms, platforms, latitude, longitude, radius_km, match)
+
+    @staticmethod
+    def _copy_search_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy the top level of a search result shared between coalesced callers.
+
+        Callers annotate the result and its metadata, so each gets its own
+        copies of those; the restaurant lists themselves are shared.
+        """
+        return {**result, "metadata": dict(result.get("metadata", {}))}
+
+    async def awarm(self):
+        """Open the pooled async API clients on the running event loop."""
+        await asyncio.gather(*(client.aopen() for client in self._get_async_api_clients().values()))
+
+    def close(self):
+        """Close the pooled sync API client sessions."""
+        for client in self.api_clients.values():
+            client.close()
+
+    async def aclose(self):
+        """Close the pooled async API clients."""
+        if self.async_api_clients:
+            await asyncio.gather(
+                *(client.aclose() for client in self.async_api_clients.values()),
+                return_exceptions=True
+            )
+            self.async_api_clients = None
+
+    def _get_async_api_clients(self) -> Dict[str, AsyncAPIClient]:
+        """Get the async API clients, creating them on first use."""
+        if self.async_api_clients is None:
+            self.async_api_clients = {
+                "foodpanda": self._create_foodpanda_client(AsyncAPIClient),
+                "wongnai": self._create_wongnai_client(AsyncAPIClient),
+                "robinhood": self._create_robinhood_client(AsyncAPIClient),
+                "google_maps": self._create_google_maps_client(AsyncAPIClient)
+            }
+        return self.async_api_clients
+
+    def _resolve_platforms(self,
+                           latitude: float,
+                           longitude: float,
+                           radius_km: float,
+                           platforms: Optional[List[str]],
+                           use_real_data: bool) -> List[str]:
+        """
+        Pick the platforms to search and validate the search inputs.
+
+        Returns:
+            List of platform names
+        """
         if platforms is None:
             if use_real_data and "google_maps" in self.api_clients and self.config.get("api_keys.google_maps"):
                 # Prioritize Google Maps if we want real data and have an API key
@@ -219,32 +387,54 @@ class RestaurantDataAgent(BaseAgent):
         self.logger.info(f"Searching for restaurants at {latitude}, {longitude} with radius {radius_km}km")
         self.logger.info(f"Platforms: {platforms}, Use real data: {use_real_data}")
 
-        # Search on each platform
-        results = {}
+        return platforms
+
+    def _build_search_result(self,
+                             results: Dict[str, List[Dict]],
+                             failed_platforms: Dict[str, str],
+                             platforms: List[str],
+                             latitude: float,
+                             longitude: float,
+                             radius_km: float,
+                             match: bool) -> Dict[str, Any]:
+        """
+        Record metrics, analyze and optionally match the per-platform search results.
+
+        Returns:
+            Dictionary of restaurant data
+        """
         real_data_found = False
         
         for platform in platforms:
-            try:
-                self.logger.info(f"Searching on {platform}...")
-                self.metrics.increment_step()
+            restaurants = results[platform]
+            self.metrics.increment_step()
+            
+            # Check if we got real data
+            if platform == "google_maps" and restaurants and len(restaurants) > 0:
+                real_data_found = True
+                self.logger.info(f"Found {len(restaurants)} real restaurants from Google Maps")
+            
+            self.logger.info(f"Found {len(restaurants)} restaurants on {platform}")
+            self.metrics.add_processed_data(len(restaurants))
+            self.metrics.add_custom_metric(f"{platform}_count", len(restaurants))
 
-                restaurants = self._search_platform(platform, latitude, longitude, radius_km)
-                
-                # Check if we got real data
-                if platform == "google_maps" and restaurants and len(restaurants) > 0:
-                    real_data_found = True
-                    self.logger.info(f"Found {len(restaurants)} real restaurants from Google Maps")
-                
-                results[platform] = restaurants
+        if failed_platforms:
+            self.metrics.add_custom_metric("failed_platforms", failed_platforms)
 
-                self.logger.info(f"Found {len(restaurants)} restaurants on {platform}")
-                self.metrics.add_processed_data(len(restaurants))
-                self.metrics.add_custom_metric(f"{platform}_count", len(restaurants))
-            except Exception as e:
-                self.logger.error(f"Error searching {platform}: {str(e)}")
-                results[platform] = []
+        # Platforms answered from expired cache entries while they are refreshed
+        stale_platforms = sorted(self.metrics.custom_metrics.get("stale_platforms", []))
+
+        # Time spent waiting on each platform's rate limit, shared with other agents
+        self.metrics.add_custom_metric("rate_limits", {
+            platform: self.api_clients[platform].rate_limiter.get_stats() for platform in platforms
+        })
+
+        # Response cache hit rates (the memory tier is shared by all clients on the cache directory)
+        for platform in platforms:
+            self.metrics.add_cache_stats(platform, self.api_clients[platform].cache.get_stats())
 
         # Analyze data quality if AIQToolkit is available
+        quality_metrics = {}
         if self.data_quality_analyzer and self.config.get("data_quality.enabled", True):
             try:
                 all_restaurants = []
@@ -264,11 +454,16 @@ class RestaurantDataAgent(BaseAgent):
             self.logger.info("Matching restaurants across platforms...")
             self.metrics.increment_step()
 
-            threshold = self.config.get("matching.threshold", 0.7)
-            matched_restaurants = self.matcher.match_restaurants(results, threshold)
+            # Compute each restaurant's matching keys once as the results enter
+            # matching, then add them to the agent's entities (no base platform)
+            batches = as_batches(results)
+            entity_ids = self.entity_resolver.add_records(batches)
+            entities = self.entity_resolver.entities(entity_ids=entity_ids)
+            matched_restaurants = self._entities_to_matches(entities, results)
 
-            self.logger.info(f"Found {len(matched_restaurants)} matched restaurants")
-            self.metrics.add_custom_metric("matched_count", len(matched_restaurants))
+            matched_count = sum(1 for entity in entities if len(entity["platforms"]) > 1)
+            self.logger.info(f"Found {matched_count} restaurants on more than one platform")
+            self.metrics.add_custom_metric("matched_count", matched_count)
 
             return {
                 "platforms": results,
@@ -280,7 +475,11 @@ class RestaurantDataAgent(BaseAgent):
                     "platforms": platforms,
                     "data_source": "real" if real_data_found else "simulated",
                     "real_data_found": real_data_found,
-                    "data_quality": self.metrics.custom_metrics.get("data_quality", {})
+                    "partial": bool(failed_platforms),
+                    "failed_platforms": failed_platforms,
+                    "stale": bool(stale_platforms),
+                    "stale_platforms": stale_platforms,
+                    "data_quality": quality_metrics
                 }
             }
 
@@ -293,10 +492,120 @@ class RestaurantDataAgent(BaseAgent):
                 "platforms": platforms,
                 "data_source": "real" if real_data_found else "simulated",
                 "real_data_found": real_data_found,
-                "data_quality": self.metrics.custom_metrics.get("data_quality", {})
+                "partial": bool(failed_platforms),
+                "failed_platforms": failed_platforms,
+                "stale": bool(stale_platforms),
+                "stale_platforms": stale_platforms,
+                "data_quality": quality_metrics
             }
         }
 
+    def _entities_to_matches(self, entities: List[Dict], results: Dict[str, List[Dict]]) -> List[Dict]:
+        """
+        Present resolved entities as matched restaurants.
+
+        Each entity's record on the platform with the most results is its base
+        record, and its records on the other platforms are its matches.
+
+        Args:
+            entities: Entities from the entity resolver
+            results: Restaurants by platform of the current search
+
+        Returns:
+            List of matched restaurants with their entity ID
+        """
+        matched_restaurants = []
+        for entity in entities:
+            base_platform = max(entity["platforms"], key=lambda platform: len(results.get(platform, ())))
+            matched_restaurants.append({
+                "entity_id": entity["entity_id"],
+                "base_platform": base_platform,
+                "base_data": entity["records"][base_platform],
+                "matches": {
+                    platform: {
+                        "data": record,
+                        "confidence": entity["link_scores"][platform]
+                    }
+                    for platform, record in entity["records"].items() if platform != base_platform
+                }
+            })
+        return matched_restaurants
+
+    def _search_platforms(self,
+                          platforms: List[str],
+                          latitude: float,
+                          longitude: float,
+                          radius_km: float) -> Tuple[Dict[str, List[Dict]], Dict[str, str]]:
+        """
+        Search for restaurants on several platforms.
+
+        When ``search.concurrent`` is enabled the platforms are queried in
+        parallel and any platform that does not answer within
+        ``search.platform_timeout`` seconds is dropped from the results, so the
+        call costs roughly the latency of the slowest platform that answers in time.
+
+        Args:
+            platforms: Platform names
+            latitude: Center point latitude
+            longitude: Center point longitude
+            radius_km: Search radius in kilometers
+
+        Returns:
+            Tuple of (restaurants by platform, failure reason by platform)
+        """
+        results = {}
+        failed_platforms = {}
+
+        if not self.config.get("search.concurrent", True) or len(platforms) <= 1:
+            for platform in platforms:
+                try:
+                    self.logger.info(f"Searching on {platform}...")
+                    results[platform] = self._search_platform(platform, latitude, longitude, radius_km)
+                except Exception as e:
+                    self.logger.error(f"Error searching {platform}: {str(e)}")
+                    results[platform] = []
+                    failed_platforms[platform] = str(e)
+            return results, failed_platforms
+
+        timeout = self.config.get("search.platform_timeout", 20.0)
+        max_workers = min(self.config.get("search.max_workers", 4), len(platforms))
+
+        start_time = time.time()
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="platform-search")
+        try:
+            futures = {}
+            for platform in platforms:
+                self.logger.info(f"Searching on {platform}...")
+                # Run in a copy of the caller's context so workers report to this execution's metrics
+                future = executor.submit(
+                    contextvars.copy_context().run, self._search_platform, platform, latitude, longitude, radius_km
+                )
+                futures[future] = platform
+
+            done, not_done = wait(futures, timeout=timeout)
+
+            for future in done:
+                platform = futures[future]
+                try:
+                    results[platform] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error searching {platform}: {str(e)}")
+                    results[platform] = []
+                    failed_platforms[platform] = str(e)
+
+            for future in not_done:
+                platform = futures[future]
+                future.cancel()
+                self.logger.warning(f"Timed out searching {platform} after {timeout}s, returning partial results")
+                results[platform] = []
+                failed_platforms[platform] = "timeout"
+        finally:
+            # Don't block on platforms that timed out; their threads finish in the background
+            executor.shutdown(wait=False)
+
+        self.metrics.add_custom_metric("search_time", time.time() - start_time)
+        return results, failed_platforms
+
     def _search_platform(self, platform: str, latitude: float, longitude: float, radius_km: float) -> List[Dict]:
         """
         Search for restaurants on a specific platform.
@@ -321,153 +630,507 @@ class RestaurantDataAgent(BaseAgent):
         else:
             raise ValueError(f"Unknown platform: {platform}")
 
-    def _get_foodpanda_restaurants(self, latitude: float, longitude: float, radius_km: float) -> List[Dict]:
-        """Get restaurants from Foodpanda."""
+    async def _search_platforms_async(self,
+                                      platforms: List[str],
+                                      latitude: float,
+                                      longitude: float,
+                                      radius_km: float) -> Tuple[Dict[str, List[Dict]], Dict[str, str]]:
+        """
+        Search for restaurants on several platforms concurrently on the event loop.
+
+        Platforms that do not answer within ``search.platform_timeout`` seconds
+        are cancelled and dropped from the results.
+
+        Args:
+            platforms: Platform names
+            latitude: Center point latitude
+            longitude: Center point longitude
+            radius_km: Search radius in kilometers
+
+        Returns:
+            Tuple of (restaurants by platform, failure reason by platform)
+        """
+        results = {}
+        failed_platforms = {}
+        timeout = self.config.get("search.platform_timeout", 20.0)
+
+        start_time = time.time()
+        tasks = {}
+        for platform in platforms:
+            self.logger.info(f"Searching on {platform}...")
+            task = asyncio.create_task(self._search_platform_async(platform, latitude, longitude, radius_km))
+            tasks[task] = platform
+
+        done, not_done = await asyncio.wait(tasks, timeout=timeout)
+
+        for task in done:
+            platform = tasks[task]
+            try:
+                results[platform] = task.result()
+            except Exception as e:
+                self.logger.error(f"Error searching {platform}: {str(e)}")
+                results[platform] = []
+                failed_platforms[platform] = str(e)
+
+        for task in not_done:
+            platform = tasks[task]
+            task.cancel()
+            self.logger.warning(f"Timed out searching {platform} after {timeout}s, returning partial results")
+            results[platform] = []
+            failed_platforms[platform] = "timeout"
+
+        self.metrics.add_custom_metric("search_time", time.time() - start_time)
+        return results, failed_platforms
+
+    async def _search_platform_async(self,
+                                     platform: str,
+                                     latitude: float,
+                                     longitude: float,
+                                     radius_km: float) -> List[Dict]:
+        """
+        Search for restaurants on a specific platform using the async clients.
+
+        Args:
+            platform: Platform name
+            latitude: Center point latitude
+            longitude: Center point longitude
+            radius_km: Search radius in kilometers
+
+        Returns:
+            List of restaurant data
+        """
+        if platform == "google_maps":
+            return await self._get_google_maps_restaurants_async(latitude, longitude, radius_km)
+
+        endpoint, params = self._platform_search_request(platform, latitude, longitude, radius_km)
+        try:
+            response = await self._get_async_api_clients()[platform].get(endpoint, params=params)
+            return self._parse_platform_response(platform, response)
+        except Exception as e:
+            self.logger.error(f"Error getting {platform} restaurants: {str(e)}")
+            return []
+
+    def _platform_search_request(self,
+                                 platform: str,
+                                 latitude: float,
+                                 longitude: float,
+                                 radius_km: float) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build the search endpoint and query parameters for a delivery platform.
+
+        Args:
+            platform: Platform name (foodpanda, wongnai or robinhood)
+            latitude: Center point latitude
+            longitude: Center point longitude
+            radius_km: Search radius in kilometers
+
+        Returns:
+            Tuple of (endpoint, params)
+        """
         # Convert radius to meters for the API
         radius_m = int(radius_km * 1000)
 
-        params = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "radius": radius_m,
-            "include": "characteristics,cuisines,food_characteristics,delivery_fee_details",
-            "language_id": "1",
-            "dynamic_pricing": "0",
-            "configuration": "Variant1",
-            "country_code": "TH",
-            "use_free_delivery_label": "false"
-        }
+        if platform == "foodpanda":
+            return "/vendors", {
+                "latitude": latitude,
+                "longitude": longitude,
+                "radius": radius_m,
+                "include": "characteristics,cuisines,food_characteristics,delivery_fee_details",
+                "language_id": "1",
+                "dynamic_pricing": "0",
+                "configuration": "Variant1",
+                "country_code": "TH",
+                "use_free_delivery_label": "false"
+            }
+        elif platform == "wongnai":
+            return "/restaurants/search", {
+                "lat": latitude,
+                "lng": longitude,
+                "radius": radius_m,
+                "limit": 100
+            }
+        elif platform == "robinhood":
+            return "/restaurants", {
+                "lat": latitude,
+                "lng": longitude,
+                "distance": radius_m,
+                "limit": 100
+            }
+        else:
+            raise ValueError(f"Unknown platform: {platform}")
 
-        try:
-            response = self.api_clients["foodpanda"].get("/vendors", params=params)
+    def _note_stale(self, platform: str, response: Dict):
+        """Record a platform whose search response was an expired cache entry being refreshed."""
+        if getattr(response, "stale", False):
+            stale_platforms = self.metrics.custom_metrics.setdefault("stale_platforms", [])
+            if platform not in stale_platforms:
+                stale_platforms.append(platform)
+
+    def _parse_platform_response(self, platform: str, response: Dict) -> List[Dict]:
+        """
+        Standardize the restaurants in a delivery platform search response.
+
+        Args:
+            platform: Platform name (foodpanda, wongnai or robinhood)
+            response: Raw API response
 
+        Returns:
+            List of restaurant data
+        """
+        self._note_stale(platform, response)
+        if platform == "foodpanda":
             vendors = response.get("data", {}).get("items", [])
             return [self._standardize_foodpanda_data(v) for v in vendors]
+        elif platform == "wongnai":
+            return [self._standardize_wongnai_data(r) for r in response.get("data", [])]
+        elif platform == "robinhood":
+            return [self._standardize_robinhood_data(r) for r in response.get("data", [])]
+        else:
+            raise ValueError(f"Unknown platform: {platform}")
+
+    def _get_foodpanda_restaurants(self, latitude: float, longitude: float, radius_km: float) -> List[Dict]:
+        """Get restaurants from Foodpanda."""
+        endpoint, params = self._platform_search_request("foodpanda", latitude, longitude, radius_km)
+
+        try:
+            response = self.api_clients["foodpanda"].get(endpoint, params=params)
+            return self._parse_platform_response("foodpanda", response)
         except Exception as e:
             self.logger.error(f"Error getting Foodpanda restaurants: {str(e)}")
             return []
 
     def _get_wongnai_restaurants(self, latitude: float, longitude: float, radius_km: float) -> List[Dict]:
         """Get restaurants from Wongnai."""
-        # Convert radius to meters for the API
-        radius_m = int(radius_km * 1000)
-
-        params = {
-            "lat": latitude,
-            "lng": longitude,
-            "radius": radius_m,
-            "limit": 100
-        }
+        endpoint, params = self._platform_search_request("wongnai", latitude, longitude, radius_km)
 
         try:
-            response = self.api_clients["wongnai"].get("/restaurants/search", params=params)
-
-            restaurants = response.get("data", [])
-            return [self._standardize_wongnai_data(r) for r in restaurants]
+            response = self.api_clients["wongnai"].get(endpoint, params=params)
+            return self._parse_platform_response("wongnai", response)
         except Exception as e:
             self.logger.error(f"Error getting Wongnai restaurants: {str(e)}")
             return []
 
     def _get_robinhood_restaurants(self, latitude: float, longitude: float, radius_km: float) -> List[Dict]:
         """Get restaurants from Robinhood."""
-        # Convert radius to meters for the API
-        radius_m = int(radius_km * 1000)
-
-        params = {
-            "lat": latitude,
-            "lng": longitude,
-            "distance": radius_m,
-            "limit": 100
-        }
+        endpoint, params = self._platform_search_request("robinhood", latitude, longitude, radius_km)
 
         try:
-            response = self.api_clients["robinhood"].get("/restaurants", params=params)
-
-            restaurants = response.get("data", [])
-            return [self._standardize_robinhood_data(r) for r in restaurants]
+            response = self.api_clients["robinhood"].get(endpoint, params=params)
+            return self._parse_platform_response("robinhood", response)
         except Exception as e:
             self.logger.error(f"Error getting Robinhood restaurants: {str(e)}")
             return []
 
     def _get_google_maps_restaurants(self, latitude: float, longitude: float, radius_km: float) -> List[Dict]:
         """Get restaurants from Google Maps."""
-        api_key = self.config.get("api_keys.google_maps")
-        if not api_key:
-            self.logger.warning("Google Maps API key not provided")
+        try:
+            restaurants = list(self.iter_google_maps_restaurants(latitude, longitude, radius_km))
+        except Exception as e:
+            self.logger.error(f"Error getting Google Maps restaurants: {str(e)}")
             return []
 
-        # Convert radius to meters for the API
-        radius_m = int(radius_km * 1000)
+        # Restore Nearby Search (prominence) order, which concurrent enrichment scrambles
+        restaurants.sort(key=lambda item: item[0])
+        return [restaurant for _, restaurant in restaurants]
 
-        params = {
-            "location": f"{latitude},{longitude}",
-            "radius": radius_m,
-            "type": "restaurant",
-            "key": api_key,
-            "rankby": "prominence",
-            "language": "en"  # Ensure English results for consistent parsing
-        }
+    def iter_google_maps_restaurants(self,
+                                     latitude: float,
+                                     longitude: float,
+                                     radius_km: float) -> Iterator[Tuple[int, Dict]]:
+        """
+        Stream restaurants from Google Maps as their details arrive.
+
+        Nearby Search pages are followed lazily via ``next_page_token`` and every
+        place is enriched with Place Details on a thread pool, so restaurants
+        are yielded as soon as their own details are available rather than after
+        the whole search completes.
+
+        Args:
+            latitude: Center point latitude
+            longitude: Center point longitude
+            radius_km: Search radius in kilometers
 
+        Yields:
+            Tuples of (Nearby Search rank, standardized restaurant data)
+        """
+        if not self.config.get("api_keys.google_maps"):
+            self.logger.warning("Google Maps API key not provided")
+            return
+
+        max_results = self.config.get("google_maps.max_results", 20)
+        executor = ThreadPoolExecutor(
+            max_workers=self.config.get("google_maps.details_workers", 8),
+            thread_name_prefix="place-details"
+        )
         try:
-            self.logger.info(f"Fetching restaurants from Google Maps Places API: {latitude}, {longitude}, {radius_km}km")
-            response = self.api_clients["google_maps"].get("/place/nearbysearch/json", params=params)
-            
+            pending = set()
+            seen_place_ids = set()
+            submitted = 0
+
+            for places in self._iter_nearby_search_pages(latitude, longitude, radius_km):
+                for place in places:
+                    if submitted >= max_results:
+                        break
+
+                    # Pages can repeat a place; only enrich it once per search
+                    place_id = place.get("place_id")
+                    if place_id in seen_place_ids:
+                        continue
+                    if place_id:
+                        seen_place_ids.add(place_id)
+
+                    pending.add(executor.submit(self._enrich_place, submitted, place))
+                    submitted += 1
+
+                # Hand back whatever has finished while the next page is fetched
+                for future in [f for f in pending if f.done()]:
+                    pending.remove(future)
+                    yield future.result()
+
+                if submitted >= max_results:
+                    break
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            executor.shutdown(wait=False)
+
+    def _iter_nearby_search_pages(self, latitude: float, longitude: float, radius_km: float) -> Iterator[List[Dict]]:
+        """
+        Iterate over Nearby Search result pages.
+
+        Args:
+            latitude: Center point latitude
+            longitude: Center point longitude
+            radius_km: Search radius in kilometers
+
+        Yields:
+            Lists of raw place results, one per page
+        """
+        api_key = self.config.get("api_keys.google_maps")
+        params = self._nearby_search_params(latitude, longitude, radius_km)
+
+        self.logger.info(f"Fetching restaurants from Google Maps Places API: {latitude}, {longitude}, {radius_km}km")
+        response = self.api_clients["google_maps"].get("/place/nearbysearch/json", params=params)
+        self._note_stale("google_maps", response)
+
+        max_pages = self.config.get("google_maps.max_pages", 3)
+        page_token_delay = self.config.get("google_maps.page_token_delay", 2.0)
+
+        for page in range(max_pages):
             if response.get("status") != "OK":
-                self.logger.error(f"Google Maps API error: {response.get('status')}: {response.get('error_message', 'No error message')}")
-                return []
+                if page == 0:
+                    self.logger.error(f"Google Maps API error: {response.get('status')}: {response.get('error_message', 'No error message')}")
+                return
 
             places = response.get("results", [])
-            self.logger.info(f"Found {len(places)} restaurants in Google Maps")
-            
-            # For each place, get additional details to enrich the data
-            detailed_places = []
-            for place in places[:20]:  # Limit to 20 to avoid too many API calls
-                place_id = place.get("place_id")
-                if place_id:
-                    try:
-                        detailed_place = self._get_place_details(place_id)
-                        if detailed_place:
-                            # Merge the detailed data with the original place data
-                            # Let the detailed data take precedence
-                            merged_place = {**place, **detailed_place}
-                            detailed_places.append(merged_place)
-                        else:
-                            detailed_places.append(place)
-                    except Exception as e:
-                        self.logger.warning(f"Error getting details for place {place_id}: {str(e)}")
-                        detailed_places.append(place)
-                else:
-                    detailed_places.append(place)
-            
-            return [self._standardize_google_maps_data(p) for p in detailed_places]
+            self.logger.info(f"Found {len(places)} restaurants in Google Maps (page {page + 1})")
+            yield places
+
+            next_page_token = response.get("next_page_token")
+            if not next_page_token or page + 1 >= max_pages:
+                return
+
+            # A next_page_token is not valid until a short while after it is issued
+            page_params = {"pagetoken": next_page_token, "key": api_key}
+            for _ in range(3):
+                time.sleep(page_token_delay)
+                response = self.api_clients["google_maps"].get(
+                    "/place/nearbysearch/json", params=page_params, use_cache=False
+                )
+                if response.get("status") != "INVALID_REQUEST":
+                    break
+
+    def _enrich_place(self, rank: int, place: Dict) -> Tuple[int, Dict]:
+        """
+        Merge Place Details into a Nearby Search result and standardize it.
+
+        Details fetched within the cache duration are served from the API
+        client's response cache instead of being looked up again.
+
+        Args:
+            rank: Position of the place in the Nearby Search results
+            place: Raw Nearby Search place
+
+        Returns:
+            Tuple of (rank, standardized restaurant data)
+        """
+        place_id = place.get("place_id")
+        if not place_id:
+            return rank, self._standardize_google_maps_data(place)
+
+        try:
+            detailed_place = self._get_place_details(place_id)
         except Exception as e:
-            self.logger.error(f"Error getting Google Maps restaurants: {str(e)}")
-            return []
-            
+            self.logger.warning(f"Error getting details for place {place_id}: {str(e)}")
+            detailed_place = {}
+
+        return rank, self._merge_place_details(place, detailed_place)
+
+    def _merge_place_details(self, place: Dict, detailed_place: Dict) -> Dict:
+        """Merge Place Details into a Nearby Search result and standardize it."""
+        # Merge the detailed data with the original place data
+        # Let the detailed data take precedence
+        merged_place = {**place, **detailed_place} if detailed_place else place
+        return self._standardize_google_maps_data(merged_place)
+
     def _get_place_details(self, place_id: str) -> Dict:
         """Get detailed information about a place from Google Maps."""
         api_key = self.config.get("api_keys.google_maps")
         if not api_key:
             return {}
-            
-        params = {
+        
+        try:
+            response = self.api_clients["google_maps"].get(
+                "/place/details/json", params=self._place_details_params(place_id)
+            )
+            return self._parse_place_details(response)
+        except Exception as e:
+            self.logger.warning(f"Error getting place details: {str(e)}")
+            return {}
+
+    def _nearby_search_params(self, latitude: float, longitude: float, radius_km: float) -> Dict[str, Any]:
+        """Build the query parameters for the first Nearby Search page."""
+        # Convert radius to meters for the API
+        radius_m = int(radius_km * 1000)
+
+        return {
+            "location": f"{latitude},{longitude}",
+            "radius": radius_m,
+            "type": "restaurant",
+            "key": self.config.get("api_keys.google_maps"),
+            "rankby": "prominence",
+            "language": "en"  # Ensure English results for consistent parsing
+        }
+
+    def _place_details_params(self, place_id: str) -> Dict[str, Any]:
+        """Build the query parameters for a Place Details lookup."""
+        return {
             "place_id": place_id,
             "fields": "name,formatted_address,formatted_phone_number,website,opening_hours,price_level,rating,user_ratings_total,reviews,photos,types",
-            "key": api_key,
+            "key": self.config.get("api_keys.google_maps"),
             "language": "en"
         }
-        
-        try:
-            response = self.api_clients["google_maps"].get("/place/details/json", params=params)
+
+    def _parse_place_details(self, response: Dict) -> Dict:
+        """Extract the place from a Place Details response."""
+        if response.get("status") != "OK":
+            self.logger.warning(f"Google Maps API error for place details: {response.get('status')}")
+            return {}
             
+        return response.get("result", {})
+
+    async def _get_google_maps_restaurants_async(self,
+                                                 latitude: float,
+                                                 longitude: float,
+                                                 radius_km: float) -> List[Dict]:
+        """
+        Get restaurants from Google Maps using the async client.
+
+        All Place Details lookups for a page are issued together, bounded by
+        ``google_maps.details_workers`` requests in flight.
+        """
+        if not self.config.get("api_keys.google_maps"):
+            self.logger.warning("Google Maps API key not provided")
+            return []
+
+        max_results = self.config.get("google_maps.max_results", 20)
+        semaphore = asyncio.Semaphore(self.config.get("google_maps.details_workers", 8))
+
+        tasks = []
+        seen_place_ids = set()
+        try:
+            async for places in self._aiter_nearby_search_pages(latitude, longitude, radius_km):
+                for place in places:
+                    if len(tasks) >= max_results:
+                        break
+
+                    # Pages can repeat a place; only enrich it once per search
+                    place_id = place.get("place_id")
+                    if place_id in seen_place_ids:
+                        continue
+                    if place_id:
+                        seen_place_ids.add(place_id)
+
+                    tasks.append(asyncio.create_task(self._enrich_place_async(place, semaphore)))
+
+                if len(tasks) >= max_results:
+                    break
+
+            # gather keeps Nearby Search (prominence) order
+            return list(await asyncio.gather(*tasks))
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            self.logger.error(f"Error getting Google Maps restaurants: {str(e)}")
+            return []
+
+    async def _aiter_nearby_search_pages(self,
+                                         latitude: float,
+                                         longitude: float,
+                                         radius_km: float) -> AsyncIterator[List[Dict]]:
+        """Async version of _iter_nearby_search_pages."""
+        client = self._get_async_api_clients()["google_maps"]
+        api_key = self.config.get("api_keys.google_maps")
+        params = self._nearby_search_params(latitude, longitude, radius_km)
+
+        self.logger.info(f"Fetching restaurants from Google Maps Places API: {latitude}, {longitude}, {radius_km}km")
+        response = await client.get("/place/nearbysearch/json", params=params)
+        self._note_stale("google_maps", response)
+
+        max_pages = self.config.get("google_maps.max_pages", 3)
+        page_token_delay = self.config.get("google_maps.page_token_delay", 2.0)
+
+        for page in range(max_pages):
             if response.get("status") != "OK":
-                self.logger.warning(f"Google Maps API error for place details: {response.get('status')}")
-                return {}
-                
-            return response.get("result", {})
+                if page == 0:
+                    self.logger.error(f"Google Maps API error: {response.get('status')}: {response.get('error_message', 'No error message')}")
+                return
+
+            places = response.get("results", [])
+            self.logger.info(f"Found {len(places)} restaurants in Google Maps (page {page + 1})")
+            yield places
+
+            next_page_token = response.get("next_page_token")
+            if not next_page_token or page + 1 >= max_pages:
+                return
+
+            # A next_page_token is not valid until a short while after it is issued
+            page_params = {"pagetoken": next_page_token, "key": api_key}
+            for _ in range(3):
+                await asyncio.sleep(page_token_delay)
+                response = await client.get("/place/nearbysearch/json", params=page_params, use_cache=False)
+                if response.get("status") != "INVALID_REQUEST":
+                    break
+
+    async def _enrich_place_async(self, place: Dict, semaphore: asyncio.Semaphore) -> Dict:
+        """
+        Async version of _enrich_place.
+
+        Args:
+            place: Raw Nearby Search place
+            semaphore: Bounds the Place Details lookups in flight
+
+        Returns:
+            Standardized restaurant data
+        """
+        place_id = place.get("place_id")
+        if not place_id:
+            return self._standardize_google_maps_data(place)
+
+        try:
+            async with semaphore:
+                response = await self._get_async_api_clients()["google_maps"].get(
+                    "/place/details/json", params=self._place_details_params(place_id)
+                )
+            detailed_place = self._parse_place_details(response)
         except Exception as e:
-            self.logger.warning(f"Error getting place details: {str(e)}")
-            return {}
+            self.logger.warning(f"Error getting details for place {place_id}: {str(e)}")
+            detailed_place = {}
+
+        return self._merge_place_details(place, detailed_place)
 
     def _standardize_foodpanda_data(self, data: Dict) -> Dict:
         """
@@ -14,6 +14,7 @@ from typing import Dict, List, Any, Optional, Union, AsyncGenerator, Callable
 from ..core.agent_framework import BaseAgent, AgentMetrics
 from ..core.streaming import StreamingManager
 from ..core.llm_client import LLMClient
+from ..core.agent_registry import get_agent
 from ..agents.restaurant_data_agent import RestaurantDataAgent
 from ..agents.restaurant_analysis_agent import RestaurantAnalysisAgent
 
@@ -33,9 +34,9 @@ class RestaurantResearchAgent(BaseAgent):
         """
         super().__init__(config_path, "RestaurantResearchAgent")
 
-        # Initialize component agents
-        self.data_agent = RestaurantDataAgent(config_path)
-        self.analysis_agent = RestaurantAnalysisAgent(config_path)
+        # Shared component agents
+        self.data_agent = get_agent(RestaurantDataAgent, config_path)
+        self.analysis_agent = get_agent(RestaurantAnalysisAgent, config_path)
         
         # Initialize streaming manager
         self.streaming_manager = StreamingManager()
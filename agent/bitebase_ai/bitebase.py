@@ -35,6 +35,8 @@ from .agents.restaurant_data_agent import RestaurantDataAgent
 from .agents.restaurant_analysis_agent import RestaurantAnalysisAgent
 from .agents.location_intelligence_agent import LocationIntelligenceAgent
 from .core.llm_client import LLMClient
+from .core.agent_registry import get_agent, get_agent_registry, add_lifecycle_hooks
+from .core.streaming import StreamingManager, get_cancellation_stats
 from .core.aiq_integration import AIQProfiler, AIQEvaluator
 
 app = FastAPI(
@@ -66,11 +68,15 @@ sdk = CopilotKitRemoteEndpoint(
     ],
 )
 
-# Initialize the agents
-restaurant_data_agent = RestaurantDataAgent()
-restaurant_analysis_agent = RestaurantAnalysisAgent()
-location_intelligence_agent = LocationIntelligenceAgent()
+# Shared agents, reused by every request handler (and by run_research)
+restaurant_data_agent = get_agent(RestaurantDataAgent)
+restaurant_analysis_agent = get_agent(RestaurantAnalysisAgent)
+location_intelligence_agent = get_agent(LocationIntelligenceAgent)
 llm_client = LLMClient()
+streaming_manager = StreamingManager()
+
+# Warm the agents' connection pools on startup and close them on shutdown
+add_lifecycle_hooks(app, [RestaurantDataAgent, RestaurantAnalysisAgent, LocationIntelligenceAgent])
 
 # Initialize AIQToolkit components if available
 aiq_profiler = None
@@ -121,7 +127,7 @@ async def search_restaurants(request: RestaurantSearchRequest):
         aiq_profiler.start_profiling()
         
     try:
-        result = restaurant_data_agent.execute(
+        result = await restaurant_data_agent.execute_async(
             latitude=request.latitude,
             longitude=request.longitude,
             radius_km=request.radius_km,
@@ -234,9 +240,11 @@ async def generate_insights(request: RestaurantAnalysisRequest):
         )
 
 @app.post("/api/restaurants/insights/stream")
-async def stream_insights(request: RestaurantAnalysisRequest):
+async def stream_insights(request: RestaurantAnalysisRequest, http_request: Request):
     """
     Stream insights from restaurant data.
+
+    The upstream LLM stream is closed as soon as the client disconnects.
     """
     # For streaming, we don't use profiling directly as it would interfere with the stream
     async def generate():
@@ -244,7 +252,12 @@ async def stream_insights(request: RestaurantAnalysisRequest):
             # Start AIQ profiling if available
             start_time = datetime.now()
             
-            async for chunk in llm_client.generate_restaurant_insights_stream(request.restaurant_data):
+            # Tokens are re-batched by time and size; a slow client holds back the upstream stream
+            async for chunk in streaming_manager.stream(
+                llm_client.generate_restaurant_insights_stream(request.restaurant_data),
+                is_disconnected=http_request.is_disconnected,
+                source="insights_stream"
+            ):
                 yield f"data: {json.dumps({'chunk': chunk})}\n\n"
                 
             # Collect end time for simple metrics
@@ -257,8 +270,9 @@ async def stream_insights(request: RestaurantAnalysisRequest):
                 
         except Exception as e:
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
-        finally:
-            yield "data: [DONE]\n\n"
+
+        # Not in a finally block: nothing may be yielded once the client has gone away
+        yield "data: [DONE]\n\n"
 
     return StreamingResponse(
         generate(),
@@ -280,12 +294,9 @@ async def analyze_location(request: LocationIntelligenceRequest):
         use_real_data = True
         
         try:
-            # Initialize RestaurantDataAgent
-            from .agents.restaurant_data_agent import RestaurantDataAgent
-            restaurant_data_agent = RestaurantDataAgent()
-            
-            # Fetch real restaurant data from Google Maps
-            real_data_results = restaurant_data_agent.run(
+            # Fetch real restaurant data from Google Maps; identical concurrent
+            # requests share one search with /api/restaurants/search
+            real_data_results = await restaurant_data_agent.arun(
                 latitude=request.latitude,
                 longitude=request.longitude,
                 radius_km=request.radius_km,
@@ -390,7 +401,9 @@ async def health_check():
     return {
         "status": "ok", 
         "version": "1.0.0",
-        "aiq": aiq_status
+        "aiq": aiq_status,
+        "cancellations": get_cancellation_stats(),
+        "agents": get_agent_registry().get_stats()
     }
 
 def main():
@@ -3,18 +3,53 @@ Bitebase AI Core - Foundation components for the agent system.
 """
 
 from .agent_framework import BaseAgent, AgentMetrics, AgentConfig
-from .api_client import APIClient, RateLimiter, APICache
+from .api_client import APIClient, AsyncAPIClient, RateLimiter, APICache, get_rate_limiter, get_rate_limiter_stats
 from .data_processor import RestaurantDataCleaner, RestaurantMatcher
-from .llm_client import LLMClient
+from .blocking import CandidateBlocker
+from .restaurant_batch import RestaurantBatch, as_batch, as_batches
+from .entity_resolution import EntityResolver, UnionFind
+from .kv_cache import KVCache, MemoryCache, get_kv_cache
+from .singleflight import SingleFlight, AsyncSingleFlight
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from .response_cache import ResponseCache, get_response_cache
+from .llm_client import LLMClient, LLMScheduler, get_llm_scheduler
+from .llm_router import ProviderRouter, get_provider_stats
+from .agent_registry import AgentRegistry, get_agent, get_agent_registry, close_agents
 
 __all__ = [
     'BaseAgent',
     'AgentMetrics',
     'AgentConfig',
     'APIClient',
+    'AsyncAPIClient',
     'RateLimiter',
     'APICache',
+    'get_rate_limiter',
+    'get_rate_limiter_stats',
     'RestaurantDataCleaner',
     'RestaurantMatcher',
-    'LLMClient'
+    'CandidateBlocker',
+    'RestaurantBatch',
+    'as_batch',
+    'as_batches',
+    'EntityResolver',
+    'UnionFind',
+    'KVCache',
+    'MemoryCache',
+    'SingleFlight',
+    'AsyncSingleFlight',
+    'get_kv_cache',
+    'EmbeddingCache',
+    'get_embedding_cache',
+    'ResponseCache',
+    'get_response_cache',
+    'LLMClient',
+    'LLMScheduler',
+    'get_llm_scheduler',
+    'ProviderRouter',
+    'get_provider_stats',
+    'AgentRegistry',
+    'get_agent',
+    'get_agent_registry',
+    'close_agents'
 ]
@@ -8,8 +8,10 @@ with standardized interfaces, error handling, and monitoring capabilities.
 import os
 import json
 import time
+import asyncio
 import logging
 import traceback
+import contextvars
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional, Union, Callable
 from datetime import datetime
@@ -61,6 +63,11 @@ class AgentMetrics:
         self.custom_metrics[name] = value
         return self
 
+    def add_cache_stats(self, name: str, stats: Dict[str, Any]):
+        """Add hit/miss/eviction counters for a cache."""
+        self.custom_metrics.setdefault("cache", {})[name] = stats
+        return self
+
     def increment_step(self):
         """Increment the steps executed counter."""
         self.steps_executed += 1
@@ -198,8 +205,11 @@ class BaseAgent(ABC):
         # Set up configuration
         self.config = AgentConfig(config_path, self._get_default_config())
 
-        # Set up metrics
-        self.metrics = AgentMetrics()
+        # Metrics of the execution running in the current context; agents are shared
+        # across requests, so each execution gets its own (see _start_execution)
+        self._metrics: contextvars.ContextVar = contextvars.ContextVar(
+            f"{self.__class__.__name__}_metrics", default=None
+        )
 
         # Initialize cache directory
         cache_dir = self.config.get("cache_dir", "cache")
@@ -251,7 +261,12 @@ class BaseAgent(ABC):
                     "api_keys": {
                         "openai": self.config.get("api_keys.openai", ""),
                         "deepseek": self.config.get("api_keys.deepseek", "")
-                    }
+                    },
+                    "http": self.config.get("llm.http", {}),
+                    "embeddings": self.config.get("llm.embeddings", {}),
+                    "response_cache": self.config.get("llm.response_cache", {}),
+                    "routing": self.config.get("llm.routing", {}),
+                    "scheduler": self.config.get("llm.scheduler", {})
                 })
 
     def _get_default_config(self) -> Dict[str, Any]:
@@ -259,10 +274,15 @@ class BaseAgent(ABC):
         return {
             "cache_dir": "cache",
             "cache_duration_hours": 24,
+            "cache_max_stale_hours": 6,  # Serve expired responses this long while they are refreshed
             "log_level": "INFO",
             "timeout": 30,
             "max_retries": 3,
             "retry_delay": 1.0,
+            "rate_limit": {
+                # SQLite file shared by processes that must stay within one quota
+                "state_path": os.environ.get("RATE_LIMIT_STATE_PATH") or None
+            },
             "use_aiq": AIQ_AVAILABLE,
             "aiq_profiler": {
                 "enabled": True,
@@ -284,10 +304,55 @@ class BaseAgent(ABC):
                 "provider": os.environ.get("LLM_PROVIDER", "openai"),  # openai, deepseek, nim
                 "model": os.environ.get("LLM_MODEL", "gpt-4-turbo"),
                 "temperature": float(os.environ.get("LLM_TEMPERATURE", "0.0")),
-                "max_tokens": int(os.environ.get("LLM_MAX_TOKENS", "4096"))
+                "max_tokens": int(os.environ.get("LLM_MAX_TOKENS", "4096")),
+                "http": {
+                    "pool_size": 20,  # Pooled connections per provider
+                    "keepalive_expiry": 60.0,
+                    "connect_timeout": 10.0,
+                    "read_timeout": 60.0
+                },
+                "embeddings": {
+                    "batch_size": 256,  # Inputs per embedding request
+                    "max_concurrency": 4,
+                    "cache": True,  # Persistent embedding store
+                    "cache_dir": os.path.join("cache", "embeddings")
+                },
+                "response_cache": {
+                    "enabled": True,  # Exact-match completion cache
+                    "semantic": False,  # Also match paraphrased prompts with the same cache scope
+                    "ttl_hours": 6,
+                    "similarity_threshold": 0.95,
+                    "cache_dir": "cache"
+                },
+                "routing": {
+                    "enabled": True,  # Latency-aware routing across providers with keys
+                    "hedge": os.environ.get("LLM_HEDGE_REQUESTS", "false").lower() == "true",
+                    "hedge_after_seconds": None  # None: the first provider's p95 latency
+                },
+                "scheduler": {
+                    "enabled": True,  # Async admission control per provider
+                    "max_in_flight": int(os.environ.get("LLM_MAX_IN_FLIGHT", "8")),
+                    "interactive_reserved": 2,
+                    "tokens_per_minute": int(os.environ.get("LLM_TOKENS_PER_MINUTE", "90000"))
+                }
             }
         }
 
+    @property
+    def metrics(self) -> AgentMetrics:
+        """
+        Get the metrics of the current execution.
+
+        Concurrent executions (in other tasks or threads) each see their own
+        metrics. Outside an execution, the metrics are created on first
+        access in the current context.
+        """
+        metrics = self._metrics.get()
+        if metrics is None:
+            metrics = AgentMetrics()
+            self._metrics.set(metrics)
+        return metrics
+
     @abstractmethod
     def run(self, *args, **kwargs) -> Any:
         """Run the agent. Must be implemented by subclasses."""
@@ -300,60 +365,106 @@ class BaseAgent(ABC):
         This is a wrapper around the run method that adds error handling,
         metrics collection, and logging.
         """
-        self.metrics.start()
-        
-        # Start AIQ profiling if available
-        if self.use_aiq and AIQ_AVAILABLE and self.aiq_profiler:
-            self.aiq_profiler.start_profiling()
-        
-        self.logger.info(f"Starting {self.__class__.__name__}")
+        token = self._start_execution()
 
         try:
             result = self.run(*args, **kwargs)
-            
-            # Evaluate result if available and applicable
-            if self.use_aiq and AIQ_AVAILABLE and self.aiq_evaluator:
-                if isinstance(result, dict) and "query" in result and "response" in result:
-                    eval_results = self.aiq_evaluator.evaluate_response(
-                        query=result["query"],
-                        response=result["response"],
-                        criteria=self.config.get("aiq_evaluator.criteria")
-                    )
-                    # Add evaluation results to the result
-                    result["evaluation"] = eval_results
-                    self.metrics.add_custom_metric("evaluation", eval_results)
-            
-            self.metrics.stop(success=True)
-            
-            # End AIQ profiling if available
-            if self.use_aiq and AIQ_AVAILABLE and self.aiq_profiler:
-                aiq_metrics = self.aiq_profiler.end_profiling()
-                self.metrics.add_custom_metric("aiq_profiler", aiq_metrics)
-                
-                # Save profiling results if configured
-                if self.config.get("aiq_profiler.save_results", True):
-                    results_dir = self.config.get("aiq_profiler.results_dir", "metrics/aiq")
-                    os.makedirs(results_dir, exist_ok=True)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filepath = os.path.join(results_dir, f"{self.__class__.__name__}_{timestamp}.json")
-                    self.aiq_profiler.save_profile_results(filepath)
-            
-            self.logger.info(f"Completed {self.__class__.__name__} in {self.metrics.execution_time:.2f}s")
-            return result
+            return self._finish_execution(result)
         except Exception as e:
-            self.metrics.stop(success=False, error=str(e))
-            
-            # End AIQ profiling if available
-            if self.use_aiq and AIQ_AVAILABLE and self.aiq_profiler:
-                aiq_metrics = self.aiq_profiler.end_profiling()
-                self.metrics.add_custom_metric("aiq_profiler", aiq_metrics)
-            
-            self.logger.error(f"Error in {self.__class__.__name__}: {str(e)}")
-            self.logger.debug(traceback.format_exc())
+            self._fail_execution(e)
             raise
         finally:
             # Log metrics
             self._log_metrics()
+            self._metrics.reset(token)
+
+    async def arun(self, *args, **kwargs) -> Any:
+        """
+        Run the agent on the event loop.
+
+        Agents with non-blocking I/O override this; the default runs the
+        synchronous run method in a worker thread.
+        """
+        return await asyncio.to_thread(self.run, *args, **kwargs)
+
+    async def execute_async(self, *args, **kwargs) -> Any:
+        """
+        Execute the agent's arun method with error handling and metrics.
+
+        Async counterpart of execute for use from async request handlers.
+        """
+        token = self._start_execution()
+
+        try:
+            result = await self.arun(*args, **kwargs)
+            return self._finish_execution(result)
+        except Exception as e:
+            self._fail_execution(e)
+            raise
+        finally:
+            # Log metrics
+            self._log_metrics()
+            self._metrics.reset(token)
+
+    def _start_execution(self) -> contextvars.Token:
+        """
+        Start fresh metrics and profiling for an execution.
+
+        Returns:
+            Token restoring the previous metrics when the execution ends
+        """
+        token = self._metrics.set(AgentMetrics().start())
+        
+        # Start AIQ profiling if available
+        if self.use_aiq and AIQ_AVAILABLE and self.aiq_profiler:
+            self.aiq_profiler.start_profiling()
+        
+        self.logger.info(f"Starting {self.__class__.__name__}")
+        return token
+
+    def _finish_execution(self, result: Any) -> Any:
+        """Evaluate a successful result and stop metrics and profiling."""
+        # Evaluate result if available and applicable
+        if self.use_aiq and AIQ_AVAILABLE and self.aiq_evaluator:
+            if isinstance(result, dict) and "query" in result and "response" in result:
+                eval_results = self.aiq_evaluator.evaluate_response(
+                    query=result["query"],
+                    response=result["response"],
+                    criteria=self.config.get("aiq_evaluator.criteria")
+                )
+                # Add evaluation results to the result
+                result["evaluation"] = eval_results
+                self.metrics.add_custom_metric("evaluation", eval_results)
+        
+        self.metrics.stop(success=True)
+        
+        # End AIQ profiling if available
+        if self.use_aiq and AIQ_AVAILABLE and self.aiq_profiler:
+            aiq_metrics = self.aiq_profiler.end_profiling()
+            self.metrics.add_custom_metric("aiq_profiler", aiq_metrics)
+            
+            # Save profiling results if configured
+            if self.config.get("aiq_profiler.save_results", True):
+                results_dir = self.config.get("aiq_profiler.results_dir", "metrics/aiq")
+                os.makedirs(results_dir, exist_ok=True)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filepath = os.path.join(results_dir, f"{self.__class__.__name__}_{timestamp}.json")
+                self.aiq_profiler.save_profile_results(filepath)
+        
+        self.logger.info(f"Completed {self.__class__.__name__} in {self.metrics.execution_time:.2f}s")
+        return result
+
+    def _fail_execution(self, error: Exception):
+        """Record a failed execution."""
+        self.metrics.stop(success=False, error=str(error))
+        
+        # End AIQ profiling if available
+        if self.use_aiq and AIQ_AVAILABLE and self.aiq_profiler:
+            aiq_metrics = self.aiq_profiler.end_profiling()
+            self.metrics.add_custom_metric("aiq_profiler", aiq_metrics)
+        
+        self.logger.error(f"Error in {self.__class__.__name__}: {str(error)}")
+        self.logger.debug(traceback.format_exc())
 
     def _log_metrics(self):
         """Log the agent metrics."""
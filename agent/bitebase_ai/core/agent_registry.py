@@ -0,0 +1,174 @@
+"""
+Agent Registry - Process-wide shared agent instances.
+
+Agents are expensive to build: each one loads its configuration, creates an
+LLM client and opens HTTP connection pools to every platform it talks to.
+The registry builds one agent per (class, config path) on first use and hands
+the same instance to every later caller, so request handlers reuse warm
+agents and their pools instead of constructing new ones. Lifecycle hooks warm
+the agents when a server starts and close their pools when it stops.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Type, TypeVar
+
+logger = logging.getLogger("AgentRegistry")
+
+AgentT = TypeVar("AgentT")
+
+
+class AgentRegistry:
+    """Thread-safe store of shared agents keyed by class and config path."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._agents: Dict[Tuple[type, Optional[str]], Any] = {}
+        self._lock = threading.RLock()
+        self.created = 0
+        self.reused = 0
+
+    def get(self, agent_class: Type[AgentT], config_path: Optional[str] = None) -> AgentT:
+        """
+        Get the shared agent for a class and config path, creating it on first use.
+
+        Construction happens under the registry lock, so concurrent first
+        callers get the same instance. The lock is re-entrant because agents
+        that compose other agents fetch them from the registry while being
+        constructed.
+
+        Args:
+            agent_class: Agent class to instantiate
+            config_path: Path to configuration file passed to the constructor
+
+        Returns:
+            Shared agent instance
+        """
+        key = (agent_class, config_path)
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is None:
+                agent = agent_class(config_path)
+                self._agents[key] = agent
+                self.created += 1
+                logger.info(f"Created shared {agent_class.__name__}")
+            else:
+                self.reused += 1
+            return agent
+
+    def agents(self) -> List[Any]:
+        """Get the registered agents in creation order."""
+        with self._lock:
+            return list(self._agents.values())
+
+    async def warm(self, agent_classes: List[type], config_path: Optional[str] = None):
+        """
+        Create agents and open their connection pools ahead of the first request.
+
+        Agents are built in a worker thread so that startup does not block the
+        event loop; agents with an ``awarm`` coroutine then open their async
+        pools on the running loop.
+
+        Args:
+            agent_classes: Agent classes to create
+            config_path: Path to configuration file passed to the constructors
+        """
+        for agent_class in agent_classes:
+            agent = await asyncio.to_thread(self.get, agent_class, config_path)
+            awarm = getattr(agent, "awarm", None)
+            if awarm is not None:
+                try:
+                    await awarm()
+                except Exception as e:
+                    logger.warning(f"Error warming {agent_class.__name__}: {str(e)}")
+
+    async def aclose(self):
+        """
+        Close the connection pools of every registered agent and forget the agents.
+
+        Agents are closed through ``aclose`` and ``close`` where they define
+        them; a failure closing one agent does not stop the others.
+        """
+        with self._lock:
+            agents = list(self._agents.values())
+            self._agents.clear()
+
+        for agent in agents:
+            for name in ("aclose", "close"):
+                method = getattr(agent, name, None)
+                if method is None:
+                    continue
+                try:
+                    result = method()
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.warning(f"Error closing {type(agent).__name__}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get registry statistics.
+
+        Returns:
+            Dictionary of shared agents and creation/reuse counters
+        """
+        with self._lock:
+            return {
+                "agents": [type(agent).__name__ for agent in self._agents.values()],
+                "created": self.created,
+                "reused": self.reused
+            }
+
+
+# Registry shared by every caller in the process
+_registry = AgentRegistry()
+
+
+def get_agent_registry() -> AgentRegistry:
+    """Get the process-wide agent registry."""
+    return _registry
+
+
+def get_agent(agent_class: Type[AgentT], config_path: Optional[str] = None) -> AgentT:
+    """
+    Get the process-wide shared agent for a class and config path.
+
+    Args:
+        agent_class: Agent class to instantiate on first use
+        config_path: Path to configuration file passed to the constructor
+
+    Returns:
+        Shared agent instance
+    """
+    return _registry.get(agent_class, config_path)
+
+
+async def close_agents():
+    """Close every shared agent and the pooled LLM provider connections."""
+    from .llm_client import close_provider_pools
+
+    await _registry.aclose()
+    await close_provider_pools()
+
+
+def add_lifecycle_hooks(app, agent_classes: List[type], config_path: Optional[str] = None):
+    """
+    Register startup and shutdown hooks for the shared agents on a FastAPI app.
+
+    On startup the agents are created and their pools warmed; on shutdown the
+    agents and the LLM provider pools are closed.
+
+    Args:
+        app: FastAPI application
+        agent_classes: Agent classes to warm on startup
+        config_path: Path to configuration file passed to the constructors
+    """
+    @app.on_event("startup")
+    async def warm_shared_agents():
+        await _registry.warm(agent_classes, config_path)
+
+    @app.on_event("shutdown")
+    async def close_shared_agents():
+        await close_agents()
@@ -8,55 +8,316 @@ handling common concerns like rate limiting, retries, error handling, and cachin
 import os
 import json
 import time
+import asyncio
 import logging
+import sqlite3
 import hashlib
+import threading
 import requests
-from typing import Dict, List, Any, Optional, Union, Callable
-from datetime import datetime, timedelta
+import httpx
+from typing import Dict, List, Any, Optional, Union, Callable, Tuple
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from .kv_cache import get_kv_cache, get_memory_cache, encode_json, StaleDict
+from .singleflight import SingleFlight, AsyncSingleFlight, make_key
+
 logger = logging.getLogger("APIClient")
 
+# In-flight GET requests shared by every client in the process
+_request_flight = SingleFlight()
+_async_request_flight = AsyncSingleFlight()
+
+# Stale cached responses being refreshed in the background, by request key
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+_revalidation_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _start_revalidation(key: str) -> bool:
+    """Claim the background refresh of a request; False if one is already running."""
+    with _revalidating_lock:
+        if key in _revalidating:
+            return False
+        _revalidating.add(key)
+        return True
+
+
+def _finish_revalidation(key: str):
+    """Release the background refresh of a request."""
+    with _revalidating_lock:
+        _revalidating.discard(key)
+
+
+def _get_revalidation_executor() -> ThreadPoolExecutor:
+    """Get the worker pool for background refreshes, creating it on first use."""
+    global _revalidation_executor
+    with _revalidating_lock:
+        if _revalidation_executor is None:
+            _revalidation_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-revalidate")
+        return _revalidation_executor
+
+# HTTP/2 support in httpx needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 class RateLimiter:
-    """Rate limiter for API requests."""
+    """
+    Thread-safe token-bucket rate limiter for API requests.
+    
+    Buckets start full, so up to ``burst`` requests go out back-to-back before
+    requests are spaced at the sustained rate. When ``state_path`` is given the
+    bucket lives in a SQLite database instead of process memory, so every
+    process pointing at the same file shares the quota.
+    """
     
-    def __init__(self, requests_per_minute: int = 60):
+    def __init__(self,
+                 requests_per_minute: int = 60,
+                 burst: int = 1,
+                 key: str = "default",
+                 state_path: Optional[str] = None):
         """
         Initialize the rate limiter.
         
         Args:
             requests_per_minute: Maximum number of requests per minute
+            burst: Number of requests that may be made back-to-back before throttling
+            key: Bucket name, used to share state across processes
+            state_path: SQLite file for cross-process coordination (None for process-local)
         """
         self.requests_per_minute = requests_per_minute
         self.interval = 60.0 / requests_per_minute
-        self.last_request_time = 0
+        self.capacity = max(1, burst)
+        self.key = key
+        self.state_path = state_path
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._db = None
+        
+        # Wait counters, to show how much quota pressure callers are under
+        self.requests = 0
+        self.throttled_requests = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        
+        if state_path:
+            self._init_db()
+    
+    def _init_db(self):
+        """Open the shared bucket database."""
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Autocommit mode so BEGIN IMMEDIATE controls the transactions
+        self._db = sqlite3.connect(self.state_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, last_refill REAL NOT NULL)"
+        )
+    
+    def _take_token(self, tokens: float, elapsed: float) -> Tuple[float, float]:
+        """
+        Refill a bucket for the elapsed time and take one token from it.
+        
+        The bucket may go negative, which queues concurrent callers behind
+        each other instead of letting them all wake up at the same instant.
+        
+        Returns:
+            Tuple of (remaining tokens, seconds to wait)
+        """
+        tokens = min(self.capacity, tokens + max(elapsed, 0.0) / self.interval) - 1
+        if tokens >= 0:
+            return tokens, 0.0
+        return tokens, -tokens * self.interval
+    
+    def _reserve(self) -> float:
+        """
+        Take a token from the bucket.
+        
+        Returns:
+            Seconds the caller must wait before its token becomes valid
+        """
+        with self._lock:
+            if self._db is not None:
+                sleep_time = self._reserve_shared()
+            else:
+                now = time.monotonic()
+                self.tokens, sleep_time = self._take_token(self.tokens, now - self.last_refill)
+                self.last_refill = now
+            
+            self.requests += 1
+            if sleep_time > 0:
+                self.throttled_requests += 1
+                self.total_wait_time += sleep_time
+                self.max_wait_time = max(self.max_wait_time, sleep_time)
+            return sleep_time
+    
+    def _reserve_shared(self) -> float:
+        """Take a token from the bucket in the shared database."""
+        # Wall-clock time, since monotonic clocks are not comparable across processes
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(
+                "SELECT tokens, last_refill FROM rate_limits WHERE key = ?", (self.key,)
+            ).fetchone()
+            tokens, last_refill = row if row else (float(self.capacity), now)
+            tokens, sleep_time = self._take_token(tokens, now - last_refill)
+            self._db.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, tokens, last_refill) VALUES (?, ?, ?)",
+                (self.key, tokens, now)
+            )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return sleep_time
     
     def wait(self):
         """Wait if necessary to comply with rate limits."""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < self.interval:
-            sleep_time = self.interval - time_since_last_request
+        sleep_time = self._reserve()
+        if sleep_time > 0:
             time.sleep(sleep_time)
+    
+    async def wait_async(self):
+        """Wait without blocking the event loop if necessary to comply with rate limits."""
+        # The shared bucket may wait on other processes' SQLite locks, so take it off the loop
+        if self._db is not None:
+            sleep_time = await asyncio.to_thread(self._reserve)
+        else:
+            sleep_time = self._reserve()
+        if sleep_time > 0:
+            await asyncio.sleep(sleep_time)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the wait counters.
         
-        self.last_request_time = time.time()
+        Returns:
+            Dictionary of rate limiter statistics
+        """
+        with self._lock:
+            return {
+                "key": self.key,
+                "requests_per_minute": self.requests_per_minute,
+                "burst": self.capacity,
+                "shared_across_processes": self._db is not None,
+                "requests": self.requests,
+                "throttled_requests": self.throttled_requests,
+                "total_wait_time": self.total_wait_time,
+                "max_wait_time": self.max_wait_time,
+                "avg_wait_time": self.total_wait_time / self.requests if self.requests else 0.0
+            }
+
+
+# Rate limiters shared by every client in the process, keyed by host or API key
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str,
+                     requests_per_minute: int = 60,
+                     burst: int = 1,
+                     state_path: Optional[str] = None) -> RateLimiter:
+    """
+    Get the process-wide rate limiter for a key, creating it on first use.
+    
+    The first caller's limits win; later callers asking for the same key share
+    its bucket so that the quota is enforced across all of them.
+    
+    Args:
+        key: Bucket name, usually the API host
+        requests_per_minute: Maximum number of requests per minute
+        burst: Number of requests that may be made back-to-back before throttling
+        state_path: SQLite file for cross-process coordination (None for process-local)
+        
+    Returns:
+        Shared rate limiter
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(requests_per_minute, burst, key=key, state_path=state_path)
+            _rate_limiters[key] = limiter
+        elif limiter.requests_per_minute != requests_per_minute or limiter.capacity != max(1, burst):
+            logger.debug(
+                f"Rate limiter for {key} already exists at {limiter.requests_per_minute}/min "
+                f"(burst {limiter.capacity}); ignoring {requests_per_minute}/min (burst {burst})"
+            )
+        return limiter
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the wait counters of every shared rate limiter.
+    
+    Returns:
+        Dictionary of rate limiter statistics by key
+    """
+    with _rate_limiters_lock:
+        limiters = list(_rate_limiters.values())
+    return {limiter.key: limiter.get_stats() for limiter in limiters}
+
+
+def create_rate_limiter(base_url: str,
+                        requests_per_minute: int,
+                        burst: int,
+                        key: Optional[str] = None,
+                        state_path: Optional[str] = None) -> RateLimiter:
+    """
+    Get the rate limiter for a client.
+    
+    Clients with a key, or with a base URL to derive the host key from, share
+    the process-wide limiter for it. Clients without either get their own.
+    """
+    key = key or urlparse(base_url).netloc
+    if not key:
+        return RateLimiter(requests_per_minute, burst)
+    return get_rate_limiter(key, requests_per_minute, burst, state_path)
 
 
 class APICache:
-    """Cache for API responses."""
+    """
+    Two-tier cache for API responses.
+    
+    Hot responses are served from a bounded in-memory LRU; everything else
+    comes from the shared SQLite key-value cache on disk. Responses are kept
+    for ``max_stale_hours`` past their expiry so they can be served stale
+    while a refresh is in flight.
+    """
     
-    def __init__(self, cache_dir: str = "cache", duration_hours: int = 24):
+    def __init__(self,
+                 cache_dir: str = "cache",
+                 duration_hours: int = 24,
+                 max_size_mb: int = 512,
+                 memory_cache_mb: int = 64,
+                 max_stale_hours: float = 0.0):
         """
         Initialize the cache.
         
         Args:
-            cache_dir: Directory to store cache files
+            cache_dir: Directory to store the cache database
             duration_hours: Cache duration in hours
+            max_size_mb: Maximum size of all cached responses on disk before LRU eviction
+            memory_cache_mb: Maximum size of responses kept in memory (0 to disable)
+            max_stale_hours: Hours past expiry a response may still be served stale (0 to disable)
         """
         self.cache_dir = cache_dir
         self.duration_hours = duration_hours
-        os.makedirs(cache_dir, exist_ok=True)
+        self.max_stale_hours = max_stale_hours
+        self.store = get_kv_cache(cache_dir, max_size_bytes=max_size_mb * 1024 * 1024)
+        self.memory = get_memory_cache(cache_dir, memory_cache_mb * 1024 * 1024) if memory_cache_mb > 0 else None
+        
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.stale_hits = 0
     
     def _get_cache_key(self, url: str, params: Dict = None, headers: Dict = None) -> str:
         """Generate a cache key from the request details."""
@@ -66,13 +327,14 @@ class APICache:
             request_str += f"?{json.dumps(params, sort_keys=True)}"
         
         # Hash the request string to create a cache key
-        return hashlib.md5(request_str.encode()).hexdigest()
-    
-    def _get_cache_path(self, cache_key: str) -> str:
-        """Get the file path for a cache key."""
-        return os.path.join(self.cache_dir, f"{cache_key}.json")
+        return f"api:{hashlib.md5(request_str.encode()).hexdigest()}"
     
-    def get(self, url: str, params: Dict = None, headers: Dict = None) -> Optional[Dict]:
+    def get(self,
+            url: str,
+            params: Dict = None,
+            headers: Dict = None,
+            allow_stale: bool = False,
+            memory_only: bool = False) -> Optional[Dict]:
         """
         Get cached response if available and not expired.
         
@@ -80,33 +342,39 @@ class APICache:
             url: Request URL
             params: Request parameters
             headers: Request headers
+            allow_stale: Whether to return a response past its expiry but within max_stale_hours
+            memory_only: Whether to skip the on-disk tier (never blocks on SQLite)
             
         Returns:
-            Cached response or None if not available
+            Cached response (a StaleDict if past its expiry) or None if not available
         """
         cache_key = self._get_cache_key(url, params, headers)
-        cache_path = self._get_cache_path(cache_key)
+        allow_stale = allow_stale and self.max_stale_hours > 0
         
-        if not os.path.exists(cache_path):
+        entry = self.memory.get(cache_key, allow_stale) if self.memory else None
+        if entry is not None:
+            data, expires_at = entry
+        elif memory_only:
             return None
-        
-        try:
-            with open(cache_path, 'r') as f:
-                cached_data = json.load(f)
-            
-            # Check if cache is expired
-            cached_time = datetime.fromisoformat(cached_data.get("timestamp", "2000-01-01T00:00:00"))
-            expiration_time = cached_time + timedelta(hours=self.duration_hours)
-            
-            if datetime.now() > expiration_time:
-                logger.debug(f"Cache expired for {url}")
+        else:
+            disk_entry = self.store.get_raw(cache_key, allow_stale)
+            if disk_entry is None:
+                self.disk_misses += 1
                 return None
             
-            logger.debug(f"Cache hit for {url}")
-            return cached_data.get("data")
-        except Exception as e:
-            logger.warning(f"Error reading cache for {url}: {str(e)}")
-            return None
+            self.disk_hits += 1
+            data, expires_at, stale_until = disk_entry
+            if self.memory:
+                self.memory.set(cache_key, data, expires_at, stale_until)
+        
+        value = json.loads(data)
+        if expires_at <= time.time() and isinstance(value, dict):
+            logger.debug(f"Stale cache hit for {url}")
+            self.stale_hits += 1
+            return StaleDict(value)
+        
+        logger.debug(f"Cache hit for {url}")
+        return value
     
     def set(self, url: str, params: Dict = None, headers: Dict = None, data: Any = None):
         """
@@ -122,22 +390,32 @@ class APICache:
             return
         
         cache_key = self._get_cache_key(url, params, headers)
-        cache_path = self._get_cache_path(cache_key)
-        
+        ttl_seconds = self.duration_hours * 3600
+        max_stale_seconds = self.max_stale_hours * 3600
         try:
-            cache_data = {
-                "timestamp": datetime.now().isoformat(),
-                "url": url,
-                "params": params,
-                "data": data
-            }
-            
-            with open(cache_path, 'w') as f:
-                json.dump(cache_data, f, indent=2)
-            
-            logger.debug(f"Cached response for {url}")
-        except Exception as e:
+            payload = encode_json(data)
+        except (TypeError, ValueError) as e:
             logger.warning(f"Error caching response for {url}: {str(e)}")
+            return
+        
+        if self.memory:
+            expires_at = time.time() + ttl_seconds
+            self.memory.set(cache_key, payload, expires_at, expires_at + max_stale_seconds)
+        self.store.set_raw(cache_key, payload, ttl_seconds, max_stale_seconds)
+        logger.debug(f"Cached response for {url}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit, miss and eviction counters for both tiers.
+        
+        Returns:
+            Dictionary of cache statistics
+        """
+        return {
+            "memory": self.memory.get_stats() if self.memory else None,
+            "disk": {"hits": self.disk_hits, "misses": self.disk_misses},
+            "stale_hits": self.stale_hits
+        }
 
 
 class APIClient:
@@ -149,9 +427,13 @@ class APIClient:
                  cache_dir: str = "cache",
                  cache_duration_hours: int = 24,
                  requests_per_minute: int = 60,
+                 burst: int = 1,
                  timeout: int = 30,
                  max_retries: int = 3,
-                 retry_delay: float = 1.0):
+                 retry_delay: float = 1.0,
+                 rate_limit_key: Optional[str] = None,
+                 rate_limit_state_path: Optional[str] = None,
+                 cache_max_stale_hours: float = 0.0):
         """
         Initialize the API client.
         
@@ -161,9 +443,13 @@ class APIClient:
             cache_dir: Directory to store cache files
             cache_duration_hours: Cache duration in hours
             requests_per_minute: Maximum number of requests per minute
+            burst: Number of requests that may be made back-to-back before throttling
             timeout: Request timeout in seconds
             max_retries: Maximum number of retries for failed requests
             retry_delay: Delay between retries in seconds
+            rate_limit_key: Rate limit bucket shared with other clients (default: host of base_url)
+            rate_limit_state_path: SQLite file for sharing the rate limit across processes
+            cache_max_stale_hours: Hours past expiry a cached response is served while it is refreshed
         """
         self.base_url = base_url
         self.headers = headers or {}
@@ -172,8 +458,10 @@ class APIClient:
         self.retry_delay = retry_delay
         
         # Initialize rate limiter and cache
-        self.rate_limiter = RateLimiter(requests_per_minute)
-        self.cache = APICache(cache_dir, cache_duration_hours)
+        self.rate_limiter = create_rate_limiter(
+            base_url, requests_per_minute, burst, rate_limit_key, rate_limit_state_path
+        )
+        self.cache = APICache(cache_dir, cache_duration_hours, max_stale_hours=cache_max_stale_hours)
         
         # Session for connection pooling
         self.session = requests.Session()
@@ -200,16 +488,53 @@ class APIClient:
         url = f"{self.base_url}{endpoint}" if self.base_url else endpoint
         merged_headers = {**self.headers, **(headers or {})}
         
+        flight_key = make_key("GET", url, params, merged_headers)
+        
         # Check cache first if enabled
         if use_cache:
-            cached_data = self.cache.get(url, params, merged_headers)
+            cached_data = self.cache.get(url, params, merged_headers, allow_stale=True)
             if cached_data:
+                # Serve an expired response now and refresh it off the request path
+                if getattr(cached_data, "stale", False) and not cache_only:
+                    self._revalidate(flight_key, url, params, merged_headers)
                 return cached_data
             
             if cache_only:
                 logger.warning(f"Cache miss for {url} and cache_only=True")
                 return {}
         
+        # Identical concurrent requests share one upstream call
+        return _request_flight.do(flight_key, self._fetch, url, params, merged_headers, use_cache)
+    
+    def _revalidate(self, flight_key: str, url: str, params: Dict, headers: Dict):
+        """Refresh a stale cached response on a background worker."""
+        if not _start_revalidation(flight_key):
+            return
+        
+        def refresh():
+            try:
+                _request_flight.do(flight_key, self._fetch, url, params, headers, True)
+                logger.debug(f"Revalidated cached response for {url}")
+            except Exception as e:
+                logger.warning(f"Error revalidating cached response for {url}: {str(e)}")
+            finally:
+                _finish_revalidation(flight_key)
+        
+        _get_revalidation_executor().submit(refresh)
+    
+    def _fetch(self, url: str, params: Dict, headers: Dict, use_cache: bool) -> Dict:
+        """
+        Make a GET request with rate limiting and retries, and cache the response.
+        
+        Args:
+            url: Full request URL
+            params: Query parameters
+            headers: Merged request headers
+            use_cache: Whether to cache the response
+            
+        Returns:
+            Response data as dictionary
+        """
         # Wait for rate limiting
         self.rate_limiter.wait()
         
@@ -220,7 +545,7 @@ class APIClient:
                 response = self.session.get(
                     url, 
                     params=params, 
-                    headers=merged_headers,
+                    headers=headers,
                     timeout=self.timeout
                 )
                 
@@ -232,7 +557,7 @@ class APIClient:
                 
                 # Cache the response if enabled
                 if use_cache:
-                    self.cache.set(url, params, merged_headers, data)
+                    self.cache.set(url, params, headers, data)
                 
                 return data
             except requests.exceptions.RequestException as e:
@@ -295,3 +620,290 @@ class APIClient:
                 
                 logger.warning(f"Retry {retries}/{self.max_retries} for {url}: {str(e)}")
                 time.sleep(self.retry_delay * retries)  # Exponential backoff
+    
+    def close(self):
+        """Close the pooled HTTP session."""
+        self.session.close()
+
+
+class AsyncAPIClient:
+    """
+    Asynchronous counterpart of APIClient.
+    
+    Requests go through a single pooled ``httpx.AsyncClient`` (HTTP/2 when
+    available) with keep-alive, a bounded connection pool and a per-host
+    concurrency limit, so many calls can be in flight at once without threads.
+    Caching and retry behaviour match APIClient.
+    """
+    
+    def __init__(self, 
+                 base_url: str = "", 
+                 headers: Dict = None, 
+                 cache_dir: str = "cache",
+                 cache_duration_hours: int = 24,
+                 requests_per_minute: int = 60,
+                 burst: int = 1,
+                 timeout: int = 30,
+                 max_retries: int = 3,
+                 retry_delay: float = 1.0,
+                 rate_limit_key: Optional[str] = None,
+                 rate_limit_state_path: Optional[str] = None,
+                 cache_max_stale_hours: float = 0.0,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 max_concurrency_per_host: int = 10,
+                 http2: bool = True):
+        """
+        Initialize the async API client.
+        
+        Args:
+            base_url: Base URL for all requests
+            headers: Default headers for all requests
+            cache_dir: Directory to store cache files
+            cache_duration_hours: Cache duration in hours
+            requests_per_minute: Maximum number of requests per minute
+            burst: Number of requests that may be made back-to-back before throttling
+            timeout: Request timeout in seconds
+            max_retries: Maximum number of retries for failed requests
+            retry_delay: Delay between retries in seconds
+            rate_limit_key: Rate limit bucket shared with other clients (default: host of base_url)
+            rate_limit_state_path: SQLite file for sharing the rate limit across processes
+            cache_max_stale_hours: Hours past expiry a cached response is served while it is refreshed
+            max_connections: Maximum number of open connections in the pool
+            max_keepalive_connections: Maximum number of idle connections kept alive
+            keepalive_expiry: Seconds an idle connection is kept alive
+            max_concurrency_per_host: Maximum number of in-flight requests per host
+            http2: Whether to negotiate HTTP/2 (requires the h2 package)
+        """
+        self.base_url = base_url
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_concurrency_per_host = max_concurrency_per_host
+        
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("h2 not installed, falling back to HTTP/1.1. Install with: pip install 'httpx[http2]'")
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        
+        # Initialize rate limiter and cache
+        self.rate_limiter = create_rate_limiter(
+            base_url, requests_per_minute, burst, rate_limit_key, rate_limit_state_path
+        )
+        self.cache = APICache(cache_dir, cache_duration_hours, max_stale_hours=cache_max_stale_hours)
+        
+        # The pooled client is bound to the event loop it is first used on
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._revalidations: set = set()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._discard_client()
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout
+            )
+            self._client_loop = loop
+            self._host_semaphores = {}
+        return self._client
+    
+    def _discard_client(self):
+        """Close the pooled client of a previous event loop on the loop that owns it."""
+        client, client_loop = self._client, self._client_loop
+        self._client = None
+        self._client_loop = None
+        if client is None or client.is_closed:
+            return
+        
+        if client_loop is not None and not client_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(client.aclose(), client_loop)
+        else:
+            # The owning loop is gone, so its connections can no longer be closed cleanly
+            logger.debug("Dropping pooled HTTP client of a closed event loop")
+    
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Get the concurrency limiter for the host of a URL."""
+        host = httpx.URL(url).host
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_concurrency_per_host)
+        return self._host_semaphores[host]
+    
+    async def _request(self, method: str, url: str, **kwargs) -> Dict:
+        """
+        Make a request with rate limiting, per-host concurrency limits and retries.
+        
+        Args:
+            method: HTTP method
+            url: Full request URL
+            **kwargs: Arguments passed through to httpx
+            
+        Returns:
+            Response data as dictionary
+        """
+        client = self._get_client()
+        semaphore = self._get_host_semaphore(url)
+        
+        # Wait for rate limiting
+        await self.rate_limiter.wait_async()
+        
+        # Make the request with retries
+        retries = 0
+        while retries <= self.max_retries:
+            try:
+                async with semaphore:
+                    response = await client.request(method, url, **kwargs)
+                
+                # Raise for status
+                response.raise_for_status()
+                
+                # Parse JSON response
+                return response.json()
+            except httpx.HTTPError as e:
+                retries += 1
+                if retries > self.max_retries:
+                    logger.error(f"Failed request to {url} after {self.max_retries} retries: {str(e)}")
+                    raise
+                
+                logger.warning(f"Retry {retries}/{self.max_retries} for {url}: {str(e)}")
+                await asyncio.sleep(self.retry_delay * retries)  # Exponential backoff
+    
+    async def get(self, 
+                  endpoint: str, 
+                  params: Dict = None, 
+                  headers: Dict = None, 
+                  use_cache: bool = True,
+                  cache_only: bool = False) -> Dict:
+        """
+        Make a GET request.
+        
+        Args:
+            endpoint: API endpoint (will be appended to base_url)
+            params: Query parameters
+            headers: Request headers (will be merged with default headers)
+            use_cache: Whether to use cache
+            cache_only: Whether to only use cache (no API request)
+            
+        Returns:
+            Response data as dictionary
+        """
+        url = f"{self.base_url}{endpoint}" if self.base_url else endpoint
+        merged_headers = {**self.headers, **(headers or {})}
+        
+        flight_key = make_key("GET", url, params, merged_headers)
+        
+        # Check cache first if enabled
+        if use_cache:
+            # Hot responses come from memory; the SQLite tier is read off the event loop
+            cached_data = self.cache.get(url, params, merged_headers, allow_stale=True, memory_only=True)
+            if cached_data is None:
+                cached_data = await asyncio.to_thread(self.cache.get, url, params, merged_headers, True)
+            if cached_data:
+                # Serve an expired response now and refresh it off the request path
+                if getattr(cached_data, "stale", False) and not cache_only:
+                    self._revalidate(flight_key, url, params, merged_headers)
+                return cached_data
+            
+            if cache_only:
+                logger.warning(f"Cache miss for {url} and cache_only=True")
+                return {}
+        
+        # Identical concurrent requests share one upstream call
+        return await _async_request_flight.do(flight_key, self._fetch, url, params, merged_headers, use_cache)
+    
+    def _revalidate(self, flight_key: str, url: str, params: Dict, headers: Dict):
+        """Refresh a stale cached response in a background task."""
+        if not _start_revalidation(flight_key):
+            return
+        
+        async def refresh():
+            try:
+                await _async_request_flight.do(flight_key, self._fetch, url, params, headers, True)
+                logger.debug(f"Revalidated cached response for {url}")
+            except Exception as e:
+                logger.warning(f"Error revalidating cached response for {url}: {str(e)}")
+            finally:
+                _finish_revalidation(flight_key)
+        
+        # Keep a reference so the task is not garbage collected mid-flight
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._revalidations.add(task)
+        task.add_done_callback(self._revalidations.discard)
+    
+    async def _fetch(self, url: str, params: Dict, headers: Dict, use_cache: bool) -> Dict:
+        """
+        Make a GET request and cache the response.
+        
+        Args:
+            url: Full request URL
+            params: Query parameters
+            headers: Merged request headers
+            use_cache: Whether to cache the response
+            
+        Returns:
+            Response data as dictionary
+        """
+        data = await self._request("GET", url, params=params, headers=headers)
+        
+        # Cache the response if enabled
+        if use_cache:
+            await asyncio.to_thread(self.cache.set, url, params, headers, data)
+        
+        return data
+    
+    async def post(self, 
+                   endpoint: str, 
+                   data: Dict = None, 
+                   json_data: Dict = None,
+                   params: Dict = None, 
+                   headers: Dict = None) -> Dict:
+        """
+        Make a POST request.
+        
+        Args:
+            endpoint: API endpoint (will be appended to base_url)
+            data: Form data
+            json_data: JSON data
+            params: Query parameters
+            headers: Request headers (will be merged with default headers)
+            
+        Returns:
+            Response data as dictionary
+        """
+        url = f"{self.base_url}{endpoint}" if self.base_url else endpoint
+        merged_headers = {**self.headers, **(headers or {})}
+        
+        return await self._request(
+            "POST", url,
+            data=data,
+            json=json_data,
+            params=params,
+            headers=merged_headers
+        )
+    
+    async def aopen(self):
+        """Open the pooled HTTP client on the running event loop ahead of the first request."""
+        self._get_client()
+    
+    async def aclose(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+    
+    async def __aenter__(self) -> "AsyncAPIClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
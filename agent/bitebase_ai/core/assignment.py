@@ -0,0 +1,153 @@
+"""
+Assignment - Globally optimal one-to-one matching over candidate pairs.
+
+Greedy matching keeps the best candidate of every base restaurant on its own,
+so one restaurant of another platform can be claimed by several base
+restaurants. The assignment here picks the set of pairs with the highest
+total score in which every restaurant appears at most once.
+
+It is solved as a sparse linear assignment problem with shortest augmenting
+paths (Jonker-Volgenant): each row gets a private "unmatched" column costing
+as much as a zero score, pairs cost ``1 - score``, and rows are added one at
+a time with a Dijkstra search over the candidate pairs only. Since a row
+pushed off its column can always fall back to its unmatched column, each
+search stays within the neighbourhood of the new row, which keeps the solver
+fast on tens of thousands of blocked restaurants.
+"""
+
+import heapq
+import logging
+from typing import List
+
+import numpy as np
+
+logger = logging.getLogger("Assignment")
+
+
+def assign_pairs(rows: np.ndarray,
+                 cols: np.ndarray,
+                 scores: np.ndarray,
+                 n_rows: int,
+                 min_score: float) -> np.ndarray:
+    """
+    Pick the one-to-one set of pairs with the highest total score.
+
+    Rows are assigned in index order and ties are broken by column index,
+    so the same pairs always give the same mapping.
+
+    Args:
+        rows: Row index of each pair
+        cols: Column index of each pair
+        scores: Score of each pair, between 0 and 1
+        n_rows: Number of rows
+        min_score: Minimum score of an assigned pair
+
+    Returns:
+        Array of pair positions per row, -1 for unassigned rows
+    """
+    assigned = np.full(n_rows, -1, dtype=np.int64)
+    positions = np.flatnonzero((scores >= min_score) & (scores > 0))
+    if not len(positions):
+        return assigned
+
+    # Group the kept pairs by row (stable, so each row keeps its pair order)
+    positions = positions[np.argsort(rows[positions], kind="stable")]
+    pair_rows = rows[positions]
+    indptr = np.searchsorted(pair_rows, np.arange(n_rows + 1)).tolist()
+
+    # Real columns are renumbered 0..n_cols-1; row i's unmatched column is n_cols + i
+    col_ids, pair_cols = np.unique(cols[positions], return_inverse=True)
+    n_cols = len(col_ids)
+    pair_cols = pair_cols.ravel().tolist()
+    pair_costs = (1.0 - scores[positions]).tolist()
+
+    row_cols: List[List[int]] = []
+    row_costs: List[List[float]] = []
+    for row in range(n_rows):
+        start, end = indptr[row], indptr[row + 1]
+        row_cols.append(pair_cols[start:end] + [n_cols + row])
+        row_costs.append(pair_costs[start:end] + [1.0])
+
+    potential = [0.0] * (n_cols + n_rows)  # Column potentials
+    col_owner = [-1] * (n_cols + n_rows)  # Row assigned to each column
+    row_choice = [-1] * n_rows  # Position in row_cols of each row's column
+
+    for start_row in range(n_rows):
+        if indptr[start_row] == indptr[start_row + 1]:
+            continue
+        _augment(start_row, row_cols, row_costs, potential, col_owner, row_choice)
+
+    for row in range(n_rows):
+        choice = row_choice[row]
+        if 0 <= choice < len(row_cols[row]) - 1:
+            assigned[row] = positions[indptr[row] + choice]
+
+    return assigned
+
+
+def _augment(start_row: int,
+             row_cols: List[List[int]],
+             row_costs: List[List[float]],
+             potential: List[float],
+             col_owner: List[int],
+             row_choice: List[int]):
+    """
+    Assign a new row along the shortest augmenting path.
+
+    Dijkstra runs over reduced costs ``cost - row potential - column
+    potential``, which stay non-negative (and zero on assigned pairs)
+    thanks to the potential update after each augmentation.
+
+    Args:
+        start_row: Row to assign
+        row_cols: Columns of each row's pairs, the unmatched column last
+        row_costs: Costs of each row's pairs
+        potential: Column potentials, updated in place
+        col_owner: Row assigned to each column, updated in place
+        row_choice: Position of each row's column in its pair list, updated in place
+    """
+    distance = {}  # Tentative distance of each reached column
+    via = {}  # (row, position in its pair list) each column was reached from
+    final = set()  # Columns whose distance is final
+    heap = []
+
+    def scan(row: int, row_distance: float):
+        cols, costs = row_cols[row], row_costs[row]
+        if row_choice[row] >= 0:
+            choice = row_choice[row]
+            row_potential = costs[choice] - potential[cols[choice]]
+        else:
+            row_potential = min(cost - potential[col] for col, cost in zip(cols, costs))
+
+        for position, (col, cost) in enumerate(zip(cols, costs)):
+            if col in final:
+                continue
+            reduced = row_distance + cost - row_potential - potential[col]
+            if reduced < distance.get(col, float("inf")):
+                distance[col] = reduced
+                via[col] = (row, position)
+                heapq.heappush(heap, (reduced, col))
+
+    scan(start_row, 0.0)
+    while True:
+        col_distance, col = heapq.heappop(heap)
+        if col in final or col_distance > distance[col]:
+            continue
+        if col_owner[col] < 0:
+            break
+        final.add(col)
+        scan(col_owner[col], col_distance)
+
+    # Keep reduced costs non-negative and tight for the new assignment
+    for scanned in final:
+        potential[scanned] += distance[scanned] - col_distance
+
+    # Flip the assignments along the path back to the start row
+    while True:
+        row, position = via[col]
+        previous = row_cols[row][row_choice[row]] if row_choice[row] >= 0 else -1
+        col_owner[col] = row
+        row_choice[row] = position
+        if row == start_row:
+            break
+        col = previous
@@ -0,0 +1,333 @@
+"""
+Candidate Blocking - Spatial and name-based candidate selection for restaurant matching.
+
+This module provides indexes that cut down the number of restaurant pairs a
+matcher has to score. Restaurants with coordinates are bucketed into a uniform
+lat/lon grid so that only neighbours within a configurable distance are
+returned; restaurants without coordinates fall back to name blocks: a shared
+name token prefix or the same phonetic name key, which catches spacing and
+transliteration variants ("mcdonalds"/"mc donalds", "ส้มตำ"/"somtam").
+"""
+
+import math
+import logging
+from typing import Dict, List, Optional, Set, Tuple, Callable, Union
+
+from .data_processor import phonetic_key
+from .geo import haversine_one_to_many
+from .restaurant_batch import RestaurantBatch
+
+logger = logging.getLogger("CandidateBlocking")
+
+# Kilometres per degree of latitude (and of longitude at the equator)
+KM_PER_DEGREE = 111.32
+
+
+def get_coordinates(restaurant: Dict) -> Optional[Tuple[float, float]]:
+    """
+    Extract valid coordinates from a restaurant record.
+
+    Args:
+        restaurant: Restaurant data
+
+    Returns:
+        Tuple of (latitude, longitude) or None if missing or invalid
+    """
+    lat = restaurant.get("latitude")
+    lon = restaurant.get("longitude")
+    if lat is None or lon is None:
+        return None
+
+    try:
+        lat = float(lat)
+        lon = float(lon)
+    except (TypeError, ValueError):
+        return None
+
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+
+    return lat, lon
+
+
+class GridIndex:
+    """Uniform lat/lon grid for fixed-radius neighbour queries."""
+
+    def __init__(self, cell_size_km: float = 1.0):
+        """
+        Initialize the grid.
+
+        Args:
+            cell_size_km: Edge length of a grid cell in kilometers (measured at the equator)
+        """
+        if cell_size_km <= 0:
+            raise ValueError("cell_size_km must be positive")
+
+        self.cell_size_deg = cell_size_km / KM_PER_DEGREE
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.points: Dict[int, Tuple[float, float]] = {}
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """Get the grid cell containing a point."""
+        return (
+            int(math.floor(latitude / self.cell_size_deg)),
+            int(math.floor(longitude / self.cell_size_deg))
+        )
+
+    def add(self, item_id: int, latitude: float, longitude: float):
+        """
+        Add a point to the index.
+
+        Args:
+            item_id: Identifier returned by queries
+            latitude: Point latitude
+            longitude: Point longitude
+        """
+        self.cells.setdefault(self._cell(latitude, longitude), []).append(item_id)
+        self.points[item_id] = (latitude, longitude)
+
+    def query(self, latitude: float, longitude: float, radius_km: float) -> List[int]:
+        """
+        Find all indexed points within a radius.
+
+        Args:
+            latitude: Query latitude
+            longitude: Query longitude
+            radius_km: Search radius in kilometers
+
+        Returns:
+            Sorted list of item ids within the radius
+        """
+        # Longitude degrees shrink towards the poles, so widen the column span
+        lat_span = radius_km / KM_PER_DEGREE
+        lon_span = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+
+        row, col = self._cell(latitude, longitude)
+        row_reach = int(math.ceil(lat_span / self.cell_size_deg))
+        col_reach = int(math.ceil(lon_span / self.cell_size_deg))
+
+        item_ids = []
+        for r in range(row - row_reach, row + row_reach + 1):
+            for c in range(col - col_reach, col + col_reach + 1):
+                item_ids.extend(self.cells.get((r, c), ()))
+
+        if not item_ids:
+            return []
+
+        # Exact distance check over the gathered cells in one batch
+        distances = haversine_one_to_many(
+            latitude, longitude,
+            [self.points[item_id][0] for item_id in item_ids],
+            [self.points[item_id][1] for item_id in item_ids]
+        )
+        return sorted(item_id for item_id, distance in zip(item_ids, distances) if distance <= radius_km)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+
+class TokenPrefixIndex:
+    """Inverted index from name token prefixes to items."""
+
+    def __init__(self, prefix_length: int = 3):
+        """
+        Initialize the index.
+
+        Args:
+            prefix_length: Number of leading characters of each token used as a key
+        """
+        self.prefix_length = prefix_length
+        self.blocks: Dict[str, List[int]] = {}
+
+    def _keys(self, name: str) -> Set[str]:
+        """Get the block keys for a normalized name."""
+        return {token[:self.prefix_length] for token in name.split() if token}
+
+    def add(self, item_id: int, name: str):
+        """
+        Add a name to the index.
+
+        Args:
+            item_id: Identifier returned by queries
+            name: Normalized name
+        """
+        for key in self._keys(name):
+            self.blocks.setdefault(key, []).append(item_id)
+
+    def query(self, name: str) -> Set[int]:
+        """
+        Find all items sharing at least one token prefix with a name.
+
+        Args:
+            name: Normalized name
+
+        Returns:
+            Set of item ids
+        """
+        results = set()
+        for key in self._keys(name):
+            results.update(self.blocks.get(key, ()))
+        return results
+
+
+class KeyIndex:
+    """Inverted index from exact keys (such as phonetic name keys) to items."""
+
+    def __init__(self):
+        """Initialize the index."""
+        self.blocks: Dict[str, List[int]] = {}
+
+    def add(self, item_id: int, key: str):
+        """
+        Add a key to the index (empty keys are not indexed).
+
+        Args:
+            item_id: Identifier returned by queries
+            key: Block key
+        """
+        if key:
+            self.blocks.setdefault(key, []).append(item_id)
+
+    def query(self, key: str) -> List[int]:
+        """
+        Find all items with a key.
+
+        Args:
+            key: Block key
+
+        Returns:
+            List of item ids
+        """
+        return self.blocks.get(key, []) if key else []
+
+
+class CandidateBlocker:
+    """
+    Candidate selection over one platform's restaurants.
+
+    Restaurants with coordinates are only paired with neighbours within
+    ``max_distance_km``. Pairs where either side lacks coordinates are paired
+    when their normalized names share a token prefix or have the same
+    phonetic key. A RestaurantBatch can be indexed and queried in place of a
+    list, in which case its precomputed names, phonetic keys and coordinates
+    are used.
+    """
+
+    def __init__(self,
+                 restaurants: Union[List[Dict], RestaurantBatch],
+                 max_distance_km: float = 1.0,
+                 prefix_length: int = 3,
+                 name_normalizer: Optional[Callable[[str], str]] = None):
+        """
+        Build the indexes for a list of candidate restaurants.
+
+        Args:
+            restaurants: Candidate restaurants, or a batch of them
+            max_distance_km: Maximum distance between restaurants to be considered a candidate pair
+            prefix_length: Token prefix length for the name fallback block
+            name_normalizer: Function used to normalize names before tokenizing (unused for batches)
+        """
+        self.restaurants = restaurants
+        self.max_distance_km = max_distance_km
+        self.name_normalizer = name_normalizer or (lambda name: (name or "").lower())
+
+        self.grid = GridIndex(cell_size_km=max(max_distance_km, 0.01))
+        self.all_names = TokenPrefixIndex(prefix_length)
+        self.unlocated_names = TokenPrefixIndex(prefix_length)
+        self.all_phonetic = KeyIndex()
+        self.unlocated_phonetic = KeyIndex()
+        self.size = 0
+
+        self._index(restaurants)
+
+    def _index(self, restaurants: Union[List[Dict], RestaurantBatch]):
+        """Add restaurants to the indexes, numbered after the already indexed ones."""
+        for index, (name, phonetic, coordinates) in enumerate(self._keys(restaurants), start=self.size):
+            self.all_names.add(index, name)
+            self.all_phonetic.add(index, phonetic)
+            if coordinates:
+                self.grid.add(index, *coordinates)
+            else:
+                self.unlocated_names.add(index, name)
+                self.unlocated_phonetic.add(index, phonetic)
+        self.size += len(restaurants)
+
+        logger.debug(
+            f"Indexed {len(self.grid)} located and "
+            f"{self.size - len(self.grid)} unlocated candidates"
+        )
+
+    def extend(self, restaurants: Union[List[Dict], RestaurantBatch]):
+        """
+        Index more candidate restaurants without rebuilding the indexes.
+
+        The new restaurants get the indexes following the existing ones, and
+        ``restaurants`` becomes the concatenation of both.
+
+        Args:
+            restaurants: Candidate restaurants, or a batch of them
+        """
+        if isinstance(self.restaurants, RestaurantBatch) and isinstance(restaurants, RestaurantBatch):
+            self.restaurants = RestaurantBatch.concat([self.restaurants, restaurants])
+        else:
+            self.restaurants = list(self.restaurants) + list(restaurants)
+
+        self._index(restaurants)
+
+    def _keys(self, restaurants: Union[List[Dict], RestaurantBatch]) -> List[Tuple[str, str, Optional[Tuple[float, float]]]]:
+        """Get the (normalized name, phonetic key, coordinates) blocking keys of restaurants."""
+        if isinstance(restaurants, RestaurantBatch):
+            latitudes = restaurants.latitudes.tolist()
+            longitudes = restaurants.longitudes.tolist()
+            return [
+                (name, phonetic, (lat, lon) if located else None)
+                for name, phonetic, lat, lon, located in zip(
+                    restaurants.names, restaurants.phonetic, latitudes, longitudes, restaurants.has_location.tolist()
+                )
+            ]
+
+        keys = []
+        for restaurant in restaurants:
+            name = self.name_normalizer(restaurant.get("name", ""))
+            keys.append((name, phonetic_key(name), get_coordinates(restaurant)))
+        return keys
+
+    def _query(self, name: str, phonetic: str, coordinates: Optional[Tuple[float, float]]) -> List[int]:
+        """Get the candidate indexes for a restaurant's blocking keys."""
+        if coordinates is None:
+            candidates = self.all_names.query(name)
+            candidates.update(self.all_phonetic.query(phonetic))
+            return sorted(candidates)
+
+        nearby = set(self.grid.query(coordinates[0], coordinates[1], self.max_distance_km))
+        nearby.update(self.unlocated_names.query(name))
+        nearby.update(self.unlocated_phonetic.query(phonetic))
+        return sorted(nearby)
+
+    def candidates(self, restaurant: Dict) -> List[int]:
+        """
+        Get the candidate indexes for a restaurant.
+
+        Args:
+            restaurant: Restaurant to find candidates for
+
+        Returns:
+            Sorted list of indexes into the candidate restaurant list
+        """
+        name = self.name_normalizer(restaurant.get("name", ""))
+        return self._query(name, phonetic_key(name), get_coordinates(restaurant))
+
+    def candidate_pairs(self, restaurants: Union[List[Dict], RestaurantBatch]) -> List[Tuple[int, int]]:
+        """
+        Get all blocked candidate pairs between another list and the indexed restaurants.
+
+        Args:
+            restaurants: Restaurants (or a batch of them) to pair against the indexed candidates
+
+        Returns:
+            List of (restaurant index, candidate index) pairs
+        """
+        pairs = []
+        for index, (name, phonetic, coordinates) in enumerate(self._keys(restaurants)):
+            pairs.extend((index, candidate) for candidate in self._query(name, phonetic, coordinates))
+        return pairs
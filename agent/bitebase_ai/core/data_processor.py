@@ -9,18 +9,23 @@ import re
 import math
 import logging
 import numpy as np
-from typing import Dict, List, Any, Optional, Union, Tuple
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Union, Tuple, Iterable, TYPE_CHECKING
 from datetime import datetime
 
+from .geo import haversine_distance
+
+if TYPE_CHECKING:
+    from .restaurant_batch import RestaurantBatch
+
 logger = logging.getLogger("DataProcessor")
 
 try:
-    from fuzzywuzzy import fuzz
-    from fuzzywuzzy import process as fuzz_process
+    import rapidfuzz  # noqa: F401
     FUZZY_MATCHING_AVAILABLE = True
 except ImportError:
-    logger.warning("fuzzywuzzy not installed. Advanced matching will be limited.")
-    logger.warning("Install with: pip install fuzzywuzzy python-Levenshtein")
+    logger.warning("rapidfuzz not installed. Advanced matching will be limited.")
+    logger.warning("Install with: pip install rapidfuzz")
     FUZZY_MATCHING_AVAILABLE = False
 
 try:
@@ -31,6 +36,204 @@ except ImportError:
     logger.warning("Install with: pip install pandas")
     PANDAS_AVAILABLE = False
 
+try:
+    from pythainlp.tokenize import word_tokenize as thai_word_tokenize
+    THAI_TOKENIZER_AVAILABLE = True
+except ImportError:
+    THAI_TOKENIZER_AVAILABLE = False
+
+# Normalized values kept per normalizer; names repeat across platforms and searches
+NORMALIZE_CACHE_SIZE = 65536
+
+# Generic words dropped from restaurant names when they follow another word
+NAME_SUFFIXES = (
+    "restaurant", "cafe", "coffee", "bistro", "kitchen",
+    "grill", "bar", "pub", "eatery", "diner", "pizzeria"
+)
+
+# Generic Thai words ("restaurant", "shop") dropped from the start of a Thai word run
+THAI_NAME_PREFIXES = ("ร้านอาหาร", "ภัตตาคาร", "ร้าน")
+
+# Common address abbreviations and their standard forms
+ADDRESS_ABBREVIATIONS = {
+    "st": "street",
+    "rd": "road",
+    "ave": "avenue",
+    "blvd": "boulevard"
+}
+
+# Thai block; its vowel and tone marks are not \w, so it is kept explicitly
+_THAI = "\u0E00-\u0E7F"
+
+_NAME_SUFFIX_PATTERN = re.compile(r"\s+(?:" + "|".join(NAME_SUFFIXES) + r")(?=\s|$)")
+_THAI_NAME_PREFIX_PATTERN = re.compile(
+    r"(?:^|(?<=\s))(?:" + "|".join(THAI_NAME_PREFIXES) + rf")(?=[{_THAI}])"
+)
+_PUNCTUATION_PATTERN = re.compile(rf"[^\w\s{_THAI}]")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_ADDRESS_ABBREVIATION_PATTERN = re.compile(r"\b(" + "|".join(ADDRESS_ABBREVIATIONS) + r")\b")
+_ADDRESS_UNIT_PATTERN = re.compile(r"(?:(?:apt|unit)\s*)?#\s*\d+|(?:apt|unit)\s*\d+")
+_SCRIPT_RUN_PATTERN = re.compile(rf"[{_THAI}]+|[^\s{_THAI}]+")
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_name(name: str) -> str:
+    """
+    Normalize a restaurant name into a matching key.
+
+    Lowercases, drops generic suffixes ("cafe", "restaurant", ...) and Thai
+    generic prefixes, strips punctuation while keeping Thai vowel and tone
+    marks, and collapses whitespace. Results are memoized.
+
+    Args:
+        name: Restaurant name
+
+    Returns:
+        Normalized name
+    """
+    if not name:
+        return ""
+
+    name = _NAME_SUFFIX_PATTERN.sub(" ", str(name).lower())
+    name = _THAI_NAME_PREFIX_PATTERN.sub("", name)
+    name = _PUNCTUATION_PATTERN.sub("", name)
+    return _WHITESPACE_PATTERN.sub(" ", name).strip()
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_address(address: str) -> str:
+    """
+    Normalize an address into a matching key.
+
+    Lowercases, expands common abbreviations, drops unit numbers and
+    collapses whitespace. Results are memoized.
+
+    Args:
+        address: Restaurant address
+
+    Returns:
+        Normalized address
+    """
+    if not address:
+        return ""
+
+    address = str(address).lower()
+    address = _ADDRESS_ABBREVIATION_PATTERN.sub(lambda m: ADDRESS_ABBREVIATIONS[m.group(1)], address)
+    address = _ADDRESS_UNIT_PATTERN.sub("", address)
+    return _WHITESPACE_PATTERN.sub(" ", address).strip()
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def tokenize(text: str) -> Tuple[str, ...]:
+    """
+    Split normalized text into word tokens.
+
+    Text is split on whitespace and on boundaries between Thai and other
+    scripts ("ร้านabc" -> "ร้าน", "abc"). Thai is written without spaces
+    between words, so Thai runs are further segmented with pythainlp when
+    it is installed and kept whole otherwise.
+
+    Args:
+        text: Normalized text
+
+    Returns:
+        Tuple of tokens
+    """
+    if not text:
+        return ()
+
+    tokens = []
+    for run in _SCRIPT_RUN_PATTERN.findall(text):
+        if THAI_TOKENIZER_AVAILABLE and "\u0E00" <= run[0] <= "\u0E7F":
+            tokens.extend(token for token in thai_word_tokenize(run, keep_whitespace=False) if token)
+        else:
+            tokens.append(run)
+    return tuple(tokens)
+
+
+# Approximate RTGS romanization of Thai letters; tone marks and silent letters map to ""
+THAI_TRANSLITERATION = {
+    "ก": "k", "ข": "kh", "ฃ": "kh", "ค": "kh", "ฅ": "kh", "ฆ": "kh", "ง": "ng",
+    "จ": "ch", "ฉ": "ch", "ช": "ch", "ซ": "s", "ฌ": "ch", "ญ": "y", "ฎ": "d",
+    "ฏ": "t", "ฐ": "th", "ฑ": "th", "ฒ": "th", "ณ": "n", "ด": "d", "ต": "t",
+    "ถ": "th", "ท": "th", "ธ": "th", "น": "n", "บ": "b", "ป": "p", "ผ": "ph",
+    "ฝ": "f", "พ": "ph", "ฟ": "f", "ภ": "ph", "ม": "m", "ย": "y", "ร": "r",
+    "ฤ": "rue", "ล": "l", "ฦ": "lue", "ว": "w", "ศ": "s", "ษ": "s", "ส": "s",
+    "ห": "h", "ฬ": "l", "อ": "", "ฮ": "h",
+    "ะ": "a", "ั": "a", "า": "a", "ำ": "am", "ิ": "i", "ี": "i", "ึ": "ue",
+    "ื": "ue", "ุ": "u", "ู": "u", "เ": "e", "แ": "ae", "โ": "o", "ใ": "ai",
+    "ไ": "ai", "ๅ": "", "ฯ": "", "ๆ": "", "็": "", "่": "", "้": "", "๊": "",
+    "๋": "", "์": "", "ํ": "", "ฺ": "",
+    "๐": "0", "๑": "1", "๒": "2", "๓": "3", "๔": "4",
+    "๕": "5", "๖": "6", "๗": "7", "๘": "8", "๙": "9"
+}
+_THAI_TRANSLITERATION_TABLE = str.maketrans(THAI_TRANSLITERATION)
+
+# Vowels written before the consonant they follow in speech
+_THAI_PREPOSED_VOWEL_PATTERN = re.compile(r"([เแโใไ])([ก-ฮ])")
+
+# Soundex consonant classes, written as letters so that digits in names stay distinct
+_PHONETIC_CLASSES = str.maketrans(
+    "bfpvcgjkqsxzdtlmnr",
+    "ppppkkkkkkkkttlnnr"
+)
+_PHONETIC_DROP = re.compile(r"[^a-z0-9]")
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def phonetic_key(name: str) -> str:
+    """
+    Get a spelling-insensitive key for a normalized name.
+
+    Thai is transliterated to Latin letters first, so a Thai name and its
+    romanization ("ส้มตำ", "somtam") land on the same key. The letters are
+    then reduced to Soundex consonant classes with vowels, spacing and
+    repeats dropped, which absorbs romanization variants such as ph/f,
+    th/t, "som tam"/"somtam" and doubled letters.
+
+    Args:
+        name: Normalized name
+
+    Returns:
+        Phonetic key
+    """
+    if not name:
+        return ""
+
+    text = _THAI_PREPOSED_VOWEL_PATTERN.sub(r"\2\1", name)
+    text = _PHONETIC_DROP.sub("", text.translate(_THAI_TRANSLITERATION_TABLE))
+    code = []
+    previous = None
+    for char in text.translate(_PHONETIC_CLASSES):
+        if char in "hw":
+            continue
+        if char in "aeiouy":
+            previous = None
+        elif char != previous:
+            code.append(char)
+            previous = char
+    return "".join(code)
+
+
+def normalize_many(values: Iterable[Optional[str]], field: str = "name") -> List[str]:
+    """
+    Normalize a column of names or addresses.
+
+    Args:
+        values: Names or addresses
+        field: "name" or "address"
+
+    Returns:
+        List of normalized keys aligned with the input
+    """
+    if field == "name":
+        normalizer = normalize_name
+    elif field == "address":
+        normalizer = normalize_address
+    else:
+        raise ValueError(f"Unknown field to normalize: {field}")
+    return [normalizer(value) for value in values]
+
 
 class RestaurantDataCleaner:
     """Tools for cleaning and normalizing restaurant data."""
@@ -46,27 +249,7 @@ class RestaurantDataCleaner:
         Returns:
             Cleaned name
         """
-        if not name:
-            return ""
-        
-        # Convert to lowercase
-        name = name.lower()
-        
-        # Remove common suffixes
-        suffixes = [
-            "restaurant", "cafe", "coffee", "bistro", "kitchen", 
-            "grill", "bar", "pub", "eatery", "diner", "pizzeria"
-        ]
-        for suffix in suffixes:
-            name = re.sub(rf"\s+{suffix}(\s+|$)", " ", name)
-        
-        # Remove special characters
-        name = re.sub(r"[^\w\s]", "", name)
-        
-        # Remove extra whitespace
-        name = re.sub(r"\s+", " ", name).strip()
-        
-        return name
+        return normalize_name(name)
     
     @staticmethod
     def clean_address(address: str) -> str:
@@ -79,27 +262,47 @@ class RestaurantDataCleaner:
         Returns:
             Cleaned address
         """
-        if not address:
-            return ""
-        
-        # Convert to lowercase
-        address = address.lower()
-        
-        # Standardize common abbreviations
-        address = re.sub(r"\bst\b", "street", address)
-        address = re.sub(r"\brd\b", "road", address)
-        address = re.sub(r"\bave\b", "avenue", address)
-        address = re.sub(r"\bblvd\b", "boulevard", address)
+        return normalize_address(address)
+    
+    @staticmethod
+    def normalize(name: str) -> str:
+        """
+        Get the memoized matching key of a restaurant name.
         
-        # Remove apartment/unit numbers
-        address = re.sub(r"#\s*\d+", "", address)
-        address = re.sub(r"apt\s*\d+", "", address)
-        address = re.sub(r"unit\s*\d+", "", address)
+        Args:
+            name: Restaurant name
+            
+        Returns:
+            Normalized name
+        """
+        return normalize_name(name)
+    
+    @staticmethod
+    def normalize_many(values: Iterable[Optional[str]], field: str = "name") -> List[str]:
+        """
+        Normalize a column of names or addresses.
         
-        # Remove extra whitespace
-        address = re.sub(r"\s+", " ", address).strip()
+        Args:
+            values: Names or addresses
+            field: "name" or "address"
+            
+        Returns:
+            List of normalized keys aligned with the input
+        """
+        return normalize_many(values, field)
+    
+    @staticmethod
+    def tokenize(text: str) -> Tuple[str, ...]:
+        """
+        Split normalized text into word tokens (Thai-aware).
         
-        return address
+        Args:
+            text: Normalized text
+            
+        Returns:
+            Tuple of tokens
+        """
+        return tokenize(text)
     
     @staticmethod
     def normalize_cuisine_types(cuisine_types: List[str]) -> List[str]:
@@ -211,42 +414,62 @@ class RestaurantDataCleaner:
 class RestaurantMatcher:
     """Tools for matching restaurants across different platforms."""
     
-    def __init__(self):
-        """Initialize the matcher."""
+    def __init__(self, max_distance_km: Optional[float] = 2.0, assignment: str = "greedy"):
+        """
+        Initialize the matcher.
+        
+        Args:
+            max_distance_km: Only score located restaurants within this distance of
+                each other (None scores every pair)
+            assignment: "greedy" to keep the best candidate per base restaurant, or
+                "optimal" to match each platform to the base one-to-one
+        """
+        if assignment not in ("greedy", "optimal"):
+            raise ValueError(f"Unknown assignment mode: {assignment}")
+        
         self.cleaner = RestaurantDataCleaner()
+        self.max_distance_km = max_distance_km
+        self.assignment = assignment
     
     def match_restaurants(self, 
-                         restaurant_lists: Dict[str, List[Dict]], 
+                         restaurant_lists: Dict[str, Union[List[Dict], "RestaurantBatch"]], 
                          threshold: float = 0.7) -> List[Dict]:
         """
         Match restaurants across different platforms.
         
         Args:
-            restaurant_lists: Dictionary of lists of restaurants from different platforms
+            restaurant_lists: Dictionary of restaurant lists (or already ingested
+                RestaurantBatches) from different platforms
             threshold: Minimum similarity score to consider a match
             
         Returns:
             List of matched restaurants with data from all available platforms
         """
+        # Imported here because restaurant_batch builds on this module's normalizers
+        from .restaurant_batch import as_batches
+        
+        batches = as_batches(restaurant_lists)
         if FUZZY_MATCHING_AVAILABLE:
-            return self._fuzzy_match_restaurants(restaurant_lists, threshold)
+            return self._fuzzy_match_restaurants(batches, threshold)
         else:
-            return self._basic_match_restaurants(restaurant_lists, threshold)
+            return self._basic_match_restaurants(batches, threshold)
     
     def _fuzzy_match_restaurants(self, 
-                               restaurant_lists: Dict[str, List[Dict]], 
+                               restaurant_lists: Dict[str, "RestaurantBatch"], 
                                threshold: float = 0.7) -> List[Dict]:
         """
         Match restaurants using fuzzy string matching.
         
         Args:
-            restaurant_lists: Dictionary of lists of restaurants from different platforms
+            restaurant_lists: Dictionary of restaurant batches from different platforms
             threshold: Minimum similarity score to consider a match
             
         Returns:
             List of matched restaurants
         """
-        matched_restaurants = []
+        # Imported here because similarity builds on this module's normalizers
+        from .similarity import candidate_pairs, string_similarity, location_similarity, best_per_row
+        from .assignment import assign_pairs
         
         # Skip if no data
         if not restaurant_lists or all(len(v) == 0 for v in restaurant_lists.values()):
@@ -256,77 +479,53 @@ class RestaurantMatcher:
         base_platform = max(restaurant_lists.items(), key=lambda x: len(x[1]))[0]
         base_restaurants = restaurant_lists[base_platform]
         
-        for base_restaurant in base_restaurants:
-            matched_restaurant = {
+        matched_restaurants = [
+            {
                 "base_platform": base_platform,
                 "base_data": base_restaurant,
                 "matches": {}
             }
+            for base_restaurant in base_restaurants
+        ]
+        
+        # Score every blocked candidate pair of each platform against the base in bulk
+        for platform, restaurants in restaurant_lists.items():
+            if platform == base_platform:
+                continue
             
-            # Extract key matching fields
-            base_name = self.cleaner.clean_name(base_restaurant.get("name", ""))
-            base_address = self.cleaner.clean_address(base_restaurant.get("address", ""))
-            base_lat = base_restaurant.get("latitude")
-            base_lon = base_restaurant.get("longitude")
+            rows, cols = candidate_pairs(base_restaurants, restaurants, self.max_distance_km)
+            name_similarity = string_similarity(base_restaurants.names, restaurants.names, rows, cols)
+            address_similarity = string_similarity(base_restaurants.addresses, restaurants.addresses, rows, cols)
             
-            # Try to match with restaurants from other platforms
-            for platform, restaurants in restaurant_lists.items():
-                if platform == base_platform:
-                    continue
-                    
-                best_match = None
-                best_score = 0
-                
-                for restaurant in restaurants:
-                    # Calculate name similarity
-                    name = self.cleaner.clean_name(restaurant.get("name", ""))
-                    name_similarity = fuzz.ratio(base_name, name) / 100.0
-                    
-                    # Calculate address similarity
-                    address = self.cleaner.clean_address(restaurant.get("address", ""))
-                    address_similarity = fuzz.ratio(base_address, address) / 100.0
-                    
-                    # Calculate location proximity (if coordinates available)
-                    location_similarity = 0
-                    if base_lat and base_lon and restaurant.get("latitude") and restaurant.get("longitude"):
-                        distance = self._haversine_distance(
-                            base_lat, base_lon, 
-                            restaurant.get("latitude"), restaurant.get("longitude")
-                        )
-                        # Convert distance to similarity score (closer = higher score)
-                        # 100m or less = 1.0, 1km = 0.5, 2km or more = 0.0
-                        location_similarity = max(0, 1 - (distance / 2.0))
-                    
-                    # Calculate overall match score with weights
-                    score = (
-                        0.5 * name_similarity + 
-                        0.3 * address_similarity + 
-                        0.2 * location_similarity
-                    )
-                    
-                    # Update best match if this is better
-                    if score > best_score and score > threshold:
-                        best_match = restaurant
-                        best_score = score
-                
-                if best_match:
-                    matched_restaurant["matches"][platform] = {
-                        "data": best_match,
-                        "confidence": best_score
-                    }
+            # Convert distance to similarity score (closer = higher score)
+            # 100m or less = 1.0, 1km = 0.5, 2km or more = 0.0
+            location = location_similarity(base_restaurants.pair_distances(restaurants, rows, cols), 2.0)
             
-            matched_restaurants.append(matched_restaurant)
+            # Calculate overall match score with weights, then keep the best match per
+            # base restaurant or the best one-to-one assignment
+            scores = 0.5 * name_similarity + 0.3 * address_similarity + 0.2 * location
+            if self.assignment == "optimal":
+                best = assign_pairs(rows, cols, scores, len(base_restaurants), threshold)
+            else:
+                best = best_per_row(rows, scores, len(base_restaurants), threshold, inclusive=True)
+            
+            for base_index in np.flatnonzero(best >= 0).tolist():
+                pair = best[base_index]
+                matched_restaurants[base_index]["matches"][platform] = {
+                    "data": restaurants[int(cols[pair])],
+                    "confidence": float(scores[pair])
+                }
         
         return matched_restaurants
     
     def _basic_match_restaurants(self, 
-                               restaurant_lists: Dict[str, List[Dict]], 
+                               restaurant_lists: Dict[str, "RestaurantBatch"], 
                                threshold: float = 0.7) -> List[Dict]:
         """
-        Basic matching algorithm when fuzzywuzzy is not available.
+        Basic matching algorithm when rapidfuzz is not available.
         
         Args:
-            restaurant_lists: Dictionary of lists of restaurants from different platforms
+            restaurant_lists: Dictionary of restaurant batches from different platforms
             threshold: Minimum similarity score to consider a match
             
         Returns:
@@ -342,7 +541,7 @@ class RestaurantMatcher:
         base_platform = max(restaurant_lists.items(), key=lambda x: len(x[1]))[0]
         base_restaurants = restaurant_lists[base_platform]
         
-        for base_restaurant in base_restaurants:
+        for base_index, base_restaurant in enumerate(base_restaurants):
             matched_restaurant = {
                 "base_platform": base_platform,
                 "base_data": base_restaurant,
@@ -350,24 +549,18 @@ class RestaurantMatcher:
             }
             
             # Extract key matching fields
-            base_name = self.cleaner.clean_name(base_restaurant.get("name", ""))
-            base_lat = base_restaurant.get("latitude")
-            base_lon = base_restaurant.get("longitude")
+            base_words = base_restaurants.tokens[base_index]
             
             # Try to match with restaurants from other platforms
             for platform, restaurants in restaurant_lists.items():
                 if platform == base_platform:
                     continue
                 
-                for restaurant in restaurants:
-                    name = self.cleaner.clean_name(restaurant.get("name", ""))
-                    lat = restaurant.get("latitude")
-                    lon = restaurant.get("longitude")
-                    
+                # Compute all distances from the base restaurant in one batch
+                distances = base_restaurants.distances_from(base_index, restaurants).tolist()
+                
+                for restaurant, rest_words, distance in zip(restaurants, restaurants.tokens, distances):
                     # Simple name matching (at least 80% of words match)
-                    base_words = set(base_name.split())
-                    rest_words = set(name.split())
-                    
                     if not base_words or not rest_words:
                         continue
                     
@@ -376,8 +569,7 @@ class RestaurantMatcher:
                     
                     # Location match if available (within 200m)
                     location_match_score = 0
-                    if base_lat and base_lon and lat and lon:
-                        distance = self._haversine_distance(base_lat, base_lon, lat, lon)
+                    if not math.isnan(distance):
                         # Convert distance to score (closer = higher score)
                         location_match_score = max(0, 1 - (distance / 0.5))  # 500m scale
                     
@@ -408,14 +600,4 @@ class RestaurantMatcher:
         Returns:
             Distance in kilometers
         """
-        # Convert decimal degrees to radians
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-        
-        # Haversine formula
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        r = 6371  # Radius of earth in kilometers
-        
-        return c * r
+        return haversine_distance(lat1, lon1, lat2, lon2)
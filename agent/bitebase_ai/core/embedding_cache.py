@@ -0,0 +1,257 @@
+"""
+Embedding Cache - Persistent content-addressed store for embedding vectors.
+
+Vectors are keyed by (provider, model, sha256(text)). Each provider/model pair
+gets its own pair of files: a raw float32 matrix with one row per stored text,
+read through a memory map, and an index file listing the SHA-256 digest of the
+text in each row. Both files are append-only, so lookups from other processes
+pick up new rows by re-reading the tail of the index. Batched lookups return
+hits and misses separately so that only misses are sent to the provider.
+"""
+
+import os
+import re
+import struct
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger("EmbeddingCache")
+
+# Index file header: magic, vector dimension
+INDEX_MAGIC = b"BBEMBIX1"
+INDEX_HEADER = struct.Struct("<8sI")
+DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+def text_digest(text: str) -> bytes:
+    """Get the SHA-256 digest identifying a text."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """Append-only embedding store for one provider and model."""
+
+    def __init__(self, cache_dir: str, provider: str, model: str):
+        """
+        Initialize the store.
+
+        Args:
+            cache_dir: Directory holding the matrix and index files
+            provider: Embedding provider name
+            model: Embedding model name
+        """
+        self.provider = provider
+        self.model = model
+
+        os.makedirs(cache_dir, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{provider}-{model}")
+        self.matrix_path = os.path.join(cache_dir, f"{name}.f32")
+        self.index_path = os.path.join(cache_dir, f"{name}.idx")
+        self.lock_path = os.path.join(cache_dir, f"{name}.lock")
+
+        self.dim: Optional[int] = None
+        self._rows: Dict[bytes, int] = {}
+        self._index_offset = 0
+        self._matrix: Optional[np.memmap] = None
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+        with self._lock:
+            self._refresh()
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialize writers across processes (and threads of this process)."""
+        with self._lock:
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Read index entries appended since the last refresh (caller holds the lock)."""
+        try:
+            size = os.path.getsize(self.index_path)
+        except OSError:
+            return
+        if size <= self._index_offset:
+            return
+
+        with open(self.index_path, "rb") as f:
+            if self.dim is None:
+                header = f.read(INDEX_HEADER.size)
+                if len(header) < INDEX_HEADER.size:
+                    return
+                magic, dim = INDEX_HEADER.unpack(header)
+                if magic != INDEX_MAGIC:
+                    raise ValueError(f"Not an embedding index file: {self.index_path}")
+                self.dim = dim
+                self._index_offset = INDEX_HEADER.size
+
+            f.seek(self._index_offset)
+            # Only whole records; a writer may be part way through appending
+            count = (size - self._index_offset) // DIGEST_SIZE
+            data = f.read(count * DIGEST_SIZE)
+
+        row = (self._index_offset - INDEX_HEADER.size) // DIGEST_SIZE
+        for i in range(count):
+            digest = data[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE]
+            if digest not in self._rows:
+                self._rows[digest] = row
+            row += 1
+        self._index_offset += count * DIGEST_SIZE
+        self._matrix = None
+
+    def _get_matrix(self) -> Optional[np.memmap]:
+        """Get the memory map over every indexed row (caller holds the lock)."""
+        if self._matrix is None and self.dim:
+            rows = (self._index_offset - INDEX_HEADER.size) // DIGEST_SIZE
+            if rows:
+                self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._matrix
+
+    def lookup(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Look up the vectors for a batch of texts.
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            Tuple of (hit positions, hit vectors, miss positions). Positions
+            index into ``texts``; hit vectors are a float32 matrix aligned with
+            the hit positions.
+        """
+        digests = [text_digest(text) for text in texts]
+
+        with self._lock:
+            self._refresh()
+            rows = [self._rows.get(digest, -1) for digest in digests]
+            rows = np.asarray(rows, dtype=np.int64)
+            hit_mask = rows >= 0
+
+            hits = np.flatnonzero(hit_mask)
+            misses = np.flatnonzero(~hit_mask)
+            if len(hits):
+                vectors = np.ascontiguousarray(self._get_matrix()[rows[hits]])
+            else:
+                vectors = np.empty((0, self.dim or 0), dtype=np.float32)
+
+            self.hits += len(hits)
+            self.misses += len(misses)
+
+        return hits, vectors, misses
+
+    def put(self, texts: List[str], vectors: np.ndarray) -> int:
+        """
+        Store vectors for a batch of texts.
+
+        Args:
+            texts: Texts the vectors were computed for
+            vectors: Matrix with one row per text
+
+        Returns:
+            Number of new rows written
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(texts):
+            return 0
+        if vectors.ndim != 2 or len(vectors) != len(texts):
+            raise ValueError("Expected one embedding row per text")
+
+        with self._file_lock():
+            self._refresh()
+
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self.index_path, "wb") as f:
+                    f.write(INDEX_HEADER.pack(INDEX_MAGIC, self.dim))
+                self._index_offset = INDEX_HEADER.size
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match cache dimension {self.dim}")
+
+            new_rows = []
+            new_digests = []
+            seen = set()
+            for i, text in enumerate(texts):
+                digest = text_digest(text)
+                if digest not in self._rows and digest not in seen:
+                    seen.add(digest)
+                    new_rows.append(i)
+                    new_digests.append(digest)
+            if not new_rows:
+                return 0
+
+            # Matrix rows are only valid once their digest is in the index, so
+            # drop any rows left behind by an interrupted write before appending
+            row_count = (self._index_offset - INDEX_HEADER.size) // DIGEST_SIZE
+            with open(self.matrix_path, "ab") as f:
+                f.truncate(row_count * self.dim * 4)
+                f.write(np.ascontiguousarray(vectors[new_rows]).tobytes())
+            with open(self.index_path, "ab") as f:
+                f.write(b"".join(new_digests))
+
+            self._refresh()
+
+        logger.debug(f"Stored {len(new_rows)} embeddings for {self.provider}/{self.model}")
+        return len(new_rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary of lookup counters and stored rows
+        """
+        with self._lock:
+            return {
+                "provider": self.provider,
+                "model": self.model,
+                "rows": len(self._rows),
+                "dim": self.dim,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+_caches: Dict[Tuple[str, str, str], EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(cache_dir: str, provider: str, model: str) -> EmbeddingCache:
+    """
+    Get the process-wide embedding store for a provider and model, creating it on first use.
+
+    Args:
+        cache_dir: Directory holding the store files
+        provider: Embedding provider name
+        model: Embedding model name
+
+    Returns:
+        Shared embedding store
+    """
+    key = (os.path.abspath(cache_dir), provider, model)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = EmbeddingCache(key[0], provider, model)
+            _caches[key] = cache
+        return cache
@@ -0,0 +1,494 @@
+"""
+Entity Resolution - Canonical restaurant entities across every platform.
+
+Matchers pick the largest platform as a base and only match the others
+against it, so two platforms' listings of a restaurant the base platform
+lacks are never linked. The resolver here treats every platform alike: it
+scores the blocked candidate pairs of every platform pair, and merges the
+pairs above a score floor into entities with union-find, best pairs first.
+A merge is refused when both entities already hold a record of the same
+platform, so an entity has at most one record per platform and chains of
+similar branches do not collapse into one entity.
+
+Records can be added at any time: only the pairs involving the new records
+are scored, and existing entities keep their IDs (when a new record bridges
+two entities, the merged entity keeps the older ID and the other one becomes
+an alias of it). Records are keyed by platform and record ID (place ID or
+URL), so a refreshed scrape updates the records it already holds instead of
+adding duplicates. Entity IDs are derived from the key of the entity's first
+record, so the same records get the same IDs in every process.
+"""
+
+import hashlib
+import threading
+import logging
+from typing import Dict, List, Any, Optional, Set, Tuple, Callable, Union, Sequence
+
+import numpy as np
+
+from .blocking import CandidateBlocker
+from .restaurant_batch import RestaurantBatch, as_batch
+from .similarity import string_similarity, location_similarity
+
+logger = logging.getLogger("EntityResolution")
+
+# Record fields identifying a record on its platform, in order of preference
+RECORD_ID_FIELDS = ("place_id", "id", "source_url", "url")
+
+
+def record_key(restaurant: Dict, id_fields: Sequence[str] = RECORD_ID_FIELDS) -> str:
+    """
+    Get the key identifying a restaurant record on its platform.
+
+    Args:
+        restaurant: Restaurant record
+        id_fields: Record fields holding a platform ID or URL, in order of preference
+
+    Returns:
+        The first non-empty ID field, or the name, address and coordinates of
+        records without one
+    """
+    for field in id_fields:
+        value = restaurant.get(field)
+        if value not in (None, ""):
+            return f"{field}:{value}"
+
+    return "record:" + "|".join(
+        str(restaurant.get(field) or "").strip().lower()
+        for field in ("name", "address", "latitude", "longitude")
+    )
+
+
+def entity_id_for(platform: str, key: str) -> str:
+    """
+    Get the ID of an entity from the platform and key of its first record.
+
+    Args:
+        platform: Platform of the record
+        key: Record key (see record_key)
+
+    Returns:
+        Entity ID
+    """
+    return f"entity-{hashlib.sha1(f'{platform}/{key}'.encode()).hexdigest()[:16]}"
+
+
+class UnionFind:
+    """Disjoint sets over consecutive integer items with path compression and union by size."""
+
+    def __init__(self):
+        """Initialize an empty structure."""
+        self.parent: List[int] = []
+        self.size: List[int] = []
+
+    def add(self) -> int:
+        """
+        Add a new singleton set.
+
+        Returns:
+            The new item
+        """
+        item = len(self.parent)
+        self.parent.append(item)
+        self.size.append(1)
+        return item
+
+    def find(self, item: int) -> int:
+        """
+        Get the representative of an item's set.
+
+        Args:
+            item: Item to look up
+
+        Returns:
+            Root item of the set
+        """
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+
+        # Point every item on the path straight at the root
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+
+        return root
+
+    def union(self, first: int, second: int) -> int:
+        """
+        Merge the sets of two items.
+
+        Args:
+            first: Item of the first set
+            second: Item of the second set
+
+        Returns:
+            Root of the merged set
+        """
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return first
+
+        if self.size[first] < self.size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+        return first
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+
+class EntityResolver:
+    """Incremental clustering of restaurant records from several platforms into entities."""
+
+    def __init__(self,
+                 min_score: float = 0.7,
+                 max_distance_km: float = 1.0,
+                 location_scale_km: float = 0.5,
+                 weights: Optional[Dict[str, float]] = None,
+                 prefix_length: int = 3,
+                 name_normalizer: Optional[Callable[[str], str]] = None,
+                 address_normalizer: Optional[Callable[[str], str]] = None,
+                 id_fields: Sequence[str] = RECORD_ID_FIELDS):
+        """
+        Initialize an empty resolver.
+
+        Args:
+            min_score: Minimum score of a pair of records to link them
+            max_distance_km: Only score located records within this distance of each other
+            location_scale_km: Distance at which location similarity reaches zero
+            weights: Weights of the name, address and location similarities
+            prefix_length: Token prefix length for records without coordinates
+            name_normalizer: Function normalizing names (default: normalize_name)
+            address_normalizer: Function normalizing addresses (default: normalize_address)
+            id_fields: Record fields identifying a record on its platform (see record_key)
+        """
+        self.min_score = min_score
+        self.max_distance_km = max_distance_km
+        self.location_scale_km = location_scale_km
+        self.weights = weights or {"name": 0.5, "address": 0.3, "location": 0.2}
+        self.prefix_length = prefix_length
+        self.name_normalizer = name_normalizer
+        self.address_normalizer = address_normalizer
+        self.id_fields = tuple(id_fields)
+
+        # Per platform: blocker over all its records (its batch is blocker.restaurants)
+        # and the node of each record
+        self._blockers: Dict[str, CandidateBlocker] = {}
+        self._nodes: Dict[str, List[int]] = {}
+
+        # Per node: platform, record index and the score it was linked with;
+        # per (platform, record key): node
+        self._records: List[Tuple[str, int]] = []
+        self._link_scores: List[Optional[float]] = []
+        self._keys: Dict[Tuple[str, str], int] = {}
+
+        # Per root node: entity ID, first (oldest) node, member nodes and platforms
+        self._sets = UnionFind()
+        self._entity_ids: Dict[int, str] = {}
+        self._founders: Dict[int, int] = {}
+        self._members: Dict[int, List[int]] = {}
+        self._platforms: Dict[int, Set[str]] = {}
+
+        # Entity IDs merged into an older entity
+        self._aliases: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add_records(self, restaurant_lists: Dict[str, Union[List[Dict], RestaurantBatch]]) -> List[str]:
+        """
+        Add newly scraped records and link them to the existing entities.
+
+        Only pairs with at least one new record are scored, so adding a few
+        records to a large resolver is cheap. Records already held (same
+        platform and record key) are updated in place and keep their entity.
+
+        Args:
+            restaurant_lists: New restaurant lists (or batches) keyed by platform
+
+        Returns:
+            Sorted IDs of the entities the given records belong to
+        """
+        with self._lock:
+            # Index the new records and give each one its own entity
+            new_batches = {}
+            new_nodes = []
+            given_nodes = []
+            for platform, restaurants in restaurant_lists.items():
+                if not len(restaurants):
+                    continue
+
+                batch = self._upsert(platform, restaurants, given_nodes)
+                if not len(batch):
+                    continue
+
+                blocker = self._blockers.get(platform)
+                if blocker is None:
+                    self._blockers[platform] = CandidateBlocker(batch, self.max_distance_km, self.prefix_length)
+                    self._nodes[platform] = []
+                else:
+                    blocker.extend(batch)
+                new_batches[platform] = batch
+
+                for index in range(self._blockers[platform].size - len(batch), self._blockers[platform].size):
+                    node = self._add_node(platform, index)
+                    self._nodes[platform].append(node)
+                    new_nodes.append(node)
+                    given_nodes.append(node)
+
+            # Score the pairs involving new records and merge them best first
+            edges = [
+                self._score_pairs(first, second, new_batches)
+                for first, second in self._platform_pairs(new_batches)
+            ]
+            if edges:
+                first_nodes = np.concatenate([edge[0] for edge in edges])
+                second_nodes = np.concatenate([edge[1] for edge in edges])
+                scores = np.concatenate([edge[2] for edge in edges])
+                merged = self._merge(first_nodes, second_nodes, scores)
+                logger.info(f"Linked {merged} of {len(scores)} candidate pairs for {len(new_nodes)} new records")
+
+            return sorted({self._entity_ids[self._sets.find(node)] for node in given_nodes})
+
+    def _upsert(self,
+                platform: str,
+                restaurants: Union[List[Dict], RestaurantBatch],
+                known_nodes: List[int]) -> RestaurantBatch:
+        """
+        Update the records already held and get the batch of the new ones.
+
+        Args:
+            platform: Platform of the records
+            restaurants: Restaurant list or batch
+            known_nodes: List the nodes of the records already held are appended to
+
+        Returns:
+            Restaurant batch of the records not held yet (first occurrence of each key)
+        """
+        batch = as_batch(restaurants, self.name_normalizer, self.address_normalizer)
+        blocker = self._blockers.get(platform)
+
+        new_indices = []
+        new_keys = set()
+        for index, restaurant in enumerate(batch):
+            key = record_key(restaurant, self.id_fields)
+            node = self._keys.get((platform, key))
+            if node is not None:
+                # Refresh the stored record; its key columns and links are kept
+                blocker.restaurants.restaurants[self._records[node][1]] = restaurant
+                known_nodes.append(node)
+            elif key not in new_keys:
+                new_keys.add(key)
+                new_indices.append(index)
+
+        # Copy a caller's batch, since stored records are replaced in place on refresh
+        if batch is restaurants or len(new_indices) < len(batch):
+            batch = batch.take(new_indices)
+        return batch
+
+    def _add_node(self, platform: str, index: int) -> int:
+        """Create the node and singleton entity of a record."""
+        node = self._sets.add()
+        self._records.append((platform, index))
+        self._link_scores.append(None)
+
+        key = record_key(self._blockers[platform].restaurants[index], self.id_fields)
+        self._keys[(platform, key)] = node
+        self._entity_ids[node] = entity_id_for(platform, key)
+        self._founders[node] = node
+        self._members[node] = [node]
+        self._platforms[node] = {platform}
+        return node
+
+    def _platform_pairs(self, new_batches: Dict[str, RestaurantBatch]) -> List[Tuple[str, str]]:
+        """Get the platform pairs with new records on at least one side."""
+        platforms = sorted(self._blockers)
+        return [
+            (first, second)
+            for position, first in enumerate(platforms)
+            for second in platforms[position + 1:]
+            if first in new_batches or second in new_batches
+        ]
+
+    def _score_pairs(self,
+                     first: str,
+                     second: str,
+                     new_batches: Dict[str, RestaurantBatch]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score the blocked pairs between two platforms that involve a new record.
+
+        Args:
+            first: First platform
+            second: Second platform
+            new_batches: Batches of the new records, keyed by platform
+
+        Returns:
+            Tuple of (first nodes, second nodes, scores) arrays
+        """
+        first_blocker, second_blocker = self._blockers[first], self._blockers[second]
+        first_batch, second_batch = first_blocker.restaurants, second_blocker.restaurants
+        first_old = len(first_batch) - len(new_batches.get(first, ()))
+        second_old = len(second_batch) - len(new_batches.get(second, ()))
+
+        # New first records against all second records, then new second records
+        # against the old first records (new-new pairs are in the first part)
+        rows, cols = [], []
+        if first in new_batches:
+            new_first = _pairs(second_blocker, new_batches[first])
+            rows.append(new_first[:, 0] + first_old)
+            cols.append(new_first[:, 1])
+        if second in new_batches:
+            new_second = _pairs(first_blocker, new_batches[second])
+            new_second = new_second[new_second[:, 1] < first_old]
+            rows.append(new_second[:, 1])
+            cols.append(new_second[:, 0] + second_old)
+
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+
+        name_similarity = string_similarity(first_batch.names, second_batch.names, rows, cols)
+        address_similarity = string_similarity(first_batch.addresses, second_batch.addresses, rows, cols)
+        location = location_similarity(first_batch.pair_distances(second_batch, rows, cols), self.location_scale_km)
+
+        total_weight = sum(self.weights.values())
+        scores = (
+            self.weights["name"] * name_similarity +
+            self.weights["address"] * address_similarity +
+            self.weights["location"] * location
+        )
+        if total_weight > 0:
+            scores /= total_weight
+
+        first_nodes = np.asarray(self._nodes[first], dtype=np.int64)[rows]
+        second_nodes = np.asarray(self._nodes[second], dtype=np.int64)[cols]
+        return first_nodes, second_nodes, scores
+
+    def _merge(self, first_nodes: np.ndarray, second_nodes: np.ndarray, scores: np.ndarray) -> int:
+        """
+        Merge the entities of scored pairs, best pairs first.
+
+        Args:
+            first_nodes: First node of each pair
+            second_nodes: Second node of each pair
+            scores: Score of each pair
+
+        Returns:
+            Number of pairs that merged two entities
+        """
+        keep = np.flatnonzero(scores >= self.min_score)
+        order = keep[np.argsort(-scores[keep], kind="stable")]
+
+        merged = 0
+        for first, second, score in zip(first_nodes[order].tolist(), second_nodes[order].tolist(), scores[order].tolist()):
+            first_root, second_root = self._sets.find(first), self._sets.find(second)
+            if first_root == second_root or self._platforms[first_root] & self._platforms[second_root]:
+                continue
+
+            # The merged entity keeps the ID of the one whose first record was added first
+            if self._founders[second_root] < self._founders[first_root]:
+                first_root, second_root = second_root, first_root
+            kept_id, alias_id = self._entity_ids.pop(first_root), self._entity_ids.pop(second_root)
+            self._aliases[alias_id] = kept_id
+            founder = self._founders.pop(first_root)
+            del self._founders[second_root]
+
+            root = self._sets.union(first_root, second_root)
+            other = second_root if root == first_root else first_root
+            self._entity_ids[root] = kept_id
+            self._founders[root] = founder
+            self._members[root].extend(self._members.pop(other))
+            self._platforms[root] |= self._platforms.pop(other)
+
+            for node in (first, second):
+                if self._link_scores[node] is None or score < self._link_scores[node]:
+                    self._link_scores[node] = score
+            merged += 1
+
+        return merged
+
+    def resolve_id(self, entity_id: str) -> str:
+        """
+        Get the current ID of an entity, following merges.
+
+        Args:
+            entity_id: Entity ID, possibly of an entity since merged
+
+        Returns:
+            ID of the entity the given one is now part of
+        """
+        with self._lock:
+            while entity_id in self._aliases:
+                entity_id = self._aliases[entity_id]
+            return entity_id
+
+    def entity_id(self, platform: str, index: int) -> str:
+        """
+        Get the entity ID of a record.
+
+        Args:
+            platform: Platform of the record
+            index: Position of the record among all records added for the platform
+
+        Returns:
+            Entity ID
+        """
+        with self._lock:
+            return self._entity_ids[self._sets.find(self._nodes[platform][index])]
+
+    def entities(self, min_platforms: int = 1, entity_ids: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get the resolved entities.
+
+        Args:
+            min_platforms: Only include entities with records from at least this many platforms
+            entity_ids: Only include these entities (e.g. the IDs returned by add_records)
+
+        Returns:
+            List of entities (ID, record per platform, link scores) sorted by ID
+        """
+        with self._lock:
+            wanted = None if entity_ids is None else set(entity_ids)
+            entities = []
+            for root, members in self._members.items():
+                if len(members) < min_platforms:
+                    continue
+                if wanted is not None and self._entity_ids[root] not in wanted:
+                    continue
+
+                records = {}
+                link_scores = {}
+                for node in members:
+                    platform, index = self._records[node]
+                    records[platform] = self._blockers[platform].restaurants[index]
+                    link_scores[platform] = self._link_scores[node]
+
+                linked = [score for score in link_scores.values() if score is not None]
+                entities.append({
+                    "entity_id": self._entity_ids[root],
+                    "platforms": sorted(records),
+                    "records": records,
+                    "link_scores": link_scores,
+                    "confidence": min(linked) if linked else None
+                })
+
+            entities.sort(key=lambda entity: entity["entity_id"])
+            return entities
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get resolver statistics.
+
+        Returns:
+            Dictionary of record, entity and per-platform counts
+        """
+        with self._lock:
+            return {
+                "records": len(self._records),
+                "entities": len(self._members),
+                "multi_platform_entities": sum(1 for members in self._members.values() if len(members) > 1),
+                "platforms": {platform: blocker.size for platform, blocker in self._blockers.items()}
+            }
+
+
+def _pairs(blocker: CandidateBlocker, batch: RestaurantBatch) -> np.ndarray:
+    """Get the blocked (batch index, candidate index) pairs of a batch as an array."""
+    return np.array(blocker.candidate_pairs(batch), dtype=np.int64).reshape(-1, 2)
@@ -0,0 +1,274 @@
+"""
+Geo - Vectorized great-circle distance kernels shared by all geographic code.
+
+This module provides scalar, one-to-many and many-to-many haversine distances
+over NumPy arrays, plus helpers for pulling restaurant coordinates into arrays
+and filtering restaurants by radius without Python-level loops.
+"""
+
+import math
+import logging
+import numpy as np
+from typing import Dict, List, Tuple, Union
+
+logger = logging.getLogger("Geo")
+
+# Earth's mean radius in kilometers
+EARTH_RADIUS_KM = 6371.0
+
+ArrayLike = Union[np.ndarray, List[float], Tuple[float, ...]]
+
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Calculate the great circle distance between two points.
+
+    Args:
+        lat1, lon1: Coordinates of the first point
+        lat2, lon2: Coordinates of the second point
+
+    Returns:
+        Distance in kilometers
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def _as_array(values: ArrayLike, dtype: np.dtype) -> np.ndarray:
+    """Convert coordinates to a float array of the requested dtype."""
+    return np.asarray(values, dtype=dtype)
+
+
+def haversine_one_to_many(lat: float,
+                          lon: float,
+                          lats: ArrayLike,
+                          lons: ArrayLike,
+                          dtype: np.dtype = np.float64) -> np.ndarray:
+    """
+    Calculate distances from one point to many points.
+
+    Args:
+        lat, lon: Coordinates of the origin point
+        lats, lons: Coordinates of the target points
+        dtype: Floating point type for the computation (float32 or float64)
+
+    Returns:
+        Array of distances in kilometers, NaN where target coordinates are NaN
+    """
+    dtype = np.dtype(dtype).type
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+    lats_rad = np.radians(_as_array(lats, dtype))
+    lons_rad = np.radians(_as_array(lons, dtype))
+
+    dlat = lats_rad - dtype(lat_rad)
+    dlon = lons_rad - dtype(lon_rad)
+    a = np.sin(dlat / 2) ** 2 + dtype(math.cos(lat_rad)) * np.cos(lats_rad) * np.sin(dlon / 2) ** 2
+    return dtype(2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def haversine_many_to_many(lats1: ArrayLike,
+                           lons1: ArrayLike,
+                           lats2: ArrayLike,
+                           lons2: ArrayLike,
+                           dtype: np.dtype = np.float64) -> np.ndarray:
+    """
+    Calculate the full distance matrix between two sets of points.
+
+    Args:
+        lats1, lons1: Coordinates of the first set (N points)
+        lats2, lons2: Coordinates of the second set (M points)
+        dtype: Floating point type for the computation (float32 or float64)
+
+    Returns:
+        N x M array of distances in kilometers
+    """
+    dtype = np.dtype(dtype).type
+    lats1_rad = np.radians(_as_array(lats1, dtype))[:, np.newaxis]
+    lons1_rad = np.radians(_as_array(lons1, dtype))[:, np.newaxis]
+    lats2_rad = np.radians(_as_array(lats2, dtype))[np.newaxis, :]
+    lons2_rad = np.radians(_as_array(lons2, dtype))[np.newaxis, :]
+
+    dlat = lats2_rad - lats1_rad
+    dlon = lons2_rad - lons1_rad
+    a = np.sin(dlat / 2) ** 2 + np.cos(lats1_rad) * np.cos(lats2_rad) * np.sin(dlon / 2) ** 2
+    return dtype(2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def haversine_pairwise(lats1: ArrayLike,
+                       lons1: ArrayLike,
+                       lats2: ArrayLike,
+                       lons2: ArrayLike,
+                       dtype: np.dtype = np.float64) -> np.ndarray:
+    """
+    Calculate element-wise distances between two aligned sets of points.
+
+    Args:
+        lats1, lons1: Coordinates of the first set (N points)
+        lats2, lons2: Coordinates of the second set (N points)
+        dtype: Floating point type for the computation (float32 or float64)
+
+    Returns:
+        Array of N distances in kilometers
+    """
+    dtype = np.dtype(dtype).type
+    lats1_rad = np.radians(_as_array(lats1, dtype))
+    lons1_rad = np.radians(_as_array(lons1, dtype))
+    lats2_rad = np.radians(_as_array(lats2, dtype))
+    lons2_rad = np.radians(_as_array(lons2, dtype))
+
+    dlat = lats2_rad - lats1_rad
+    dlon = lons2_rad - lons1_rad
+    a = np.sin(dlat / 2) ** 2 + np.cos(lats1_rad) * np.cos(lats2_rad) * np.sin(dlon / 2) ** 2
+    return dtype(2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def haversine_radians(lats1: ArrayLike,
+                      lons1: ArrayLike,
+                      lats2: ArrayLike,
+                      lons2: ArrayLike) -> np.ndarray:
+    """
+    Calculate distances between points already converted to radians.
+
+    Inputs broadcast like NumPy arrays, so the same kernel serves one-to-many,
+    pairwise and (with added axes) many-to-many distances over precomputed
+    radian columns.
+
+    Args:
+        lats1, lons1: Coordinates of the first points in radians
+        lats2, lons2: Coordinates of the second points in radians
+
+    Returns:
+        Array of distances in kilometers, NaN where any coordinate is NaN
+    """
+    lats1 = np.asarray(lats1)
+    lats2 = np.asarray(lats2)
+    dlat = lats2 - lats1
+    dlon = np.asarray(lons2) - np.asarray(lons1)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lats1) * np.cos(lats2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def coordinates_to_arrays(restaurants: List[Dict],
+                          dtype: np.dtype = np.float64) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extract restaurant coordinates into arrays.
+
+    Args:
+        restaurants: List of restaurant data
+        dtype: Floating point type of the returned arrays
+
+    Returns:
+        Tuple of (latitudes, longitudes, valid mask). Missing or invalid
+        coordinates are NaN and masked out.
+    """
+    lats = np.full(len(restaurants), np.nan, dtype=dtype)
+    lons = np.full(len(restaurants), np.nan, dtype=dtype)
+
+    for i, restaurant in enumerate(restaurants):
+        lat = restaurant.get("latitude")
+        lon = restaurant.get("longitude")
+        if lat is None or lon is None:
+            continue
+        try:
+            lats[i] = float(lat)
+            lons[i] = float(lon)
+        except (TypeError, ValueError):
+            continue
+
+    valid = (
+        ~np.isnan(lats) & ~np.isnan(lons)
+        & (np.abs(lats) <= 90) & (np.abs(lons) <= 180)
+    )
+    lats[~valid] = np.nan
+    lons[~valid] = np.nan
+    return lats, lons, valid
+
+
+def distances_from_point(latitude: float,
+                         longitude: float,
+                         restaurants: List[Dict],
+                         dtype: np.dtype = np.float64) -> np.ndarray:
+    """
+    Calculate the distance from a point to every restaurant.
+
+    Args:
+        latitude: Center point latitude
+        longitude: Center point longitude
+        restaurants: List of restaurant data
+        dtype: Floating point type for the computation
+
+    Returns:
+        Array of distances in kilometers, NaN for restaurants without valid coordinates
+    """
+    lats, lons, valid = coordinates_to_arrays(restaurants, dtype)
+    distances = np.full(len(restaurants), np.nan, dtype=dtype)
+    if valid.any():
+        distances[valid] = haversine_one_to_many(latitude, longitude, lats[valid], lons[valid], dtype)
+    return distances
+
+
+def within_radius_mask(latitude: float,
+                       longitude: float,
+                       lats: ArrayLike,
+                       lons: ArrayLike,
+                       radius_km: float,
+                       dtype: np.dtype = np.float64) -> np.ndarray:
+    """
+    Get a boolean mask of points within a radius of a center point.
+
+    A cheap bounding-box pre-filter is applied before the haversine kernel so
+    that only points near the center pay for the trigonometry.
+
+    Args:
+        latitude: Center point latitude
+        longitude: Center point longitude
+        lats, lons: Coordinates of the points to check (NaN for missing)
+        radius_km: Radius in kilometers
+        dtype: Floating point type for the computation
+
+    Returns:
+        Boolean array, False for points outside the radius or with NaN coordinates
+    """
+    lats = _as_array(lats, dtype)
+    lons = _as_array(lons, dtype)
+
+    lat_span = math.degrees(radius_km / EARTH_RADIUS_KM)
+    lon_span = lat_span / max(math.cos(math.radians(latitude)), 1e-6)
+
+    # NaN comparisons are False, so missing coordinates drop out here
+    mask = (np.abs(lats - latitude) <= lat_span) & (np.abs(lons - longitude) <= lon_span)
+    if mask.any():
+        candidates = np.flatnonzero(mask)
+        distances = haversine_one_to_many(latitude, longitude, lats[candidates], lons[candidates], dtype)
+        mask[candidates] = distances <= radius_km
+    return mask
+
+
+def filter_by_radius(restaurants: List[Dict],
+                     latitude: float,
+                     longitude: float,
+                     radius_km: float,
+                     dtype: np.dtype = np.float64) -> List[Dict]:
+    """
+    Keep only restaurants within a radius of a center point.
+
+    Args:
+        restaurants: List of restaurant data
+        latitude: Center point latitude
+        longitude: Center point longitude
+        radius_km: Radius in kilometers
+        dtype: Floating point type for the computation
+
+    Returns:
+        Restaurants within the radius, in their original order
+    """
+    if not restaurants:
+        return []
+
+    lats, lons, _ = coordinates_to_arrays(restaurants, dtype)
+    mask = within_radius_mask(latitude, longitude, lats, lons, radius_km, dtype)
+    return [restaurants[i] for i in np.flatnonzero(mask)]
@@ -0,0 +1,544 @@
+"""
+KV Cache - Embedded key-value cache backed by a single SQLite database.
+
+This module replaces the one-JSON-file-per-key caches used by the API client,
+web scraper and matcher. Entries live in one WAL-mode SQLite file with the
+expiry time in an indexed column, so expired entries are skipped without
+reading their payload. Entries may be kept past their expiry, up to a hard
+staleness bound, so that callers can serve them while a refresh runs (stale-
+while-revalidate). Payloads are stored as zlib-compressed compact JSON,
+the total payload size is bounded with least-recently-used eviction, and a
+background thread purges expired entries. MemoryCache is a bytes-bounded
+in-process LRU tier for hot keys in front of it.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger("KVCache")
+
+# Default size bound for all payloads in a cache file
+DEFAULT_MAX_SIZE_BYTES = 512 * 1024 * 1024
+
+# Fraction of the size bound that eviction shrinks the cache to
+EVICTION_TARGET_RATIO = 0.9
+
+
+def encode_json(value: Any) -> bytes:
+    """Serialize a value to compact UTF-8 JSON."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class StaleDict(dict):
+    """
+    A cached dictionary served past its expiry while it is refreshed in the background.
+
+    Behaves exactly like the original dictionary; check ``stale`` (or
+    ``getattr(value, "stale", False)``) to tell it apart from a fresh value.
+    """
+
+    stale = True
+
+
+class KVCache:
+    """
+    Thread-safe key-value cache stored in a single SQLite file.
+
+    Each thread gets its own connection; WAL mode lets readers proceed while
+    another thread or process writes.
+    """
+
+    def __init__(self,
+                 path: str,
+                 max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+                 purge_interval_seconds: float = 300.0,
+                 compression_level: int = 6):
+        """
+        Initialize the cache.
+
+        Args:
+            path: Path of the SQLite database file
+            max_size_bytes: Maximum total size of stored payloads before LRU eviction
+            purge_interval_seconds: Seconds between background purges of expired entries (0 to disable)
+            compression_level: zlib compression level for payloads
+        """
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.purge_interval_seconds = purge_interval_seconds
+        self.compression_level = compression_level
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        # Access times of hits, written back in batches instead of on every read
+        self._touched: Dict[str, float] = {}
+
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, "
+                "value BLOB NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, "
+                "stale_until REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(cache)")]
+            if "stale_until" not in columns:
+                # Databases created before stale entries were kept
+                conn.execute("ALTER TABLE cache ADD COLUMN stale_until REAL NOT NULL DEFAULT 0")
+                conn.execute("UPDATE cache SET stale_until = expires_at")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache (expires_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_stale_until ON cache (stale_until)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed_at ON cache (accessed_at)")
+            self._size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+        self._stop_event = threading.Event()
+        self._purge_thread = None
+        if purge_interval_seconds > 0:
+            self._purge_thread = threading.Thread(
+                target=self._purge_loop, name="kv-cache-purge", daemon=True
+            )
+            self._purge_thread.start()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the SQLite connection for the current thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value if it is present and not expired.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if not available or expired
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def get_entry(self, key: str, allow_stale: bool = False) -> Optional[Tuple[Any, bool]]:
+        """
+        Get a value and whether it is past its expiry.
+
+        Args:
+            key: Cache key
+            allow_stale: Whether to return entries past their expiry but within their staleness bound
+
+        Returns:
+            Tuple of (value, stale) or None if not available
+        """
+        entry = self.get_raw(key, allow_stale)
+        if entry is None:
+            return None
+
+        try:
+            return json.loads(entry[0].decode("utf-8")), entry[1] <= time.time()
+        except ValueError as e:
+            logger.warning(f"Corrupt cache entry {key}: {str(e)}")
+            self.delete(key)
+            return None
+
+    def get_raw(self, key: str, allow_stale: bool = False) -> Optional[Tuple[bytes, float, float]]:
+        """
+        Get the serialized JSON of a value if it is present and not expired.
+
+        Args:
+            key: Cache key
+            allow_stale: Whether to return entries past their expiry but within their staleness bound
+
+        Returns:
+            Tuple of (UTF-8 JSON bytes, expiry timestamp, staleness bound timestamp)
+            or None if not available
+        """
+        now = time.time()
+        column = "stale_until" if allow_stale else "expires_at"
+        try:
+            row = self._connection().execute(
+                f"SELECT value, expires_at, stale_until FROM cache WHERE key = ? AND {column} > ?", (key, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading cache entry {key}: {str(e)}")
+            return None
+
+        if row is None:
+            return None
+
+        with self._lock:
+            self._touched[key] = now
+
+        try:
+            return zlib.decompress(row[0]), row[1], row[2]
+        except zlib.error as e:
+            logger.warning(f"Corrupt cache entry {key}: {str(e)}")
+            self.delete(key)
+            return None
+
+    def set(self, key: str, value: Any, ttl_seconds: float, max_stale_seconds: float = 0.0):
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl_seconds: Seconds until the entry expires
+            max_stale_seconds: Seconds past expiry the entry may still be served as stale
+        """
+        try:
+            self.set_raw(key, encode_json(value), ttl_seconds, max_stale_seconds)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Error serializing cache entry {key}: {str(e)}")
+
+    def set_raw(self, key: str, data: bytes, ttl_seconds: float, max_stale_seconds: float = 0.0):
+        """
+        Store an already serialized value.
+
+        Args:
+            key: Cache key
+            data: UTF-8 JSON bytes
+            ttl_seconds: Seconds until the entry expires
+            max_stale_seconds: Seconds past expiry the entry may still be served as stale
+        """
+        payload = zlib.compress(data, self.compression_level)
+        now = time.time()
+        conn = self._connection()
+        try:
+            with conn:
+                row = conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, size, expires_at, stale_until, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, payload, len(payload), now + ttl_seconds, now + ttl_seconds + max_stale_seconds, now)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing cache entry {key}: {str(e)}")
+            return
+
+        with self._lock:
+            self._size += len(payload) - (row[0] if row else 0)
+            over_limit = self._size > self.max_size_bytes
+
+        if over_limit:
+            self.evict()
+
+    def delete(self, key: str):
+        """
+        Remove a value.
+
+        Args:
+            key: Cache key
+        """
+        conn = self._connection()
+        try:
+            with conn:
+                row = conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning(f"Error deleting cache entry {key}: {str(e)}")
+            return
+
+        if row:
+            with self._lock:
+                self._size -= row[0]
+
+    def _flush_access_times(self):
+        """Write batched access times back to the database."""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+
+        if not touched:
+            return
+
+        conn = self._connection()
+        try:
+            with conn:
+                conn.executemany(
+                    "UPDATE cache SET accessed_at = ? WHERE key = ? AND accessed_at < ?",
+                    [(accessed_at, key, accessed_at) for key, accessed_at in touched.items()]
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Error updating cache access times: {str(e)}")
+
+    def purge_expired(self) -> int:
+        """
+        Delete all entries past their staleness bound.
+
+        Returns:
+            Number of entries deleted
+        """
+        conn = self._connection()
+        try:
+            with conn:
+                deleted = conn.execute("DELETE FROM cache WHERE stale_until <= ?", (time.time(),)).rowcount
+                size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning(f"Error purging expired cache entries: {str(e)}")
+            return 0
+
+        with self._lock:
+            self._size = size
+
+        if deleted:
+            logger.debug(f"Purged {deleted} expired cache entries")
+        return deleted
+
+    def evict(self) -> int:
+        """
+        Delete least recently used entries until the cache is under its size bound.
+
+        Expired entries are purged first since they are free to drop.
+
+        Returns:
+            Number of entries deleted
+        """
+        self._flush_access_times()
+        deleted = self.purge_expired()
+
+        with self._lock:
+            size = self._size
+        if size <= self.max_size_bytes:
+            return deleted
+
+        # Shrink below the bound so the next few writes don't each trigger eviction
+        excess = size - int(self.max_size_bytes * EVICTION_TARGET_RATIO)
+
+        conn = self._connection()
+        try:
+            with conn:
+                freed = 0
+                keys = []
+                for key, size in conn.execute("SELECT key, size FROM cache ORDER BY accessed_at"):
+                    keys.append((key,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                conn.executemany("DELETE FROM cache WHERE key = ?", keys)
+        except sqlite3.Error as e:
+            logger.warning(f"Error evicting cache entries: {str(e)}")
+            return deleted
+
+        with self._lock:
+            self._size -= freed
+
+        logger.debug(f"Evicted {len(keys)} cache entries ({freed} bytes)")
+        return deleted + len(keys)
+
+    def _purge_loop(self):
+        """Periodically purge expired entries until the cache is closed."""
+        while not self._stop_event.wait(self.purge_interval_seconds):
+            try:
+                self._flush_access_times()
+                self.purge_expired()
+            except Exception as e:
+                logger.warning(f"Error in background cache purge: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        row = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(expires_at <= ?), 0) FROM cache", (time.time(),)
+        ).fetchone()
+        return {
+            "path": self.path,
+            "entries": row[0],
+            "stale_entries": row[1],
+            "size_bytes": self._size,
+            "max_size_bytes": self.max_size_bytes
+        }
+
+    def close(self):
+        """Stop the background purge and close this thread's connection."""
+        self._stop_event.set()
+        self._flush_access_times()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class MemoryCache:
+    """
+    Thread-safe in-process LRU cache bounded by total payload size.
+
+    Values are kept as serialized JSON so that callers mutating a returned
+    value cannot corrupt the cached copy, and so the size bound is exact.
+    """
+
+    def __init__(self, max_size_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size_bytes: Maximum total size of cached payloads
+        """
+        self.max_size_bytes = max_size_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, float, float]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Tuple[bytes, float]]:
+        """
+        Get a payload if it is present and not expired.
+
+        Args:
+            key: Cache key
+            allow_stale: Whether to return entries past their expiry but within their staleness bound
+
+        Returns:
+            Tuple of (UTF-8 JSON bytes, expiry timestamp) or None if not available
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            data, expires_at, stale_until = entry
+            now = time.time()
+            if stale_until <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            if expires_at <= now:
+                if not allow_stale:
+                    self.misses += 1
+                    return None
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+
+            self._entries.move_to_end(key)
+            return data, expires_at
+
+    def set(self, key: str, data: bytes, expires_at: float, stale_until: Optional[float] = None):
+        """
+        Store a payload.
+
+        Args:
+            key: Cache key
+            data: UTF-8 JSON bytes
+            expires_at: Expiry timestamp
+            stale_until: Timestamp until which the entry may be served as stale (default: expires_at)
+        """
+        if len(data) > self.max_size_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (data, expires_at, max(expires_at, stale_until or expires_at))
+            self._size += len(data)
+
+            while self._size > self.max_size_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        """Remove an entry; the lock must be held."""
+        data = self._entries.pop(key)[0]
+        self._size -= len(data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the hit, miss and eviction counters.
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_size_bytes": self.max_size_bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0
+            }
+
+
+# Caches shared by every user of the same database file in the process
+_caches: Dict[str, KVCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_kv_cache(cache_dir: str,
+                 max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+                 filename: str = "cache.db") -> KVCache:
+    """
+    Get the process-wide cache for a cache directory, creating it on first use.
+
+    Sharing one instance per file keeps a single background purge thread and
+    a single size count per database.
+
+    Args:
+        cache_dir: Directory holding the database file
+        max_size_bytes: Maximum total size of stored payloads (used on first creation)
+        filename: Database file name
+
+    Returns:
+        Shared cache
+    """
+    path = os.path.abspath(os.path.join(cache_dir, filename))
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = KVCache(path, max_size_bytes=max_size_bytes)
+            _caches[path] = cache
+        return cache
+
+
+_memory_caches: Dict[str, MemoryCache] = {}
+
+
+def get_memory_cache(cache_dir: str, max_size_bytes: int = 64 * 1024 * 1024) -> MemoryCache:
+    """
+    Get the process-wide in-memory cache for a cache directory, creating it on first use.
+
+    Args:
+        cache_dir: Directory of the database the memory cache sits in front of
+        max_size_bytes: Maximum total size of cached payloads (used on first creation)
+
+    Returns:
+        Shared memory cache
+    """
+    path = os.path.abspath(cache_dir)
+    with _caches_lock:
+        cache = _memory_caches.get(path)
+        if cache is None:
+            cache = MemoryCache(max_size_bytes)
+            _memory_caches[path] = cache
+        return cache
@@ -9,13 +9,484 @@ import os
 import json
 import logging
 import asyncio
+import sqlite3
+import hashlib
+import time
+import threading
 import requests
 import httpx
-from typing import Dict, List, Any, Optional, Union, Callable, AsyncGenerator, Generator
+import numpy as np
+from requests.adapters import HTTPAdapter
+from collections import deque
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Union, Callable, AsyncGenerator, Generator, Tuple
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from .response_cache import ResponseCache, get_response_cache
+from .llm_router import ProviderRouter
+from .streaming import record_cancellation
+
 logger = logging.getLogger("LLMClient")
 
+# API base URLs of the HTTP providers
+PROVIDER_BASE_URLS = {
+    "openai": "https://api.openai.com/v1",
+    "deepseek": "https://api.deepseek.com/v1"
+}
+
+# Default connection pool settings, overridable through the "http" config section
+DEFAULT_HTTP_CONFIG = {
+    "pool_size": 20,  # Connections kept per provider
+    "keepalive_expiry": 60.0,  # Seconds an idle async connection is kept open
+    "connect_timeout": 10.0,
+    "read_timeout": 60.0
+}
+
+
+# Default batched embedding settings, overridable through the "embeddings" config section
+DEFAULT_EMBEDDING_CONFIG = {
+    "batch_size": 256,  # Inputs per provider request
+    "max_concurrency": 4,  # Batch requests in flight at once
+    "cache": True,  # Reuse stored vectors keyed by provider, model and text hash
+    "cache_dir": os.path.join("cache", "embeddings")
+}
+
+# Model used when a request fails over or is hedged to a provider other than the
+# configured one, overridable through the "routing" config section's "models" table
+# (providers mapped to None are not routed to)
+DEFAULT_PROVIDER_MODELS = {
+    "openai": "gpt-4-turbo",
+    "deepseek": "deepseek-chat"
+}
+
+# Default completion cache settings, overridable through the "response_cache" config section
+DEFAULT_RESPONSE_CACHE_CONFIG = {
+    "enabled": True,
+    "semantic": False,  # Also answer from entries with a similar prompt embedding and the same cache scope
+    "ttl_hours": 6,
+    "similarity_threshold": 0.95,
+    "cache_dir": "cache"
+}
+
+
+class ProviderConnectionPool:
+    """
+    Long-lived sync and async HTTP connection pools for one LLM provider.
+
+    Connections (and their TLS sessions) are reused across completions,
+    streams and embedding calls instead of being set up for every request.
+    """
+
+    def __init__(self,
+                 base_url: str,
+                 pool_size: int = 20,
+                 keepalive_expiry: float = 60.0,
+                 connect_timeout: float = 10.0,
+                 read_timeout: float = 60.0):
+        """
+        Initialize the pools.
+
+        Args:
+            base_url: Provider API base URL
+            pool_size: Maximum number of connections kept open
+            keepalive_expiry: Seconds an idle async connection is kept open
+            connect_timeout: Connection timeout in seconds
+            read_timeout: Default read timeout in seconds
+        """
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        # requests only retries here on connection errors, never on a sent POST
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=1)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Async clients are bound to the event loop they were created on
+        self._async_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+
+    def post(self, path: str, headers: Dict[str, str], json_data: Dict[str, Any],
+             timeout: Optional[float] = None) -> requests.Response:
+        """
+        Make a POST request over the pooled sync session.
+
+        Args:
+            path: Path relative to the base URL
+            headers: Request headers
+            json_data: JSON body
+            timeout: Read timeout in seconds (default: read_timeout)
+
+        Returns:
+            Response
+        """
+        return self.session.post(
+            f"{self.base_url}{path}",
+            headers=headers,
+            json=json_data,
+            timeout=(self.connect_timeout, timeout or self.read_timeout)
+        )
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        """Get the pooled async client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                # Drop clients whose loops have gone away
+                for stale_loop in [l for l in self._async_clients if l.is_closed()]:
+                    del self._async_clients[stale_loop]
+
+                client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    limits=httpx.Limits(
+                        max_connections=self.pool_size,
+                        max_keepalive_connections=self.pool_size,
+                        keepalive_expiry=self.keepalive_expiry
+                    ),
+                    timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+                )
+                self._async_clients[loop] = client
+            return client
+
+    async def aclose(self):
+        """Close the async client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        """Close the sync session."""
+        self.session.close()
+
+
+# Connection pools shared by every LLMClient in the process
+_provider_pools: Dict[Tuple, ProviderConnectionPool] = {}
+_provider_pools_lock = threading.Lock()
+
+
+def get_provider_pool(provider: str, http_config: Optional[Dict[str, Any]] = None) -> ProviderConnectionPool:
+    """
+    Get the process-wide connection pool for a provider, creating it on first use.
+
+    Args:
+        provider: Provider name (openai or deepseek)
+        http_config: Pool settings overriding DEFAULT_HTTP_CONFIG
+
+    Returns:
+        Shared connection pool
+    """
+    settings = {**DEFAULT_HTTP_CONFIG, **(http_config or {})}
+    key = (provider, tuple(sorted(settings.items())))
+    with _provider_pools_lock:
+        pool = _provider_pools.get(key)
+        if pool is None:
+            pool = ProviderConnectionPool(PROVIDER_BASE_URLS[provider], **settings)
+            _provider_pools[key] = pool
+        return pool
+
+
+async def close_provider_pools():
+    """Close the shared provider connections (async clients of the running loop and sync sessions)."""
+    with _provider_pools_lock:
+        pools = list(_provider_pools.values())
+    for pool in pools:
+        await pool.aclose()
+        pool.close()
+
+
+# Scheduler priority lanes, highest priority first
+PRIORITY_LANES = ("interactive", "background")
+
+# Default scheduler settings, overridable through the "scheduler" config section
+DEFAULT_SCHEDULER_CONFIG = {
+    "enabled": True,
+    "max_in_flight": 8,  # Concurrent requests per provider
+    "interactive_reserved": 2,  # Slots background requests may not use
+    "tokens_per_minute": 90000,  # Token budget per provider (0 for no budget)
+    "providers": {}  # Per-provider overrides of the limits above
+}
+
+
+class _Reservation:
+    """A granted scheduler slot and the tokens charged for it."""
+
+    def __init__(self, provider: str, lane: str, tokens: int):
+        self.provider = provider
+        self.lane = lane
+        self.tokens = tokens
+        self.used_tokens: Optional[int] = None  # Set by the caller once known
+
+
+class _ProviderQueue:
+    """In-flight count, token bucket and priority queues of one provider."""
+
+    def __init__(self, max_in_flight: int, interactive_reserved: int, tokens_per_minute: int):
+        self.max_in_flight = max(1, max_in_flight)
+        self.interactive_reserved = min(max(0, interactive_reserved), self.max_in_flight - 1)
+        self.tokens_per_minute = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self.updated_at = time.monotonic()
+        self.in_flight = 0
+        self.waiters: Dict[str, deque] = {lane: deque() for lane in PRIORITY_LANES}
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def refill(self):
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        if self.tokens_per_minute:
+            self.tokens = min(
+                float(self.tokens_per_minute),
+                self.tokens + (now - self.updated_at) * self.tokens_per_minute / 60.0
+            )
+        self.updated_at = now
+
+    def charge(self, tokens: int) -> int:
+        """Get the tokens to charge a request, capped so any request fits the bucket."""
+        return min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+
+    def blocked_for(self, lane: str, tokens: int) -> Optional[float]:
+        """
+        Check whether a request can start now.
+
+        Returns:
+            None if it can start, 0 if it waits for a slot, or the seconds
+            until the token budget covers it
+        """
+        limit = self.max_in_flight if lane == "interactive" else self.max_in_flight - self.interactive_reserved
+        if self.in_flight >= limit:
+            return 0.0
+        self.refill()
+        if self.tokens < tokens:
+            return (tokens - self.tokens) * 60.0 / self.tokens_per_minute
+        return None
+
+
+class LLMScheduler:
+    """
+    Concurrency- and token-limited admission of async LLM requests.
+
+    Every provider has a maximum number of requests in flight and a
+    tokens-per-minute budget. Requests wait in priority lanes: interactive
+    requests are always admitted before background ones, and background
+    requests may not take the slots reserved for interactive traffic, so
+    batch work only soaks up leftover capacity. Requests are charged their
+    estimated tokens up front and refunded the difference once their actual
+    usage is known.
+
+    A scheduler belongs to one event loop; use get_llm_scheduler.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            config: Scheduler settings overriding DEFAULT_SCHEDULER_CONFIG
+        """
+        self.config = {**DEFAULT_SCHEDULER_CONFIG, **(config or {})}
+        self._queues: Dict[str, _ProviderQueue] = {}
+        self.metrics = {
+            lane: {"requests": 0, "waited": 0, "total_wait_time": 0.0, "max_wait_time": 0.0, "max_queue_depth": 0}
+            for lane in PRIORITY_LANES
+        }
+
+    def _queue(self, provider: str) -> _ProviderQueue:
+        """Get the queue of a provider, creating it on first use."""
+        queue = self._queues.get(provider)
+        if queue is None:
+            limits = {**self.config, **self.config.get("providers", {}).get(provider, {})}
+            queue = _ProviderQueue(
+                limits["max_in_flight"], limits["interactive_reserved"], limits["tokens_per_minute"]
+            )
+            self._queues[provider] = queue
+        return queue
+
+    def _record_wait(self, lane: str, wait_time: float):
+        """Record how long an admitted request waited."""
+        metrics = self.metrics[lane]
+        metrics["requests"] += 1
+        if wait_time > 0:
+            metrics["waited"] += 1
+            metrics["total_wait_time"] += wait_time
+            metrics["max_wait_time"] = max(metrics["max_wait_time"], wait_time)
+
+    def _start(self, queue: _ProviderQueue, tokens: int):
+        """Account for an admitted request."""
+        queue.in_flight += 1
+        queue.tokens -= tokens
+
+    def _dispatch(self, provider: str):
+        """Admit waiting requests in priority order while capacity allows."""
+        queue = self._queues[provider]
+        queue.timer = None
+
+        for lane in PRIORITY_LANES:
+            waiters = queue.waiters[lane]
+            while waiters:
+                future, tokens, enqueued_at = waiters[0]
+                if future.done():
+                    waiters.popleft()
+                    continue
+
+                delay = queue.blocked_for(lane, tokens)
+                if delay is not None:
+                    # Lower lanes never overtake a blocked higher lane
+                    if delay > 0 and queue.timer is None:
+                        queue.timer = asyncio.get_running_loop().call_later(delay, self._dispatch, provider)
+                    return
+
+                waiters.popleft()
+                self._start(queue, tokens)
+                self._record_wait(lane, time.monotonic() - enqueued_at)
+                future.set_result(None)
+
+    async def acquire(self, provider: str, lane: str = "interactive", tokens: int = 0) -> _Reservation:
+        """
+        Wait for a slot and token budget for a request.
+
+        Args:
+            provider: Provider the request goes to
+            lane: Priority lane (interactive or background)
+            tokens: Estimated tokens of the request
+
+        Returns:
+            Reservation to pass to release
+        """
+        if lane not in PRIORITY_LANES:
+            raise ValueError(f"Unknown priority lane: {lane}")
+
+        queue = self._queue(provider)
+        tokens = queue.charge(tokens)
+        reservation = _Reservation(provider, lane, tokens)
+
+        # Only start straight away when nobody of equal or higher priority is waiting
+        ahead = any(queue.waiters[other] for other in PRIORITY_LANES[:PRIORITY_LANES.index(lane) + 1])
+        if not ahead and queue.blocked_for(lane, tokens) is None:
+            self._start(queue, tokens)
+            self._record_wait(lane, 0.0)
+            return reservation
+
+        future = asyncio.get_running_loop().create_future()
+        queue.waiters[lane].append((future, tokens, time.monotonic()))
+        self.metrics[lane]["max_queue_depth"] = max(self.metrics[lane]["max_queue_depth"], len(queue.waiters[lane]))
+        self._dispatch(provider)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the waiter was cancelled
+                self.release(reservation)
+            else:
+                future.cancel()
+                self._dispatch(provider)
+            raise
+        return reservation
+
+    def release(self, reservation: _Reservation):
+        """
+        Free a slot and refund unused tokens.
+
+        Args:
+            reservation: Reservation returned by acquire
+        """
+        queue = self._queues[reservation.provider]
+        queue.in_flight -= 1
+        if reservation.used_tokens is not None and queue.tokens_per_minute:
+            queue.refill()
+            queue.tokens = min(
+                float(queue.tokens_per_minute),
+                queue.tokens + reservation.tokens - min(reservation.used_tokens, reservation.tokens)
+            )
+        self._dispatch(reservation.provider)
+
+    @asynccontextmanager
+    async def slot(self, provider: str, lane: str = "interactive", tokens: int = 0):
+        """
+        Hold a scheduler slot for the duration of a block.
+
+        Args:
+            provider: Provider the request goes to
+            lane: Priority lane (interactive or background)
+            tokens: Estimated tokens of the request
+
+        Yields:
+            Reservation; set ``used_tokens`` on it to refund unused budget
+        """
+        reservation = await self.acquire(provider, lane, tokens)
+        try:
+            yield reservation
+        finally:
+            self.release(reservation)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth, in-flight and wait time metrics.
+
+        Returns:
+            Dictionary of per-lane and per-provider metrics
+        """
+        lanes = {}
+        for lane, metrics in self.metrics.items():
+            lanes[lane] = {
+                **metrics,
+                "queue_depth": sum(
+                    sum(1 for waiter in queue.waiters[lane] if not waiter[0].done())
+                    for queue in self._queues.values()
+                ),
+                "average_wait_time": metrics["total_wait_time"] / metrics["waited"] if metrics["waited"] else 0.0
+            }
+
+        providers = {}
+        for provider, queue in self._queues.items():
+            queue.refill()
+            providers[provider] = {
+                "in_flight": queue.in_flight,
+                "max_in_flight": queue.max_in_flight,
+                "tokens_available": int(queue.tokens) if queue.tokens_per_minute else None
+            }
+
+        return {"lanes": lanes, "providers": providers}
+
+
+# One scheduler per event loop, since waiters are futures of that loop
+_schedulers: Dict[asyncio.AbstractEventLoop, LLMScheduler] = {}
+
+
+def get_llm_scheduler(config: Optional[Dict[str, Any]] = None) -> LLMScheduler:
+    """
+    Get the scheduler of the running event loop, creating it on first use.
+
+    Args:
+        config: Scheduler settings (used on first creation)
+
+    Returns:
+        Shared scheduler
+    """
+    loop = asyncio.get_running_loop()
+    with _provider_pools_lock:
+        scheduler = _schedulers.get(loop)
+        if scheduler is None:
+            for stale_loop in [l for l in _schedulers if l.is_closed()]:
+                del _schedulers[stale_loop]
+            scheduler = LLMScheduler(config)
+            _schedulers[loop] = scheduler
+        return scheduler
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Roughly estimate the prompt tokens of chat messages (about four characters per token)."""
+    return sum(len(str(message.get("content") or "")) // 4 + 4 for message in messages)
+
+
 class LLMClient:
     """Unified client for language model interactions."""
 
@@ -37,9 +508,111 @@ class LLMClient:
         self.openai_api_key = self.api_keys.get("openai", os.environ.get("OPENAI_API_KEY", ""))
         self.deepseek_api_key = self.api_keys.get("deepseek", os.environ.get("DEEPSEEK_API_KEY", ""))
 
+        # Connection pool settings
+        self.http_config = {**DEFAULT_HTTP_CONFIG, **self.config.get("http", {})}
+
+        # Batched embedding settings
+        self.embedding_config = {**DEFAULT_EMBEDDING_CONFIG, **self.config.get("embeddings", {})}
+
+        # Completion cache settings
+        self.response_cache_config = {**DEFAULT_RESPONSE_CACHE_CONFIG, **self.config.get("response_cache", {})}
+
+        # Async request scheduler settings
+        self.scheduler_config = {**DEFAULT_SCHEDULER_CONFIG, **self.config.get("scheduler", {})}
+
         # Validate configuration
         self._validate_config()
 
+        # Route across every provider with a key and a model, the configured one preferred
+        self.router = None
+        routing_config = self.config.get("routing", {})
+        self.provider_models = {**DEFAULT_PROVIDER_MODELS, **routing_config.get("models", {})}
+        if self.provider != "mock" and routing_config.get("enabled", True):
+            providers = [self.provider] + [
+                provider for provider, api_key in (("openai", self.openai_api_key), ("deepseek", self.deepseek_api_key))
+                if api_key and provider != self.provider and self.provider_models.get(provider)
+            ]
+            self.router = ProviderRouter(providers, routing_config)
+
+    def _provider_model(self, provider: str, model: str) -> str:
+        """Get the model to request from a provider: the caller's for the configured provider, else the provider's routing model."""
+        if provider == self.provider:
+            return model
+        return self.provider_models[provider]
+
+    def _get_pool(self, provider: str) -> ProviderConnectionPool:
+        """Get the shared connection pool for a provider."""
+        return get_provider_pool(provider, self.http_config)
+
+    def _get_response_cache(self) -> Optional[ResponseCache]:
+        """Get the completion cache, or None when caching is disabled."""
+        if self.provider == "mock" or not self.response_cache_config.get("enabled"):
+            return None
+        return get_response_cache(
+            self.response_cache_config["cache_dir"],
+            ttl_seconds=self.response_cache_config["ttl_hours"] * 3600,
+            similarity_threshold=self.response_cache_config["similarity_threshold"]
+        )
+
+    def _lookup_response(self,
+                         cache: ResponseCache,
+                         keys: Tuple[str, str, str]) -> Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Look up a cached completion by exact key, then by prompt similarity.
+
+        Args:
+            cache: Completion cache
+            keys: Request keys from ResponseCache.make_keys
+
+        Returns:
+            Tuple of (cached response or None, prompt embedding if one was computed)
+        """
+        cache_key, scope_key, prompt = keys
+        embedding = None
+        try:
+            response = cache.get(cache_key)
+            if response is not None:
+                return response, None
+
+            if self.response_cache_config.get("semantic") and prompt:
+                try:
+                    embedding = np.asarray(self.get_embedding(prompt), dtype=np.float32)
+                except Exception as e:
+                    logger.warning(f"Failed to embed prompt for the completion cache: {str(e)}")
+
+                if embedding is not None:
+                    response = cache.get_similar(scope_key, embedding)
+                    if response is not None:
+                        return response, embedding
+
+            cache.record_miss()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading completion cache: {str(e)}")
+        return None, embedding
+
+    def _store_response(self,
+                        cache: ResponseCache,
+                        keys: Tuple[str, str, str],
+                        response: Dict[str, Any],
+                        embedding: Optional[np.ndarray]):
+        """Store a completion in the cache, ignoring cache write errors."""
+        if not response.get("choices"):
+            return
+        try:
+            cache.set(keys[0], keys[1], response, embedding)
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing completion cache: {str(e)}")
+
+    def _get_scheduler(self) -> Optional[LLMScheduler]:
+        """Get the running loop's scheduler, or None when scheduling is disabled."""
+        if self.provider == "mock" or not self.scheduler_config.get("enabled"):
+            return None
+        return get_llm_scheduler(self.scheduler_config)
+
+    def _scheduled_provider(self) -> str:
+        """Get the provider a request is expected to go to, for scheduling."""
+        return self.router.rank()[0] if self.router is not None else self.provider
+
     def _validate_config(self):
         """Validate the configuration."""
         if self.provider == "openai" and not self.openai_api_key:
@@ -66,7 +639,8 @@ class LLMClient:
                        messages: List[Dict[str, str]],
                        temperature: Optional[float] = None,
                        max_tokens: Optional[int] = None,
-                       model: Optional[str] = None) -> Dict[str, Any]:
+                       model: Optional[str] = None,
+                       cache_scope: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Generate a chat completion.
 
@@ -75,6 +649,7 @@ class LLMClient:
             temperature: Temperature for generation
             max_tokens: Maximum tokens to generate
             model: Model to use
+            cache_scope: Variables the prompt was built from, keying cached completions
 
         Returns:
             Response dictionary
@@ -84,15 +659,48 @@ class LLMClient:
         max_tokens = max_tokens if max_tokens is not None else self.max_tokens
         model = model if model is not None else self.model
 
-        # Call the appropriate provider
-        if self.provider == "openai":
+        cache = self._get_response_cache()
+        if cache is None:
+            return self._chat_completion(messages, temperature, max_tokens, model)
+
+        keys = cache.make_keys(messages, self.provider, model, temperature, max_tokens, cache_scope)
+        cached, embedding = self._lookup_response(cache, keys)
+        if cached is not None:
+            return cached
+
+        response = self._chat_completion(messages, temperature, max_tokens, model)
+        self._store_response(cache, keys, response, embedding)
+        return response
+
+    def _chat_completion(self,
+                         messages: List[Dict[str, str]],
+                         temperature: float,
+                         max_tokens: int,
+                         model: str) -> Dict[str, Any]:
+        """Generate a chat completion, routed across providers when a router is configured."""
+        if self.router is not None:
+            return self.router.call(
+                lambda provider: self._provider_chat_completion(
+                    provider, messages, temperature, max_tokens, self._provider_model(provider, model)
+                )
+            )
+        return self._provider_chat_completion(self.provider, messages, temperature, max_tokens, model)
+
+    def _provider_chat_completion(self,
+                                  provider: str,
+                                  messages: List[Dict[str, str]],
+                                  temperature: float,
+                                  max_tokens: int,
+                                  model: str) -> Dict[str, Any]:
+        """Generate a chat completion with a specific provider."""
+        if provider == "openai":
             return self._openai_chat_completion(messages, temperature, max_tokens, model)
-        elif self.provider == "deepseek":
+        elif provider == "deepseek":
             return self._deepseek_chat_completion(messages, temperature, max_tokens, model)
-        elif self.provider == "mock":
+        elif provider == "mock":
             return self._mock_chat_completion(messages, temperature, max_tokens, model)
         else:
-            raise ValueError(f"Unsupported provider: {self.provider}")
+            raise ValueError(f"Unsupported provider: {provider}")
 
     def _openai_chat_completion(self,
                               messages: List[Dict[str, str]],
@@ -126,12 +734,7 @@ class LLMClient:
             "max_tokens": max_tokens
         }
 
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=60
-        )
+        response = self._get_pool("openai").post("/chat/completions", headers, data)
 
         response.raise_for_status()
         return response.json()
@@ -177,16 +780,41 @@ class LLMClient:
             "max_tokens": max_tokens
         }
 
-        response = requests.post(
-            "https://api.deepseek.com/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=60
-        )
+        response = self._get_pool("deepseek").post("/chat/completions", headers, data)
 
         response.raise_for_status()
         return response.json()
 
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """
+        Get the running event loop's scheduler metrics.
+
+        Safe to call from synchronous code; never creates a scheduler.
+
+        Returns:
+            Dictionary of queue depth, in-flight and wait time metrics, empty
+            when scheduling is disabled, no event loop is running or the
+            loop has not scheduled a request yet
+        """
+        if not self.scheduler_config.get("enabled"):
+            return {}
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return {}
+        with _provider_pools_lock:
+            scheduler = _schedulers.get(loop)
+        return scheduler.get_stats() if scheduler is not None else {}
+
+    def get_provider_stats(self) -> Dict[str, Any]:
+        """
+        Get per-provider latency and error statistics.
+
+        Returns:
+            Dictionary of provider statistics keyed by provider name
+        """
+        return self.router.get_stats() if self.router is not None else {}
+
     def extract_response_text(self, response: Dict[str, Any]) -> str:
         """
         Extract the response text from a completion response.
@@ -204,11 +832,63 @@ class LLMClient:
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
+    async def achat_completion(self,
+                               messages: List[Dict[str, str]],
+                               temperature: Optional[float] = None,
+                               max_tokens: Optional[int] = None,
+                               model: Optional[str] = None,
+                               priority: str = "interactive",
+                               cache_scope: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Generate a chat completion without blocking the event loop.
+
+        Provider calls are admitted by the event loop's LLMScheduler; cached
+        completions are returned without taking a slot.
+
+        Args:
+            messages: List of message dictionaries
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
+            model: Model to use
+            priority: Scheduler lane (interactive or background)
+            cache_scope: Variables the prompt was built from, keying cached completions
+
+        Returns:
+            Response dictionary
+        """
+        # Use provided values or fall back to instance defaults
+        temperature = temperature if temperature is not None else self.temperature
+        max_tokens = max_tokens if max_tokens is not None else self.max_tokens
+        model = model if model is not None else self.model
+
+        cache = self._get_response_cache()
+        keys, embedding = None, None
+        if cache is not None:
+            keys = cache.make_keys(messages, self.provider, model, temperature, max_tokens, cache_scope)
+            cached, embedding = await asyncio.to_thread(self._lookup_response, cache, keys)
+            if cached is not None:
+                return cached
+
+        scheduler = self._get_scheduler()
+        if scheduler is None:
+            response = await asyncio.to_thread(self._chat_completion, messages, temperature, max_tokens, model)
+        else:
+            tokens = estimate_tokens(messages) + max_tokens
+            async with scheduler.slot(self._scheduled_provider(), priority, tokens) as reservation:
+                response = await asyncio.to_thread(self._chat_completion, messages, temperature, max_tokens, model)
+                reservation.used_tokens = response.get("usage", {}).get("total_tokens")
+
+        if cache is not None:
+            await asyncio.to_thread(self._store_response, cache, keys, response, embedding)
+        return response
+
     async def stream_chat_completion(self,
                                    messages: List[Dict[str, str]],
                                    temperature: Optional[float] = None,
                                    max_tokens: Optional[int] = None,
-                                   model: Optional[str] = None) -> AsyncGenerator[str, None]:
+                                   model: Optional[str] = None,
+                                   priority: str = "interactive",
+                                   cache_scope: Optional[Dict[str, Any]] = None) -> AsyncGenerator[str, None]:
         """
         Stream a chat completion.
 
@@ -217,6 +897,8 @@ class LLMClient:
             temperature: Temperature for generation
             max_tokens: Maximum tokens to generate
             model: Model to use
+            priority: Scheduler lane (interactive or background)
+            cache_scope: Variables the prompt was built from, keying cached completions
 
         Yields:
             Chunks of the response text
@@ -226,18 +908,116 @@ class LLMClient:
         max_tokens = max_tokens if max_tokens is not None else self.max_tokens
         model = model if model is not None else self.model
 
-        # Call the appropriate provider
-        if self.provider == "openai":
+        cache = self._get_response_cache()
+        if cache is None:
+            async for chunk in self._scheduled_stream(messages, temperature, max_tokens, model, priority):
+                yield chunk
+            return
+
+        keys = cache.make_keys(messages, self.provider, model, temperature, max_tokens, cache_scope)
+        cached, embedding = await asyncio.to_thread(self._lookup_response, cache, keys)
+        if cached is not None:
+            yield self.extract_response_text(cached)
+            return
+
+        chunks = []
+        async for chunk in self._scheduled_stream(messages, temperature, max_tokens, model, priority):
+            chunks.append(chunk)
+            yield chunk
+
+        # Stored in the non-streaming response shape so both paths share entries
+        response = {"choices": [{"message": {"role": "assistant", "content": "".join(chunks)}}]}
+        await asyncio.to_thread(self._store_response, cache, keys, response, embedding)
+
+    async def _scheduled_stream(self,
+                                messages: List[Dict[str, str]],
+                                temperature: float,
+                                max_tokens: int,
+                                model: str,
+                                priority: str) -> AsyncGenerator[str, None]:
+        """
+        Stream a chat completion while holding a scheduler slot.
+
+        Closing or cancelling the generator closes the provider's HTTP stream;
+        such early stops are recorded in the cancellation metrics.
+        """
+        scheduler = self._get_scheduler()
+        started_at = time.time()
+        chunks = 0
+        try:
+            if scheduler is None:
+                async for chunk in self._stream_chat_completion(messages, temperature, max_tokens, model):
+                    chunks += 1
+                    yield chunk
+                return
+
+            prompt_tokens = estimate_tokens(messages)
+            async with scheduler.slot(self._scheduled_provider(), priority, prompt_tokens + max_tokens) as reservation:
+                generated = 0
+                async for chunk in self._stream_chat_completion(messages, temperature, max_tokens, model):
+                    chunks += 1
+                    generated += len(chunk)
+                    yield chunk
+                reservation.used_tokens = prompt_tokens + generated // 4
+        except (GeneratorExit, asyncio.CancelledError):
+            record_cancellation("llm_stream", time.time() - started_at, chunks)
+            raise
+
+    async def _stream_chat_completion(self,
+                                      messages: List[Dict[str, str]],
+                                      temperature: float,
+                                      max_tokens: int,
+                                      model: str) -> AsyncGenerator[str, None]:
+        """
+        Stream a chat completion, routed across providers when a router is configured.
+
+        A provider that fails before its first chunk is recorded as failed and
+        the next one is tried; once chunks have been yielded, errors propagate.
+        """
+        if self.router is None:
+            async for chunk in self._provider_stream_chat_completion(self.provider, messages, temperature, max_tokens, model):
+                yield chunk
+            return
+
+        last_error = None
+        for provider in self.router.rank():
+            started = False
+            try:
+                provider_model = self._provider_model(provider, model)
+                async for chunk in self._provider_stream_chat_completion(provider, messages, temperature, max_tokens, provider_model):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                self.router.record(provider, False, error=e)
+                if started:
+                    raise
+                logger.warning(f"Provider {provider} failed to stream: {str(e)}")
+                last_error = e
+                continue
+
+            self.router.record(provider, True)
+            return
+
+        raise last_error
+
+    async def _provider_stream_chat_completion(self,
+                                               provider: str,
+                                               messages: List[Dict[str, str]],
+                                               temperature: float,
+                                               max_tokens: int,
+                                               model: str) -> AsyncGenerator[str, None]:
+        """Stream a chat completion from a specific provider."""
+        if provider == "openai":
             async for chunk in self._openai_stream_chat_completion(messages, temperature, max_tokens, model):
                 yield chunk
-        elif self.provider == "deepseek":
+        elif provider == "deepseek":
             async for chunk in self._deepseek_stream_chat_completion(messages, temperature, max_tokens, model):
                 yield chunk
-        elif self.provider == "mock":
+        elif provider == "mock":
             async for chunk in self._mock_stream_chat_completion(messages, temperature, max_tokens, model):
                 yield chunk
         else:
-            raise ValueError(f"Unsupported provider: {self.provider}")
+            raise ValueError(f"Unsupported provider: {provider}")
 
     async def _openai_stream_chat_completion(self,
                                           messages: List[Dict[str, str]],
@@ -272,27 +1052,22 @@ class LLMClient:
             "stream": True
         }
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            async with client.stream(
-                "POST",
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=data
-            ) as response:
-                response.raise_for_status()
-
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
-                        if data == "[DONE]":
-                            break
-
-                        try:
-                            chunk = json.loads(data)
-                            if chunk.get("choices") and chunk["choices"][0].get("delta", {}).get("content"):
-                                yield chunk["choices"][0]["delta"]["content"]
-                        except json.JSONDecodeError:
-                            logger.warning(f"Failed to parse chunk: {data}")
+        client = self._get_pool("openai").get_async_client()
+        async with client.stream("POST", "/chat/completions", headers=headers, json=data) as response:
+            response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    data = line[6:]
+                    if data == "[DONE]":
+                        break
+
+                    try:
+                        chunk = json.loads(data)
+                        if chunk.get("choices") and chunk["choices"][0].get("delta", {}).get("content"):
+                            yield chunk["choices"][0]["delta"]["content"]
+                    except json.JSONDecodeError:
+                        logger.warning(f"Failed to parse chunk: {data}")
 
     async def _deepseek_stream_chat_completion(self,
                                             messages: List[Dict[str, str]],
@@ -336,27 +1111,35 @@ class LLMClient:
             "stream": True
         }
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            async with client.stream(
-                "POST",
-                "https://api.deepseek.com/v1/chat/completions",
-                headers=headers,
-                json=data
-            ) as response:
-                response.raise_for_status()
-
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
-                        if data == "[DONE]":
-                            break
-
-                        try:
-                            chunk = json.loads(data)
-                            if chunk.get("choices") and chunk["choices"][0].get("delta", {}).get("content"):
-                                yield chunk["choices"][0]["delta"]["content"]
-                        except json.JSONDecodeError:
-                            logger.warning(f"Failed to parse chunk: {data}")
+        client = self._get_pool("deepseek").get_async_client()
+        async with client.stream("POST", "/chat/completions", headers=headers, json=data) as response:
+            response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    data = line[6:]
+                    if data == "[DONE]":
+                        break
+
+                    try:
+                        chunk = json.loads(data)
+                        if chunk.get("choices") and chunk["choices"][0].get("delta", {}).get("content"):
+                            yield chunk["choices"][0]["delta"]["content"]
+                    except json.JSONDecodeError:
+                        logger.warning(f"Failed to parse chunk: {data}")
+
+    def _get_embedding_model(self, model: Optional[str]) -> str:
+        """Use the provided model or fall back to the provider's default embedding model."""
+        if model is not None:
+            return model
+        if self.provider == "openai":
+            return "text-embedding-ada-002"
+        elif self.provider == "deepseek":
+            return "deepseek-embedding"
+        elif self.provider == "mock":
+            return "mock-embedding"
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
 
     def get_embedding(self, text: str, model: Optional[str] = None) -> List[float]:
         """
@@ -369,14 +1152,10 @@ class LLMClient:
         Returns:
             Embedding vector
         """
-        # Use provided model or fall back to default embedding model
-        if model is None:
-            if self.provider == "openai":
-                model = "text-embedding-ada-002"
-            elif self.provider == "deepseek":
-                model = "deepseek-embedding"
-            else:
-                raise ValueError(f"Unsupported provider: {self.provider}")
+        model = self._get_embedding_model(model)
+
+        if self._get_embedding_cache(model) is not None:
+            return self.get_embeddings([text], model=model)[0].tolist()
 
         # Call the appropriate provider
         if self.provider == "openai":
@@ -388,39 +1167,171 @@ class LLMClient:
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
-    def _openai_get_embedding(self, text: str, model: str) -> List[float]:
+    def get_embeddings(self,
+                       texts: List[str],
+                       batch_size: Optional[int] = None,
+                       model: Optional[str] = None,
+                       max_concurrency: Optional[int] = None) -> np.ndarray:
         """
-        Get an embedding using OpenAI.
+        Get embeddings for many texts.
+
+        Stored vectors are reused from the embedding cache; the remaining
+        texts are packed into array inputs of ``batch_size`` per provider
+        request and the batches are sent concurrently over the pooled session.
 
         Args:
-            text: Text to embed
+            texts: Texts to embed
+            batch_size: Inputs per provider request (default: embeddings.batch_size config)
             model: Model to use
+            max_concurrency: Batches in flight at once (default: embeddings.max_concurrency config)
 
         Returns:
-            Embedding vector
+            Contiguous float32 matrix with one row per text, in input order
         """
-        if not self.openai_api_key:
-            raise ValueError("OpenAI API key not provided")
+        model = self._get_embedding_model(model)
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        cache = self._get_embedding_cache(model)
+        if cache is None:
+            return self._compute_embeddings(texts, model, batch_size, max_concurrency)
+
+        hits, hit_vectors, misses = cache.lookup(texts)
+        if not len(misses):
+            return hit_vectors
+
+        # Embed each distinct missing text once
+        miss_texts = list(dict.fromkeys(texts[i] for i in misses))
+        computed = self._compute_embeddings(miss_texts, model, batch_size, max_concurrency)
+        try:
+            cache.put(miss_texts, computed)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to store embeddings: {str(e)}")
+
+        positions = {text: row for row, text in enumerate(miss_texts)}
+        matrix = np.empty((len(texts), computed.shape[1]), dtype=np.float32)
+        if len(hits):
+            matrix[hits] = hit_vectors
+        matrix[misses] = computed[[positions[texts[i]] for i in misses]]
+        logger.debug(f"Embedded {len(miss_texts)} of {len(texts)} texts ({len(hits)} cached)")
+        return matrix
+
+    def _get_embedding_cache(self, model: str) -> Optional[EmbeddingCache]:
+        """Get the embedding store for a model, or None when caching is disabled."""
+        if self.provider == "mock" or not self.embedding_config.get("cache"):
+            return None
+        return get_embedding_cache(self.embedding_config["cache_dir"], self.provider, model)
+
+    def _compute_embeddings(self,
+                            texts: List[str],
+                            model: str,
+                            batch_size: Optional[int] = None,
+                            max_concurrency: Optional[int] = None) -> np.ndarray:
+        """
+        Embed texts with the provider in concurrent batches.
+
+        Args:
+            texts: Texts to embed
+            model: Model to use
+            batch_size: Inputs per provider request
+            max_concurrency: Batches in flight at once
+
+        Returns:
+            Contiguous float32 matrix with one row per text, in input order
+        """
+        if self.provider == "mock":
+            return self._mock_get_embeddings(texts, model)
+        elif self.provider == "openai":
+            embed_batch = self._openai_get_embeddings
+        elif self.provider == "deepseek":
+            embed_batch = self._deepseek_get_embeddings
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+
+        batch_size = max(1, batch_size or self.embedding_config["batch_size"])
+        max_concurrency = max(1, max_concurrency or self.embedding_config["max_concurrency"])
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+        if len(batches) == 1:
+            results = [embed_batch(batches[0], model)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches))) as executor:
+                results = list(executor.map(lambda batch: embed_batch(batch, model), batches))
+
+        # Copy each batch straight into its rows of one preallocated matrix
+        matrix = None
+        for index, vectors in enumerate(results):
+            block = np.asarray(vectors, dtype=np.float32)
+            if matrix is None:
+                matrix = np.empty((len(texts), block.shape[1]), dtype=np.float32)
+            start = index * batch_size
+            matrix[start:start + len(block)] = block
+
+        return matrix
+
+    def _post_embeddings(self, provider: str, api_key: str, texts: List[str], model: str) -> List[List[float]]:
+        """
+        Embed a batch of texts in one provider request.
 
+        Args:
+            provider: Provider name
+            api_key: Provider API key
+            texts: Texts to embed
+            model: Model to use
+
+        Returns:
+            Embedding vectors in input order
+        """
         headers = {
             "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.openai_api_key}"
+            "Authorization": f"Bearer {api_key}"
         }
 
         data = {
             "model": model,
-            "input": text
+            "input": texts
         }
 
-        response = requests.post(
-            "https://api.openai.com/v1/embeddings",
-            headers=headers,
-            json=data,
-            timeout=30
-        )
+        response = self._get_pool(provider).post("/embeddings", headers, data, timeout=30)
 
         response.raise_for_status()
-        return response.json().get("data", [{}])[0].get("embedding", [])
+        items = response.json().get("data", [])
+        if len(items) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings from {provider}, got {len(items)}")
+
+        # Providers tag every vector with its input index
+        items = sorted(items, key=lambda item: item.get("index", 0))
+        return [item.get("embedding", []) for item in items]
+
+    def _openai_get_embedding(self, text: str, model: str) -> List[float]:
+        """
+        Get an embedding using OpenAI.
+
+        Args:
+            text: Text to embed
+            model: Model to use
+
+        Returns:
+            Embedding vector
+        """
+        return self._openai_get_embeddings([text], model)[0]
+
+    def _openai_get_embeddings(self, texts: List[str], model: str) -> List[List[float]]:
+        """
+        Get embeddings for a batch of texts using OpenAI.
+
+        Args:
+            texts: Texts to embed
+            model: Model to use
+
+        Returns:
+            Embedding vectors in input order
+        """
+        if not self.openai_api_key:
+            raise ValueError("OpenAI API key not provided")
+
+        return self._post_embeddings("openai", self.openai_api_key, texts, model)
 
     def _deepseek_get_embedding(self, text: str, model: str) -> List[float]:
         """
@@ -433,28 +1344,23 @@ class LLMClient:
         Returns:
             Embedding vector
         """
-        if not self.deepseek_api_key:
-            raise ValueError("DeepSeek API key not provided")
+        return self._deepseek_get_embeddings([text], model)[0]
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.deepseek_api_key}"
-        }
+    def _deepseek_get_embeddings(self, texts: List[str], model: str) -> List[List[float]]:
+        """
+        Get embeddings for a batch of texts using DeepSeek.
 
-        data = {
-            "model": model,
-            "input": text
-        }
+        Args:
+            texts: Texts to embed
+            model: Model to use
 
-        response = requests.post(
-            "https://api.deepseek.com/v1/embeddings",
-            headers=headers,
-            json=data,
-            timeout=30
-        )
+        Returns:
+            Embedding vectors in input order
+        """
+        if not self.deepseek_api_key:
+            raise ValueError("DeepSeek API key not provided")
 
-        response.raise_for_status()
-        return response.json().get("data", [{}])[0].get("embedding", [])
+        return self._post_embeddings("deepseek", self.deepseek_api_key, texts, model)
 
     def _mock_chat_completion(self,
                             messages: List[Dict[str, str]],
@@ -632,33 +1538,31 @@ Please provide more specific information about what you're looking for, such as
         Returns:
             Mock embedding vector
         """
-        logger.info("Using mock embedding")
+        return self._mock_get_embeddings([text], model)[0].tolist()
 
-        # Generate a deterministic but unique embedding based on the text
-        import hashlib
+    def _mock_get_embeddings(self, texts: List[str], model: str) -> np.ndarray:
+        """
+        Generate mock embeddings when no API keys are available.
 
-        # Create a hash of the text
-        text_hash = hashlib.md5(text.encode()).hexdigest()
+        Each text gets a deterministic but unique vector: the 16 bytes of its
+        MD5 digest scaled to [-1, 1], zero-padded to 384 dimensions.
 
-        # Convert the hash to a list of floats
-        embedding = []
-        for i in range(0, len(text_hash), 2):
-            if i + 2 <= len(text_hash):
-                # Convert each pair of hex digits to a float between -1 and 1
-                hex_pair = text_hash[i:i+2]
-                value = int(hex_pair, 16) / 255.0 * 2 - 1  # Scale to [-1, 1]
-                embedding.append(value)
+        Args:
+            texts: Texts to embed
+            model: Model to use
+
+        Returns:
+            Contiguous float32 matrix with one row per text
+        """
+        logger.info(f"Using mock embeddings for {len(texts)} texts")
 
-        # Pad or truncate to a standard embedding size (e.g., 384 dimensions)
         target_size = 384
-        if len(embedding) < target_size:
-            # Pad with zeros
-            embedding.extend([0.0] * (target_size - len(embedding)))
-        elif len(embedding) > target_size:
-            # Truncate
-            embedding = embedding[:target_size]
+        digests = b"".join(hashlib.md5(text.encode()).digest() for text in texts)
+        values = np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), 16)
 
-        return embedding
+        embeddings = np.zeros((len(texts), target_size), dtype=np.float32)
+        embeddings[:, :16] = values / np.float32(255.0) * 2 - 1  # Scale to [-1, 1]
+        return embeddings
 
     def generate_restaurant_insights(self, restaurant_data: Dict[str, Any]) -> str:
         """
@@ -706,7 +1610,9 @@ Please provide more specific information about what you're looking for, such as
                 return self._generate_mock_response(prompt)
 
             # Otherwise, get the completion from the LLM provider
-            response = self.chat_completion(messages)
+            response = self.chat_completion(
+                messages, cache_scope={"restaurants": restaurants[:5], "restaurant_count": restaurant_count}
+            )
             return self.extract_response_text(response)
         except Exception as e:
             logger.error(f"Error generating insights: {str(e)}")
@@ -761,7 +1667,8 @@ Please provide more specific information about what you're looking for, such as
                     yield chunk
             else:
                 # Otherwise, stream the completion from the LLM provider
-                async for chunk in self.stream_chat_completion(messages):
+                cache_scope = {"restaurants": restaurants[:5], "restaurant_count": restaurant_count}
+                async for chunk in self.stream_chat_completion(messages, priority="background", cache_scope=cache_scope):
                     yield chunk
         except Exception as e:
             logger.error(f"Error streaming insights: {str(e)}")
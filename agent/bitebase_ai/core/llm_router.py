@@ -0,0 +1,321 @@
+"""
+LLM Router - Latency-aware provider selection with failover and hedging.
+
+Every provider call records its latency and outcome in process-wide
+per-provider statistics. The router orders providers by recent median
+latency, puts providers that are cooling down after errors last, fails over
+to the next provider when a call raises, and can optionally hedge: when the
+first provider has not answered within a latency threshold, the same request
+is sent to the next provider and whichever succeeds first is used.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Optional, Callable
+
+import requests
+import httpx
+
+logger = logging.getLogger("LLMRouter")
+
+# Default routing settings, overridable through the "routing" config section
+DEFAULT_ROUTING_CONFIG = {
+    "enabled": True,
+    "hedge": False,  # Send a second request when the first is slow
+    "hedge_after_seconds": None,  # None: use the first provider's p95 latency
+    "min_hedge_after_seconds": 1.0,
+    "window": 100,  # Recent calls kept per provider
+    "max_error_rate": 0.5,  # Error rate over the window that triggers a cooldown
+    "max_consecutive_errors": 3,
+    "cooldown_seconds": 30.0
+}
+
+
+def _is_rate_limited(error: BaseException) -> bool:
+    """Check whether an error is a provider 429 response."""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429
+    return False
+
+
+class ProviderStats:
+    """Rolling latency and error statistics for one provider."""
+
+    def __init__(self, provider: str, window: int = 100):
+        """
+        Initialize the statistics.
+
+        Args:
+            provider: Provider name
+            window: Number of recent calls kept
+        """
+        self.provider = provider
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self,
+               ok: bool,
+               latency: Optional[float] = None,
+               error: Optional[BaseException] = None,
+               max_error_rate: float = 0.5,
+               max_consecutive_errors: int = 3,
+               cooldown_seconds: float = 30.0):
+        """
+        Record the outcome of a call.
+
+        Args:
+            ok: Whether the call succeeded
+            latency: Duration of a successful call in seconds (None to skip latency tracking)
+            error: Exception raised by a failed call
+            max_error_rate: Error rate over the window that triggers a cooldown
+            max_consecutive_errors: Consecutive errors that trigger a cooldown
+            cooldown_seconds: Seconds an unhealthy provider is deprioritized
+        """
+        with self._lock:
+            self.requests += 1
+            self.outcomes.append(ok)
+            if ok:
+                self.consecutive_errors = 0
+                if latency is not None:
+                    self.latencies.append(latency)
+                return
+
+            self.errors += 1
+            self.consecutive_errors += 1
+            error_rate = self.outcomes.count(False) / len(self.outcomes)
+            if (
+                (error is not None and _is_rate_limited(error))
+                or self.consecutive_errors >= max_consecutive_errors
+                or (len(self.outcomes) >= 5 and error_rate > max_error_rate)
+            ):
+                self.cooldown_until = time.time() + cooldown_seconds
+                logger.warning(f"Provider {self.provider} is cooling down for {cooldown_seconds}s")
+
+    def is_healthy(self) -> bool:
+        """Check whether the provider is outside its cooldown."""
+        return time.time() >= self.cooldown_until
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Get a latency percentile over the window.
+
+        Args:
+            q: Percentile between 0 and 100
+
+        Returns:
+            Latency in seconds, or None without samples
+        """
+        with self._lock:
+            if not self.latencies:
+                return None
+            latencies = sorted(self.latencies)
+        index = min(len(latencies) - 1, int(round(q / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the provider statistics.
+
+        Returns:
+            Dictionary of latency percentiles, error rate and health
+        """
+        with self._lock:
+            error_rate = self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+            requests_made, errors = self.requests, self.errors
+        return {
+            "requests": requests_made,
+            "errors": errors,
+            "error_rate": error_rate,
+            "p50_latency": self.percentile(50),
+            "p95_latency": self.percentile(95),
+            "healthy": self.is_healthy()
+        }
+
+
+# Statistics shared by every router in the process
+_provider_stats: Dict[str, ProviderStats] = {}
+_provider_stats_lock = threading.Lock()
+
+# Threads running hedged calls
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_provider_stats(provider: str, window: int = 100) -> ProviderStats:
+    """
+    Get the process-wide statistics for a provider, creating them on first use.
+
+    Args:
+        provider: Provider name
+        window: Number of recent calls kept (used on first creation)
+
+    Returns:
+        Shared provider statistics
+    """
+    with _provider_stats_lock:
+        stats = _provider_stats.get(provider)
+        if stats is None:
+            stats = ProviderStats(provider, window)
+            _provider_stats[provider] = stats
+        return stats
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    """Get the shared executor for hedged calls, creating it on first use."""
+    global _hedge_executor
+    with _provider_stats_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+        return _hedge_executor
+
+
+class ProviderRouter:
+    """Routes calls across providers by recent latency and health."""
+
+    def __init__(self, providers: List[str], config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the router.
+
+        Args:
+            providers: Provider names in order of preference
+            config: Routing settings overriding DEFAULT_ROUTING_CONFIG
+        """
+        self.providers = providers
+        self.config = {**DEFAULT_ROUTING_CONFIG, **(config or {})}
+
+    def _stats(self, provider: str) -> ProviderStats:
+        """Get the shared statistics for a provider."""
+        return get_provider_stats(provider, self.config["window"])
+
+    def rank(self) -> List[str]:
+        """
+        Order the providers for the next call.
+
+        Healthy providers come first, fastest median latency first; providers
+        without samples yet keep their preference order ahead of measured
+        ones so they get measured. Cooling-down providers are kept last as a
+        fallback.
+
+        Returns:
+            Provider names in the order they should be tried
+        """
+        def sort_key(item):
+            preference, provider = item
+            p50 = self._stats(provider).percentile(50)
+            return (0 if p50 is None else 1, p50 or 0.0, preference)
+
+        indexed = list(enumerate(self.providers))
+        healthy = [item for item in indexed if self._stats(item[1]).is_healthy()]
+        unhealthy = [item for item in indexed if not self._stats(item[1]).is_healthy()]
+        return [provider for _, provider in sorted(healthy, key=sort_key) + unhealthy]
+
+    def record(self, provider: str, ok: bool, latency: Optional[float] = None,
+                error: Optional[BaseException] = None):
+        """Record a call outcome in the provider's statistics."""
+        self._stats(provider).record(
+            ok,
+            latency=latency,
+            error=error,
+            max_error_rate=self.config["max_error_rate"],
+            max_consecutive_errors=self.config["max_consecutive_errors"],
+            cooldown_seconds=self.config["cooldown_seconds"]
+        )
+
+    def _timed_call(self, provider: str, fn: Callable[[str], Any]) -> Any:
+        """Call a provider function and record its latency and outcome."""
+        start = time.time()
+        try:
+            result = fn(provider)
+        except Exception as e:
+            self.record(provider, False, error=e)
+            raise
+        self.record(provider, True, latency=time.time() - start)
+        return result
+
+    def _hedge_after(self, provider: str) -> float:
+        """Get the seconds to wait on a provider before hedging."""
+        if self.config["hedge_after_seconds"] is not None:
+            return self.config["hedge_after_seconds"]
+
+        p95 = self._stats(provider).percentile(95)
+        if p95 is None:
+            return float("inf")
+        return max(p95, self.config["min_hedge_after_seconds"])
+
+    def call(self, fn: Callable[[str], Any]) -> Any:
+        """
+        Call a provider function on the best provider, failing over on errors.
+
+        Args:
+            fn: Function taking a provider name and making the call
+
+        Returns:
+            Result of the first successful call
+        """
+        ranked = self.rank()
+        if self.config["hedge"] and len(ranked) > 1:
+            return self._hedged_call(fn, ranked)
+
+        last_error = None
+        for provider in ranked:
+            try:
+                return self._timed_call(provider, fn)
+            except Exception as e:
+                logger.warning(f"Provider {provider} failed: {str(e)}")
+                last_error = e
+
+        raise last_error
+
+    def _hedged_call(self, fn: Callable[[str], Any], ranked: List[str]) -> Any:
+        """
+        Call the first provider and hedge with the next one if it is slow or fails.
+
+        A hedged request that loses is left to finish in the background; its
+        outcome is still recorded in the provider statistics.
+        """
+        executor = _get_hedge_executor()
+        pending = {executor.submit(self._timed_call, ranked[0], fn): ranked[0]}
+        remaining = list(ranked[1:])
+        last_error = None
+
+        hedge_after = self._hedge_after(ranked[0])
+        done, _ = wait(pending, timeout=None if hedge_after == float("inf") else hedge_after)
+        if not done and remaining:
+            provider = remaining.pop(0)
+            logger.info(f"Hedging slow {ranked[0]} request with {provider}")
+            pending[executor.submit(self._timed_call, provider, fn)] = provider
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    logger.warning(f"Provider {provider} failed: {str(e)}")
+                    last_error = e
+
+            # Everything in flight failed; fail over to the next provider
+            if not pending and remaining:
+                provider = remaining.pop(0)
+                pending[executor.submit(self._timed_call, provider, fn)] = provider
+
+        raise last_error
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the statistics of every routed provider.
+
+        Returns:
+            Dictionary of provider statistics keyed by provider name
+        """
+        return {provider: self._stats(provider).get_stats() for provider in self.providers}
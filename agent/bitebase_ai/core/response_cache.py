@@ -0,0 +1,328 @@
+"""
+Response Cache - Exact and semantic cache for LLM chat completions.
+
+Completions are stored in a local SQLite ``ai_cache`` table (the table the
+database schema sets aside for AI responses). Every entry is keyed on the
+provider, model, sampling parameters and normalized messages, so a repeated
+request is answered without calling the provider. Entries also carry the
+embedding of the final user message and a scope key over everything else in
+the request: a request that misses the exact key can still be answered by an
+unexpired entry in the same scope whose prompt embedding is within the cosine
+similarity threshold.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("ResponseCache")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_messages(messages: List[Dict[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Normalize chat messages for keying.
+
+    Roles are kept and message content has runs of whitespace collapsed, so
+    that differences in prompt indentation or line wrapping map to one key.
+
+    Args:
+        messages: List of message dictionaries
+
+    Returns:
+        List of (role, content) pairs
+    """
+    return [
+        (message.get("role", ""), _WHITESPACE.sub(" ", str(message.get("content") or "")).strip())
+        for message in messages
+    ]
+
+
+def _hash(value: Any) -> str:
+    """Get a SHA-256 hex digest of a JSON-serializable value."""
+    return hashlib.sha256(
+        json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class ResponseCache:
+    """
+    Thread-safe completion cache stored in a SQLite file.
+
+    Each thread gets its own connection; WAL mode lets readers proceed while
+    another thread or process writes.
+    """
+
+    def __init__(self,
+                 path: str,
+                 ttl_seconds: float = 6 * 3600,
+                 similarity_threshold: float = 0.95,
+                 max_candidates: int = 1000,
+                 max_entries: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            path: Path of the SQLite database file
+            ttl_seconds: Seconds a stored completion stays valid
+            similarity_threshold: Minimum cosine similarity of prompt embeddings for a semantic hit
+            max_candidates: Most recent entries of a scope compared on a semantic lookup
+            max_entries: Entries kept before the oldest are evicted
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_candidates = max_candidates
+        self.max_entries = max_entries
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        conn = self._connection()
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_cache ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "cache_key TEXT UNIQUE NOT NULL, "
+                "scope_key TEXT NOT NULL, "
+                "response TEXT NOT NULL, "
+                "embedding BLOB, "
+                "expires_at REAL NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_cache_expires ON ai_cache (expires_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_cache_scope ON ai_cache (scope_key, created_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the SQLite connection for the current thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def make_keys(self,
+                  messages: List[Dict[str, str]],
+                  provider: str,
+                  model: str,
+                  temperature: float,
+                  max_tokens: int,
+                  scope: Optional[Dict[str, Any]] = None) -> Tuple[str, str, str]:
+        """
+        Build the keys of a request.
+
+        Args:
+            messages: List of message dictionaries
+            provider: Provider name
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            scope: Structured variables the prompt was built from (location,
+                cuisine, restaurant data, ...), part of both keys
+
+        Returns:
+            Tuple of (exact key, scope key, prompt text). The scope covers
+            the given variables and everything but the final user message,
+            whose text is what gets embedded for semantic lookups, so only
+            paraphrases of a request with the same variables can match.
+        """
+        normalized = normalize_messages(messages)
+        params = [provider, model, temperature, max_tokens, scope]
+
+        prompt = ""
+        context = normalized
+        if normalized and normalized[-1][0] == "user":
+            prompt = normalized[-1][1]
+            context = normalized[:-1]
+
+        return _hash([params, normalized]), _hash([params, context]), prompt
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an unexpired completion by exact key.
+
+        Args:
+            cache_key: Exact request key
+
+        Returns:
+            Cached response or None
+        """
+        row = self._connection().execute(
+            "SELECT response FROM ai_cache WHERE cache_key = ? AND expires_at > ?",
+            (cache_key, time.time())
+        ).fetchone()
+
+        with self._lock:
+            if row is None:
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def get_similar(self, scope_key: str, embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Get the unexpired completion in a scope with the most similar prompt.
+
+        Args:
+            scope_key: Scope key of the request
+            embedding: Embedding of the request's prompt
+
+        Returns:
+            Cached response or None if no prompt reaches the similarity threshold
+        """
+        rows = self._connection().execute(
+            "SELECT id, embedding FROM ai_cache "
+            "WHERE scope_key = ? AND expires_at > ? AND embedding IS NOT NULL "
+            "ORDER BY created_at DESC LIMIT ?",
+            (scope_key, time.time(), self.max_candidates)
+        ).fetchall()
+
+        query = np.asarray(embedding, dtype=np.float32)
+        rows = [row for row in rows if len(row[1]) == query.nbytes]
+        if not rows:
+            return None
+
+        # Stored embeddings are unit length, so the dot product is the cosine similarity
+        matrix = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+        similarities = matrix @ (query / (np.linalg.norm(query) or 1.0))
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+
+        row = self._connection().execute(
+            "SELECT response FROM ai_cache WHERE id = ?", (rows[best][0],)
+        ).fetchone()
+        if row is None:
+            return None
+
+        with self._lock:
+            self.semantic_hits += 1
+        logger.debug(f"Semantic cache hit (similarity {similarities[best]:.3f})")
+        return json.loads(row[0])
+
+    def record_miss(self):
+        """Count a request that no cached completion answered."""
+        with self._lock:
+            self.misses += 1
+
+    def set(self,
+            cache_key: str,
+            scope_key: str,
+            response: Dict[str, Any],
+            embedding: Optional[np.ndarray] = None):
+        """
+        Store a completion.
+
+        Args:
+            cache_key: Exact request key
+            scope_key: Scope key of the request
+            response: Response to store
+            embedding: Embedding of the request's prompt, for semantic lookups
+        """
+        blob = None
+        if embedding is not None:
+            vector = np.asarray(embedding, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if norm:
+                blob = (vector / norm).astype(np.float32).tobytes()
+
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ai_cache "
+                "(cache_key, scope_key, response, embedding, expires_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key, scope_key, json.dumps(response, ensure_ascii=False), blob,
+                 now + self.ttl_seconds, now)
+            )
+
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % 100 == 0
+        if purge:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """
+        Remove expired entries, and the oldest entries beyond max_entries.
+
+        Returns:
+            Number of entries removed
+        """
+        conn = self._connection()
+        with conn:
+            removed = conn.execute("DELETE FROM ai_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+            removed += conn.execute(
+                "DELETE FROM ai_cache WHERE id NOT IN "
+                "(SELECT id FROM ai_cache ORDER BY created_at DESC LIMIT ?)",
+                (self.max_entries,)
+            ).rowcount
+
+        if removed:
+            logger.debug(f"Purged {removed} cached completions")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary of hit and miss counters and stored entries
+        """
+        entries = self._connection().execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0]
+        with self._lock:
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses
+            }
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(cache_dir: str,
+                       ttl_seconds: float = 6 * 3600,
+                       similarity_threshold: float = 0.95,
+                       filename: str = "responses.db") -> ResponseCache:
+    """
+    Get the process-wide completion cache for a cache directory, creating it on first use.
+
+    Args:
+        cache_dir: Directory holding the database file
+        ttl_seconds: Seconds a stored completion stays valid (used on first creation)
+        similarity_threshold: Minimum cosine similarity for a semantic hit (used on first creation)
+        filename: Database file name
+
+    Returns:
+        Shared completion cache
+    """
+    path = os.path.abspath(os.path.join(cache_dir, filename))
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = ResponseCache(path, ttl_seconds=ttl_seconds, similarity_threshold=similarity_threshold)
+            _caches[path] = cache
+        return cache
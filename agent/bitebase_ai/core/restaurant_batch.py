@@ -0,0 +1,222 @@
+"""
+Restaurant Batch - Columnar matching keys computed once per restaurant.
+
+When a platform's restaurant list enters the matching pipeline it is turned
+into a RestaurantBatch: the records themselves plus aligned columns of
+normalized names and addresses, phonetic name keys (which blockers use to
+pair spelling and transliteration variants) and latitude/longitude in
+radians. Name token sets are computed on first use, for the token-overlap
+matcher. Matchers, blockers and validators score pairs from these columns,
+so no name is normalized and no coordinate converted more than once however
+many pairs it takes part in.
+"""
+
+import logging
+from typing import Dict, List, Optional, Iterator, FrozenSet, Callable, Union, Sequence
+
+import numpy as np
+
+from .data_processor import normalize_name, normalize_address, tokenize, phonetic_key
+from .geo import coordinates_to_arrays, haversine_radians
+
+logger = logging.getLogger("RestaurantBatch")
+
+
+class RestaurantBatch:
+    """Restaurant records with precomputed matching key columns."""
+
+    __slots__ = ("restaurants", "names", "addresses", "phonetic", "lat_rad", "lon_rad", "has_location", "_tokens")
+
+    def __init__(self,
+                 restaurants: List[Dict],
+                 names: List[str],
+                 addresses: List[str],
+                 phonetic: List[str],
+                 lat_rad: np.ndarray,
+                 lon_rad: np.ndarray):
+        """
+        Initialize a batch from already computed columns.
+
+        Use ``RestaurantBatch.from_restaurants`` to compute the columns.
+
+        Args:
+            restaurants: Restaurant records
+            names: Normalized names
+            addresses: Normalized addresses
+            phonetic: Phonetic name keys
+            lat_rad: Latitudes in radians, NaN where missing or invalid
+            lon_rad: Longitudes in radians, NaN where missing or invalid
+        """
+        self.restaurants = restaurants
+        self.names = names
+        self.addresses = addresses
+        self.phonetic = phonetic
+        self.lat_rad = lat_rad
+        self.lon_rad = lon_rad
+        self.has_location = ~np.isnan(lat_rad)
+        self._tokens: Optional[List[FrozenSet[str]]] = None
+
+    @classmethod
+    def from_restaurants(cls,
+                         restaurants: Sequence[Dict],
+                         name_normalizer: Optional[Callable[[str], str]] = None,
+                         address_normalizer: Optional[Callable[[str], str]] = None) -> "RestaurantBatch":
+        """
+        Compute the key columns for a list of restaurants.
+
+        Args:
+            restaurants: Restaurant records
+            name_normalizer: Function normalizing names (default: normalize_name)
+            address_normalizer: Function normalizing addresses (default: normalize_address)
+
+        Returns:
+            Restaurant batch
+        """
+        restaurants = list(restaurants)
+        name_normalizer = name_normalizer or normalize_name
+        address_normalizer = address_normalizer or normalize_address
+
+        names = [name_normalizer(restaurant.get("name") or "") for restaurant in restaurants]
+        addresses = [address_normalizer(restaurant.get("address") or "") for restaurant in restaurants]
+        lats, lons, _ = coordinates_to_arrays(restaurants)
+
+        return cls(
+            restaurants,
+            names,
+            addresses,
+            [phonetic_key(name) for name in names],
+            np.radians(lats),
+            np.radians(lons)
+        )
+
+    @classmethod
+    def concat(cls, batches: Sequence["RestaurantBatch"]) -> "RestaurantBatch":
+        """
+        Join batches into one without recomputing their key columns.
+
+        Args:
+            batches: Restaurant batches, in order
+
+        Returns:
+            Restaurant batch with the rows of every batch
+        """
+        return cls(
+            [restaurant for batch in batches for restaurant in batch.restaurants],
+            [name for batch in batches for name in batch.names],
+            [address for batch in batches for address in batch.addresses],
+            [key for batch in batches for key in batch.phonetic],
+            np.concatenate([batch.lat_rad for batch in batches]) if batches else np.empty(0),
+            np.concatenate([batch.lon_rad for batch in batches]) if batches else np.empty(0)
+        )
+
+    def take(self, indices: Sequence[int]) -> "RestaurantBatch":
+        """
+        Select rows of the batch without recomputing their key columns.
+
+        Args:
+            indices: Row indexes, in the order to keep
+
+        Returns:
+            Restaurant batch with the selected rows
+        """
+        positions = np.asarray(indices, dtype=np.int64)
+        return RestaurantBatch(
+            [self.restaurants[index] for index in indices],
+            [self.names[index] for index in indices],
+            [self.addresses[index] for index in indices],
+            [self.phonetic[index] for index in indices],
+            self.lat_rad[positions],
+            self.lon_rad[positions]
+        )
+
+    def __len__(self) -> int:
+        return len(self.restaurants)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.restaurants)
+
+    def __getitem__(self, index: int) -> Dict:
+        return self.restaurants[index]
+
+    @property
+    def tokens(self) -> List[FrozenSet[str]]:
+        """Name token sets, computed on first access."""
+        if self._tokens is None:
+            self._tokens = [frozenset(tokenize(name)) for name in self.names]
+        return self._tokens
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        """Latitudes in degrees, NaN where missing."""
+        return np.degrees(self.lat_rad)
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        """Longitudes in degrees, NaN where missing."""
+        return np.degrees(self.lon_rad)
+
+    def distances_from(self, index: int, other: "RestaurantBatch") -> np.ndarray:
+        """
+        Calculate the distances from one restaurant to every restaurant of a batch.
+
+        Args:
+            index: Index of the restaurant in this batch
+            other: Batch of target restaurants
+
+        Returns:
+            Array of distances in kilometers, NaN where either side lacks coordinates
+        """
+        return haversine_radians(self.lat_rad[index], self.lon_rad[index], other.lat_rad, other.lon_rad)
+
+    def pair_distances(self, other: "RestaurantBatch", rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """
+        Calculate distances for aligned index pairs between this batch and another.
+
+        Args:
+            other: Batch the column indexes refer to
+            rows: Indexes into this batch
+            cols: Indexes into the other batch
+
+        Returns:
+            Array of distances in kilometers, NaN where either side lacks coordinates
+        """
+        return haversine_radians(self.lat_rad[rows], self.lon_rad[rows], other.lat_rad[cols], other.lon_rad[cols])
+
+
+def as_batch(restaurants: Union[RestaurantBatch, Sequence[Dict]],
+             name_normalizer: Optional[Callable[[str], str]] = None,
+             address_normalizer: Optional[Callable[[str], str]] = None) -> RestaurantBatch:
+    """
+    Get a restaurant batch, computing the key columns unless they already are.
+
+    Args:
+        restaurants: Restaurant batch or list of restaurant records
+        name_normalizer: Function normalizing names for a new batch
+        address_normalizer: Function normalizing addresses for a new batch
+
+    Returns:
+        Restaurant batch
+    """
+    if isinstance(restaurants, RestaurantBatch):
+        return restaurants
+    return RestaurantBatch.from_restaurants(restaurants, name_normalizer, address_normalizer)
+
+
+def as_batches(restaurant_lists: Dict[str, Union[RestaurantBatch, Sequence[Dict]]],
+               name_normalizer: Optional[Callable[[str], str]] = None,
+               address_normalizer: Optional[Callable[[str], str]] = None) -> Dict[str, RestaurantBatch]:
+    """
+    Get a restaurant batch for each platform's restaurants.
+
+    Args:
+        restaurant_lists: Restaurant batches or lists keyed by platform
+        name_normalizer: Function normalizing names for new batches
+        address_normalizer: Function normalizing addresses for new batches
+
+    Returns:
+        Dictionary of restaurant batches keyed by platform
+    """
+    return {
+        platform: as_batch(restaurants, name_normalizer, address_normalizer)
+        for platform, restaurants in restaurant_lists.items()
+    }
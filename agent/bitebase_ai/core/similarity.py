@@ -0,0 +1,152 @@
+"""
+Similarity - Bulk name, address and location similarity over candidate pairs.
+
+Matchers score restaurant pairs in three steps: block the two batches into
+candidate (row, column) index pairs, compute the string similarities of every
+pair in one call to rapidfuzz (C++, spread over all cores) and the distances
+in one vectorized haversine, then combine them with a NumPy expression and
+keep the best candidate per row. Without rapidfuzz the string similarities
+fall back to difflib, which gives the same scores as fuzzywuzzy without
+python-Levenshtein.
+"""
+
+import logging
+from difflib import SequenceMatcher
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from .blocking import CandidateBlocker
+from .restaurant_batch import RestaurantBatch
+
+logger = logging.getLogger("Similarity")
+
+try:
+    from rapidfuzz import fuzz, process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    logger.warning("rapidfuzz not installed. Bulk similarity scoring will be slow.")
+    logger.warning("Install with: pip install rapidfuzz")
+    RAPIDFUZZ_AVAILABLE = False
+
+
+def candidate_pairs(base: RestaurantBatch,
+                    other: RestaurantBatch,
+                    max_distance_km: Optional[float] = 1.0,
+                    prefix_length: int = 3,
+                    pair_unlocated: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the candidate index pairs between two batches.
+
+    Args:
+        base: Batch the row indexes refer to
+        other: Batch the column indexes refer to
+        max_distance_km: Blocking distance (see CandidateBlocker); None pairs every restaurant
+        prefix_length: Token prefix length for restaurants without coordinates
+        pair_unlocated: Whether to pair every restaurant without coordinates with
+            every restaurant of the other batch instead of blocking them by name
+
+    Returns:
+        Tuple of (rows, cols) index arrays, sorted by row then column
+    """
+    if max_distance_km is None:
+        rows, cols = np.divmod(np.arange(len(base) * len(other), dtype=np.int64), max(len(other), 1))
+        return rows, cols
+
+    blocker = CandidateBlocker(other, max_distance_km=max_distance_km, prefix_length=prefix_length)
+    pairs = np.array(blocker.candidate_pairs(base), dtype=np.int64).reshape(-1, 2)
+    rows, cols = pairs[:, 0], pairs[:, 1]
+    if not pair_unlocated:
+        return rows, cols
+
+    # Keep the blocked located pairs and add every pair missing a coordinate
+    located = base.has_location[rows] & other.has_location[cols]
+    unlocated_rows, unlocated_cols = np.nonzero(~np.outer(base.has_location, other.has_location))
+    rows = np.concatenate([rows[located], unlocated_rows.astype(np.int64)])
+    cols = np.concatenate([cols[located], unlocated_cols.astype(np.int64)])
+    order = np.lexsort((cols, rows))
+    return rows[order], cols[order]
+
+
+def string_similarity(left: Sequence[str],
+                      right: Sequence[str],
+                      rows: np.ndarray,
+                      cols: np.ndarray,
+                      workers: int = -1) -> np.ndarray:
+    """
+    Calculate the similarity ratio of aligned string pairs.
+
+    Args:
+        left: Strings the row indexes refer to
+        right: Strings the column indexes refer to
+        rows: Indexes into ``left``
+        cols: Indexes into ``right``
+        workers: rapidfuzz worker threads (-1: all cores)
+
+    Returns:
+        Array of similarities between 0 and 1, one per pair
+    """
+    if not len(rows):
+        return np.empty(0, dtype=np.float64)
+
+    queries = [left[i] for i in rows.tolist()]
+    choices = [right[j] for j in cols.tolist()]
+    if RAPIDFUZZ_AVAILABLE:
+        return process.cpdist(queries, choices, scorer=fuzz.ratio, workers=workers, dtype=np.float64) / 100.0
+
+    return np.fromiter(
+        (SequenceMatcher(None, a, b).ratio() if (a or b) else 1.0 for a, b in zip(queries, choices)),
+        dtype=np.float64,
+        count=len(queries)
+    )
+
+
+def location_similarity(distances: np.ndarray, scale_km: float) -> np.ndarray:
+    """
+    Convert distances into proximity scores.
+
+    Args:
+        distances: Distances in kilometers, NaN where unknown
+        scale_km: Distance at which the score reaches zero
+
+    Returns:
+        Array of scores between 0 and 1 (1 at zero distance, 0 where unknown)
+    """
+    return np.nan_to_num(np.clip(1 - distances / scale_km, 0, None), nan=0.0)
+
+
+def best_per_row(rows: np.ndarray,
+                 scores: np.ndarray,
+                 n_rows: int,
+                 threshold: float,
+                 inclusive: bool = False) -> np.ndarray:
+    """
+    Pick the best scoring pair of each row.
+
+    Among equal scores the first pair of the row wins, as in a loop keeping
+    the first strictly better candidate.
+
+    Args:
+        rows: Row index of each pair (pairs grouped by row in column order)
+        scores: Score of each pair
+        n_rows: Number of rows
+        threshold: Minimum score of a match
+        inclusive: Whether a score equal to the threshold matches
+
+    Returns:
+        Array of pair positions per row, -1 for rows without a match
+    """
+    best = np.full(n_rows, -1, dtype=np.int64)
+    keep = (scores >= threshold) if inclusive else (scores > threshold)
+    keep &= scores > 0
+    positions = np.flatnonzero(keep)
+    if not len(positions):
+        return best
+
+    # Sort by row, then score descending, then pair position; take each row's first entry
+    order = np.lexsort((positions, -scores[positions], rows[positions]))
+    ordered = positions[order]
+    first = np.unique(rows[ordered], return_index=True)[1]
+    best[rows[ordered[first]]] = ordered[first]
+    return best
+
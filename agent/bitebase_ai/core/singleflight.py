@@ -0,0 +1,187 @@
+"""
+Single Flight - Deduplication of identical in-flight calls.
+
+When several callers ask for the same thing at the same moment, only the first
+one does the work; the others wait for it and share its result (or its
+exception). Nothing is remembered once the call completes, so this complements
+caching rather than replacing it: it closes the window in which every
+concurrent caller misses the cache and goes upstream.
+"""
+
+import json
+import asyncio
+import logging
+import threading
+from typing import Dict, Any, Callable, Awaitable, Hashable, Optional
+
+logger = logging.getLogger("SingleFlight")
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a normalized key from request parts.
+
+    Dictionaries are serialized with sorted keys so that parameter order does
+    not produce different keys.
+
+    Args:
+        *parts: JSON-serializable request parts (endpoint, params, ...)
+
+    Returns:
+        Key string
+    """
+    return json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+
+
+class _Call:
+    """An in-flight call shared by every caller with the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Thread-safe coalescing of identical concurrent calls."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.shared_calls = 0
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call a function, or wait for an identical call already in flight.
+
+        Args:
+            key: Identity of the call
+            fn: Function to call
+            *args, **kwargs: Arguments for the function
+
+        Returns:
+            The function's result, shared with concurrent callers using the same key
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.shared_calls += 1
+
+        if not leader:
+            logger.debug(f"Joining in-flight call for {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get call counters.
+
+        Returns:
+            Dictionary of calls made and calls that joined an in-flight call
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "shared_calls": self.shared_calls,
+                "in_flight": len(self._calls)
+            }
+
+
+class AsyncSingleFlight:
+    """
+    Coalescing of identical concurrent coroutine calls.
+
+    In-flight calls are tracked per event loop, since their futures cannot be
+    awaited from another loop.
+    """
+
+    def __init__(self):
+        self._calls: Dict[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+
+        self.calls = 0
+        self.shared_calls = 0
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await a coroutine function, or an identical call already in flight.
+
+        The shared call runs as its own task, so one caller being cancelled
+        does not cancel the work the other callers are waiting for. It is
+        only cancelled once every caller waiting on it has been cancelled.
+
+        Args:
+            key: Identity of the call
+            fn: Coroutine function to call
+            *args, **kwargs: Arguments for the function
+
+        Returns:
+            The coroutine's result, shared with concurrent callers using the same key
+        """
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+
+        self.calls += 1
+        task = calls.get(key)
+        if task is None:
+            task = loop.create_task(fn(*args, **kwargs))
+            calls[key] = task
+            task.add_done_callback(lambda _: self._forget(loop, key, task))
+        else:
+            self.shared_calls += 1
+            logger.debug(f"Joining in-flight call for {key}")
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    task.cancel()
+
+    def _forget(self, loop: asyncio.AbstractEventLoop, key: Hashable, task: asyncio.Future):
+        """Drop a finished call so the next caller starts a new one."""
+        calls = self._calls.get(loop)
+        if calls is not None and calls.get(key) is task:
+            del calls[key]
+            if not calls:
+                del self._calls[loop]
+
+        # Mark the exception retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get call counters.
+
+        Returns:
+            Dictionary of calls made and calls that joined an in-flight call
+        """
+        return {
+            "calls": self.calls,
+            "shared_calls": self.shared_calls,
+            "in_flight": sum(len(calls) for calls in self._calls.values())
+        }
@@ -3,68 +3,263 @@ Streaming Support - Enhanced streaming capabilities for Bitebase AI agents.
 
 This module provides utilities for streaming responses from agents to the UI,
 with support for different streaming formats and protocols.
+
+Upstream chunks (usually LLM tokens) are read by a producer task into a
+bounded queue and coalesced into batches that are flushed when they reach a
+byte size or when a time limit since the first chunk of the batch has passed,
+with the very first chunk flushed immediately. A slow client fills the queue,
+which stops the producer from pulling further upstream chunks. When the
+consumer stops early (client disconnect, cancellation) the producer is
+cancelled and the upstream generator is closed, which closes the underlying
+HTTP stream. Work abandoned because a client went away is counted in
+process-wide cancellation metrics.
 """
 
 import json
+import time
 import asyncio
+import inspect
 import logging
-from typing import Dict, List, Any, Optional, Union, Callable, AsyncGenerator, Generator
+import threading
+from typing import Dict, List, Any, Optional, Union, Callable, Awaitable, AsyncGenerator, Generator
 
 logger = logging.getLogger("StreamingSupport")
 
+# Marks the end of the upstream generator in the chunk queue
+_END = object()
+
+
+# Work abandoned after client disconnects, per source
+_cancellation_stats: Dict[str, Dict[str, float]] = {}
+_cancellation_lock = threading.Lock()
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client of a stream or websocket has gone away."""
+
+
+def record_cancellation(source: str,
+                        elapsed_seconds: float = 0.0,
+                        chunks_delivered: int = 0,
+                        chunks_discarded: int = 0):
+    """
+    Record upstream work cancelled because its client disconnected.
+
+    Args:
+        source: Name of the endpoint or stream
+        elapsed_seconds: How long the work had been running when it was cancelled
+        chunks_delivered: Chunks sent to the client before the disconnect
+        chunks_discarded: Chunks already produced but never sent
+    """
+    with _cancellation_lock:
+        stats = _cancellation_stats.setdefault(source, {
+            "cancelled": 0,
+            "elapsed_seconds": 0.0,
+            "chunks_delivered": 0,
+            "chunks_discarded": 0
+        })
+        stats["cancelled"] += 1
+        stats["elapsed_seconds"] += elapsed_seconds
+        stats["chunks_delivered"] += chunks_delivered
+        stats["chunks_discarded"] += chunks_discarded
+    logger.info(f"Cancelled upstream work for {source} after client disconnect ({elapsed_seconds:.2f}s in)")
+
+
+def get_cancellation_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Get the cancellation metrics.
+
+    Returns:
+        Dictionary of counters per source: upstream streams or tasks cancelled,
+        how long they had run, and chunks delivered and discarded
+    """
+    with _cancellation_lock:
+        return {source: dict(stats) for source, stats in _cancellation_stats.items()}
+
+
+class _UpstreamError:
+    """Carries an upstream exception through the chunk queue."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class _Disconnected:
+    """Marks a client disconnect in the chunk queue."""
+
+    def __init__(self, discarded: int):
+        self.discarded = discarded
+
+
+def _is_final(item: Any) -> bool:
+    """Check whether a queue item ends the stream."""
+    return item is _END or isinstance(item, (_UpstreamError, _Disconnected))
+
+
 class StreamingManager:
     """Manager for streaming responses from agents to clients."""
 
-    def __init__(self, buffer_size: int = 5):
+    def __init__(self,
+                 flush_interval_ms: float = 30.0,
+                 flush_bytes: int = 256,
+                 queue_size: int = 64,
+                 disconnect_poll_interval: float = 0.5):
         """
         Initialize the streaming manager.
 
         Args:
-            buffer_size: Size of the buffer for batching stream chunks
+            flush_interval_ms: Longest time a chunk is held back for batching
+            flush_bytes: Batch size in bytes that triggers a flush
+            queue_size: Upstream chunks buffered before the producer waits for the client
+            disconnect_poll_interval: Seconds between client disconnect checks
         """
-        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.flush_bytes = flush_bytes
+        self.queue_size = queue_size
+        self.disconnect_poll_interval = disconnect_poll_interval
         self.logger = logging.getLogger("StreamingManager")
 
-    async def stream_response(self, 
+    async def _produce(self, generator: AsyncGenerator[str, None], queue: asyncio.Queue):
+        """Pull chunks from the upstream generator into the bounded queue."""
+        try:
+            async for chunk in generator:
+                if chunk:
+                    await queue.put(chunk)
+            await queue.put(_END)
+        except Exception as e:
+            await queue.put(_UpstreamError(e))
+        finally:
+            await generator.aclose()
+
+    async def _watch_disconnect(self,
+                                is_disconnected: Callable[[], Awaitable[bool]],
+                                producer: asyncio.Task,
+                                queue: asyncio.Queue):
+        """Poll for a client disconnect and stop the producer when it happens."""
+        while not producer.done():
+            await asyncio.sleep(self.disconnect_poll_interval)
+            if await is_disconnected():
+                producer.cancel()
+                # Make room for the marker; the dropped chunks were never going to be sent
+                discarded = 0
+                while not queue.empty():
+                    queue.get_nowait()
+                    discarded += 1
+                queue.put_nowait(_Disconnected(discarded))
+                return
+
+    async def stream(self,
+                     generator: AsyncGenerator[str, None],
+                     is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+                     source: str = "stream") -> AsyncGenerator[str, None]:
+        """
+        Re-batch an upstream generator by time and size, with backpressure.
+
+        Args:
+            generator: Async generator that yields response chunks
+            is_disconnected: Optional coroutine function reporting a client
+                disconnect (e.g. Starlette's ``Request.is_disconnected``), polled
+                while streaming
+            source: Name the stream is recorded under in the cancellation metrics
+
+        Yields:
+            Batches of concatenated chunks. Upstream exceptions are re-raised
+            after the chunks received before them have been yielded. The
+            stream ends quietly when the client disconnects.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        producer = asyncio.create_task(self._produce(generator, queue))
+        watcher = None
+        if is_disconnected is not None:
+            watcher = asyncio.create_task(self._watch_disconnect(is_disconnected, producer, queue))
+
+        started_at = time.time()
+        delivered = 0
+        finished = None
+
+        try:
+            while finished is None:
+                item = await queue.get()
+                if _is_final(item):
+                    finished = item
+                    break
+
+                batch = [item]
+                size = len(item)
+                deadline = loop.time() + self.flush_interval
+
+                # The first chunk goes out at once to keep time-to-first-byte low
+                while delivered and size < self.flush_bytes:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if _is_final(item):
+                        finished = item
+                        break
+                    batch.append(item)
+                    size += len(item)
+
+                delivered += len(batch)
+                yield "".join(batch)
+
+            if isinstance(finished, _Disconnected):
+                record_cancellation(source, time.time() - started_at, delivered, finished.discarded)
+            elif isinstance(finished, _UpstreamError):
+                raise finished.error
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            if finished is None:
+                # The consumer stopped early: the server cancelled the response or the client went away
+                record_cancellation(source, time.time() - started_at, delivered, queue.qsize())
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+
+    async def _deliver(self, callback: Optional[Callable[[str], Any]], data: str):
+        """Pass data to a callback, awaiting it when it is a coroutine function."""
+        if callback:
+            result = callback(data)
+            if inspect.isawaitable(result):
+                await result
+
+    async def stream_response(self,
                              generator: AsyncGenerator[str, None],
-                             callback: Optional[Callable[[str], None]] = None) -> str:
+                             callback: Optional[Callable[[str], Any]] = None,
+                             accumulate: bool = False) -> Optional[str]:
         """
         Stream a response from an async generator.
 
         Args:
             generator: Async generator that yields response chunks
-            callback: Optional callback function to call with each chunk
+            callback: Optional callback called (or awaited) with each batch
+            accumulate: Whether to keep and return the complete response
 
         Returns:
-            The complete response as a string
+            The complete response as a string if accumulate is set, otherwise None
         """
-        buffer = []
-        complete_response = []
-        
+        complete_response = [] if accumulate else None
+
         try:
-            async for chunk in generator:
-                buffer.append(chunk)
-                complete_response.append(chunk)
-                
-                # Process buffer when it reaches the specified size
-                if len(buffer) >= self.buffer_size:
-                    batched_chunk = "".join(buffer)
-                    if callback:
-                        callback(batched_chunk)
-                    buffer = []
-            
-            # Process any remaining chunks in the buffer
-            if buffer:
-                batched_chunk = "".join(buffer)
-                if callback:
-                    callback(batched_chunk)
-                    
-            return "".join(complete_response)
+            async for batch in self.stream(generator):
+                if complete_response is not None:
+                    complete_response.append(batch)
+                await self._deliver(callback, batch)
         except Exception as e:
             self.logger.error(f"Error streaming response: {str(e)}")
-            if callback:
-                callback(f"\n\nError: {str(e)}")
-            return "".join(complete_response) + f"\n\nError: {str(e)}"
+            await self._deliver(callback, f"\n\nError: {str(e)}")
+            if complete_response is not None:
+                complete_response.append(f"\n\nError: {str(e)}")
+
+        return "".join(complete_response) if complete_response is not None else None
 
     def format_for_sse(self, data: str, event: str = "message") -> str:
         """
@@ -95,72 +290,166 @@ class StreamingManager:
             "data": data
         })
 
-    async def stream_to_client(self, 
+    def _format(self, data: str, format_type: str, event: str = "message") -> str:
+        """Format a batch for the given transport."""
+        if format_type == "sse":
+            return self.format_for_sse(data, event)
+        elif format_type == "websocket":
+            return self.format_for_websocket(data, "text" if event == "message" else event)
+        else:  # raw
+            return data
+
+    async def iter_formatted(self,
+                             generator: AsyncGenerator[str, None],
+                             format_type: str = "sse") -> AsyncGenerator[str, None]:
+        """
+        Stream formatted batches, for handing directly to a streaming response.
+
+        Args:
+            generator: Async generator that yields response chunks
+            format_type: Format type (sse, websocket, raw)
+
+        Yields:
+            Formatted batches, then a formatted error if the upstream fails
+        """
+        try:
+            async for batch in self.stream(generator):
+                yield self._format(batch, format_type)
+        except Exception as e:
+            self.logger.error(f"Error streaming to client: {str(e)}")
+            yield self._format(f"\n\nError: {str(e)}", format_type, "error")
+
+    async def stream_to_client(self,
                               generator: AsyncGenerator[str, None],
                               format_type: str = "sse",
-                              callback: Optional[Callable[[str], None]] = None) -> str:
+                              callback: Optional[Callable[[str], Any]] = None,
+                              accumulate: bool = False) -> Optional[str]:
         """
         Stream a response to a client with the specified format.
 
+        Awaitable callbacks (such as a websocket send) are awaited before the
+        next batch is produced, so a slow client slows down the upstream.
+
         Args:
             generator: Async generator that yields response chunks
             format_type: Format type (sse, websocket, raw)
-            callback: Optional callback function to call with each formatted chunk
+            callback: Optional callback called (or awaited) with each formatted batch
+            accumulate: Whether to keep and return the complete response
 
         Returns:
-            The complete response as a string
+            The complete response as a string if accumulate is set, otherwise None
         """
-        buffer = []
-        complete_response = []
-        
+        complete_response = [] if accumulate else None
+
         try:
-            async for chunk in generator:
-                buffer.append(chunk)
-                complete_response.append(chunk)
-                
-                # Process buffer when it reaches the specified size
-                if len(buffer) >= self.buffer_size:
-                    batched_chunk = "".join(buffer)
-                    
-                    # Format the chunk based on the specified format type
-                    if format_type == "sse":
-                        formatted_chunk = self.format_for_sse(batched_chunk)
-                    elif format_type == "websocket":
-                        formatted_chunk = self.format_for_websocket(batched_chunk)
-                    else:  # raw
-                        formatted_chunk = batched_chunk
-                    
-                    if callback:
-                        callback(formatted_chunk)
-                    
-                    buffer = []
-            
-            # Process any remaining chunks in the buffer
-            if buffer:
-                batched_chunk = "".join(buffer)
-                
-                # Format the chunk based on the specified format type
-                if format_type == "sse":
-                    formatted_chunk = self.format_for_sse(batched_chunk)
-                elif format_type == "websocket":
-                    formatted_chunk = self.format_for_websocket(batched_chunk)
-                else:  # raw
-                    formatted_chunk = batched_chunk
-                
-                if callback:
-                    callback(formatted_chunk)
-                    
-            return "".join(complete_response)
+            async for batch in self.stream(generator):
+                if complete_response is not None:
+                    complete_response.append(batch)
+                await self._deliver(callback, self._format(batch, format_type))
         except Exception as e:
             self.logger.error(f"Error streaming to client: {str(e)}")
-            error_message = f"\n\nError: {str(e)}"
-            
-            if format_type == "sse":
-                error_message = self.format_for_sse(error_message, "error")
-            elif format_type == "websocket":
-                error_message = self.format_for_websocket(error_message, "error")
-                
-            if callback:
-                callback(error_message)
-                
-            return "".join(complete_response) + f"\n\nError: {str(e)}"
+            await self._deliver(callback, self._format(f"\n\nError: {str(e)}", format_type, "error"))
+            if complete_response is not None:
+                complete_response.append(f"\n\nError: {str(e)}")
+
+        return "".join(complete_response) if complete_response is not None else None
+
+
+class WebSocketWatcher:
+    """
+    Background receiver for a websocket, so disconnects are noticed while work runs.
+
+    Handlers that await long agent runs between receives would otherwise only
+    learn about a disconnect on their next send or receive. Incoming messages
+    are queued for ``receive_text``; ``run`` cancels its work as soon as the
+    client goes away.
+    """
+
+    def __init__(self, websocket: Any):
+        """
+        Start receiving.
+
+        Args:
+            websocket: Accepted Starlette/FastAPI websocket
+        """
+        self.websocket = websocket
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+        self._receiver = asyncio.create_task(self._receive())
+
+    async def _receive(self):
+        """Queue incoming messages until the client disconnects."""
+        try:
+            while True:
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                text = message.get("text")
+                if text is None and message.get("bytes") is not None:
+                    text = message["bytes"].decode("utf-8")
+                if text is not None:
+                    await self.messages.put(text)
+        except Exception as e:
+            logger.debug(f"Websocket receive ended: {str(e)}")
+        finally:
+            self.disconnected.set()
+
+    async def receive_text(self) -> str:
+        """
+        Get the next message from the client.
+
+        Returns:
+            Message text
+
+        Raises:
+            ClientDisconnected: If the client disconnected with no messages left
+        """
+        if not self.messages.empty():
+            return self.messages.get_nowait()
+
+        get = asyncio.ensure_future(self.messages.get())
+        disconnected = asyncio.ensure_future(self.disconnected.wait())
+        try:
+            await asyncio.wait({get, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            disconnected.cancel()
+            if not get.done():
+                get.cancel()
+
+        if get.done() and not get.cancelled():
+            return get.result()
+        raise ClientDisconnected()
+
+    async def run(self, work: Awaitable[Any], source: str = "websocket") -> Any:
+        """
+        Await work, cancelling it if the client disconnects first.
+
+        Args:
+            work: Coroutine or future doing the upstream work
+            source: Name the work is recorded under in the cancellation metrics
+
+        Returns:
+            Result of the work
+
+        Raises:
+            ClientDisconnected: If the client disconnected before the work finished
+        """
+        task = asyncio.ensure_future(work)
+        disconnected = asyncio.ensure_future(self.disconnected.wait())
+        started_at = time.time()
+        try:
+            await asyncio.wait({task, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            disconnected.cancel()
+            cancelled = not task.done()
+            if cancelled:
+                task.cancel()
+                record_cancellation(source, time.time() - started_at)
+
+        if cancelled:
+            raise ClientDisconnected()
+        return task.result()
+
+    def close(self):
+        """Stop receiving."""
+        self._receiver.cancel()
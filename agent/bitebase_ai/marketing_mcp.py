@@ -1,13 +1,17 @@
 from fastapi import FastAPI, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, List, Optional
 import os
+import json
+import asyncio
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk
 
 # Import our custom LLM client
 from .core.llm_client import LLMClient
+from .core.streaming import StreamingManager
 
 load_dotenv()
 
@@ -44,12 +48,34 @@ if llm_provider == "deepseek":
         def __init__(self, client):
             self.client = client
 
-        def invoke(self, messages):
+        # LangChain message types to chat API roles
+        ROLES = {"human": "user", "ai": "assistant", "system": "system"}
+
+        def _to_chat_messages(self, messages):
+            return [{"role": self.ROLES.get(msg.type, msg.type), "content": msg.content} for msg in messages]
+
+        def _cache_scope(self, config):
+            # Prompt variables passed through the run metadata key the completion cache
+            return ((config or {}).get("metadata") or {}).get("cache_scope")
+
+        def invoke(self, messages, config=None, **kwargs):
             response = self.client.chat_completion(
-                [{"role": msg.type, "content": msg.content} for msg in messages]
+                self._to_chat_messages(messages), cache_scope=self._cache_scope(config)
             )
             return AIMessage(content=self.client.extract_response_text(response))
 
+        async def ainvoke(self, messages, config=None, **kwargs):
+            response = await self.client.achat_completion(
+                self._to_chat_messages(messages), cache_scope=self._cache_scope(config)
+            )
+            return AIMessage(content=self.client.extract_response_text(response))
+
+        async def astream(self, messages, config=None, **kwargs):
+            async for chunk in self.client.stream_chat_completion(
+                self._to_chat_messages(messages), cache_scope=self._cache_scope(config)
+            ):
+                yield AIMessageChunk(content=chunk)
+
         # Implement the required Runnable interface methods
         def get_input_schema(self, config=None):
             return None
@@ -66,26 +92,81 @@ else:
         api_key=openai_api_key
     )
 
+# Batches streamed tokens by time and size
+streaming_manager = StreamingManager()
+
 class MarketingRequest(BaseModel):
     location: str
     cuisine_type: str
     tool: str
     parameters: Optional[Dict] = None
 
+class MarketingBatchRequest(BaseModel):
+    location: str
+    cuisine_type: str
+    tools: Optional[List[str]] = None  # Defaults to every tool
+    parameters: Optional[Dict] = None
+
 class MarketingResponse(BaseModel):
     result: Dict
     metadata: Optional[Dict] = None
 
-async def analyze_customer_segments(request: MarketingRequest) -> MarketingResponse:
-    """Analyze customer segments for the restaurant"""
-    prompt = f"""Analyze customer segments for a {request.cuisine_type} restaurant in {request.location}:
+# Prompt templates of the marketing tools
+TOOL_PROMPTS = {
+    "analyze-customer-segments": """Analyze customer segments for a {cuisine_type} restaurant in {location}:
     - Demographics
     - Psychographics
     - Behavioral patterns
     - Spending habits
     - Dining preferences
+    """,
+    "competitor-gap-analysis": """Analyze market gaps for a {cuisine_type} restaurant in {location}:
+    - Competitor offerings
+    - Market gaps
+    - Opportunities
+    - Competitive advantages
+    """,
+    "optimal-pricing-analysis": """Analyze optimal pricing for a {cuisine_type} restaurant in {location}:
+    - Market price points
+    - Cost structure
+    - Profit margins
+    - Price sensitivity
+    """,
+    "social-sentiment-analysis": """Analyze social media sentiment for {cuisine_type} restaurants in {location}:
+    - Customer reviews
+    - Social media mentions
+    - Sentiment trends
+    - Key topics
+    """,
+    "local-event-opportunity": """Analyze local event opportunities for a {cuisine_type} restaurant in {location}:
+    - Upcoming events
+    - Partnership opportunities
+    - Marketing potential
+    - ROI analysis
     """
-    response = llm.invoke([HumanMessage(content=prompt)])
+}
+
+def build_prompt(tool_name: str, request: MarketingRequest) -> str:
+    """Build the LLM prompt of a marketing tool"""
+    return TOOL_PROMPTS[tool_name].format(cuisine_type=request.cuisine_type, location=request.location)
+
+def llm_config(tool_name: str, request: MarketingRequest) -> Dict:
+    """Build the LLM run config of a marketing tool, keying cached answers by the prompt variables"""
+    return {"metadata": {"cache_scope": {
+        "tool": tool_name,
+        "location": request.location,
+        "cuisine_type": request.cuisine_type
+    }}}
+
+async def stream_llm(prompt: str, config: Optional[Dict] = None):
+    """Stream the LLM's answer to a prompt as text chunks"""
+    async for chunk in llm.astream([HumanMessage(content=prompt)], config=config):
+        yield chunk.content
+
+async def analyze_customer_segments(request: MarketingRequest) -> MarketingResponse:
+    """Analyze customer segments for the restaurant"""
+    prompt = build_prompt("analyze-customer-segments", request)
+    response = await llm.ainvoke([HumanMessage(content=prompt)], config=llm_config("analyze-customer-segments", request))
     return MarketingResponse(
         result={"segments": response.content},
         metadata={"tool": "analyze-customer-segments"}
@@ -93,13 +174,8 @@ async def analyze_customer_segments(request: MarketingRequest) -> MarketingRespo
 
 async def competitor_gap_analysis(request: MarketingRequest) -> MarketingResponse:
     """Analyze gaps in the market compared to competitors"""
-    prompt = f"""Analyze market gaps for a {request.cuisine_type} restaurant in {request.location}:
-    - Competitor offerings
-    - Market gaps
-    - Opportunities
-    - Competitive advantages
-    """
-    response = llm.invoke([HumanMessage(content=prompt)])
+    prompt = build_prompt("competitor-gap-analysis", request)
+    response = await llm.ainvoke([HumanMessage(content=prompt)], config=llm_config("competitor-gap-analysis", request))
     return MarketingResponse(
         result={"analysis": response.content},
         metadata={"tool": "competitor-gap-analysis"}
@@ -107,13 +183,8 @@ async def competitor_gap_analysis(request: MarketingRequest) -> MarketingRespons
 
 async def optimal_pricing_analysis(request: MarketingRequest) -> MarketingResponse:
     """Analyze optimal pricing strategy"""
-    prompt = f"""Analyze optimal pricing for a {request.cuisine_type} restaurant in {request.location}:
-    - Market price points
-    - Cost structure
-    - Profit margins
-    - Price sensitivity
-    """
-    response = llm.invoke([HumanMessage(content=prompt)])
+    prompt = build_prompt("optimal-pricing-analysis", request)
+    response = await llm.ainvoke([HumanMessage(content=prompt)], config=llm_config("optimal-pricing-analysis", request))
     return MarketingResponse(
         result={"pricing": response.content},
         metadata={"tool": "optimal-pricing-analysis"}
@@ -121,13 +192,8 @@ async def optimal_pricing_analysis(request: MarketingRequest) -> MarketingRespon
 
 async def social_sentiment_analysis(request: MarketingRequest) -> MarketingResponse:
     """Analyze social media sentiment"""
-    prompt = f"""Analyze social media sentiment for {request.cuisine_type} restaurants in {request.location}:
-    - Customer reviews
-    - Social media mentions
-    - Sentiment trends
-    - Key topics
-    """
-    response = llm.invoke([HumanMessage(content=prompt)])
+    prompt = build_prompt("social-sentiment-analysis", request)
+    response = await llm.ainvoke([HumanMessage(content=prompt)], config=llm_config("social-sentiment-analysis", request))
     return MarketingResponse(
         result={"sentiment": response.content},
         metadata={"tool": "social-sentiment-analysis"}
@@ -135,13 +201,8 @@ async def social_sentiment_analysis(request: MarketingRequest) -> MarketingRespo
 
 async def local_event_opportunity(request: MarketingRequest) -> MarketingResponse:
     """Analyze local event opportunities"""
-    prompt = f"""Analyze local event opportunities for a {request.cuisine_type} restaurant in {request.location}:
-    - Upcoming events
-    - Partnership opportunities
-    - Marketing potential
-    - ROI analysis
-    """
-    response = llm.invoke([HumanMessage(content=prompt)])
+    prompt = build_prompt("local-event-opportunity", request)
+    response = await llm.ainvoke([HumanMessage(content=prompt)], config=llm_config("local-event-opportunity", request))
     return MarketingResponse(
         result={"opportunities": response.content},
         metadata={"tool": "local-event-opportunity"}
@@ -155,6 +216,53 @@ TOOL_MAP = {
     "local-event-opportunity": local_event_opportunity
 }
 
+@app.post("/marketing-tools/batch")
+async def execute_marketing_tools_batch(request: MarketingBatchRequest):
+    """Run several marketing tools concurrently, streaming each result as it completes"""
+    tool_names = request.tools or list(TOOL_MAP.keys())
+    unknown = [tool_name for tool_name in tool_names if tool_name not in TOOL_MAP]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Tools not found: {', '.join(unknown)}")
+
+    async def run_tool(tool_name: str):
+        tool_request = MarketingRequest(
+            location=request.location,
+            cuisine_type=request.cuisine_type,
+            tool=tool_name,
+            parameters=request.parameters
+        )
+        try:
+            response = await TOOL_MAP[tool_name](tool_request)
+            return {"tool": tool_name, "result": response.result, "metadata": response.metadata}
+        except Exception as e:
+            return {"tool": tool_name, "error": str(e)}
+
+    async def generate():
+        tasks = [asyncio.create_task(run_tool(tool_name)) for tool_name in dict.fromkeys(tool_names)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield f"data: {json.dumps(await next_result)}\n\n"
+            yield "data: [DONE]\n\n"
+        finally:
+            # Client went away before every tool finished
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+@app.post("/marketing-tools/{tool_name}/stream")
+async def stream_marketing_tool(tool_name: str, request: MarketingRequest):
+    """Stream a marketing research tool's answer token by token"""
+    if tool_name not in TOOL_MAP:
+        raise HTTPException(status_code=404, detail=f"Tool {tool_name} not found")
+
+    async def generate():
+        async for batch in streaming_manager.iter_formatted(stream_llm(build_prompt(tool_name, request), llm_config(tool_name, request)), "sse"):
+            yield batch
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
 @app.post("/marketing-tools/{tool_name}", response_model=MarketingResponse)
 async def execute_marketing_tool(tool_name: str, request: MarketingRequest):
     """Execute a marketing research tool"""
@@ -6,12 +6,12 @@ by comparing results from multiple sources against Google Maps as a baseline.
 
 import os
 import json
-import math
 import logging
 import argparse
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from restaurant_data_agent import RestaurantDataAgent
+from core.geo import haversine_distance, haversine_pairwise
 
 # Configure logging
 logging.basicConfig(
@@ -482,31 +482,31 @@ class RestaurantDataValidator:
         if not matches:
             return 0
         
-        total_accuracy = 0
-        valid_matches = 0
-        
+        # Collect the coordinate pairs, skipping matches with any coordinate missing
+        coordinates = []
         for match in matches:
             google_lat = match["google_data"].get("latitude")
             google_lon = match["google_data"].get("longitude")
             platform_lat = match["platform_data"].get("latitude")
             platform_lon = match["platform_data"].get("longitude")
             
-            # Skip if any coordinate is missing
             if not all([google_lat, google_lon, platform_lat, platform_lon]):
                 continue
-                
-            valid_matches += 1
-            
-            # Calculate distance between points
-            distance = self._haversine_distance(google_lat, google_lon, platform_lat, platform_lon)
             
-            # Convert distance to accuracy score
-            # 0m = 100%, 100m = 50%, 200m or more = 0%
-            accuracy = max(0, 100 - (distance * 1000 / 2))
-            
-            total_accuracy += accuracy
+            coordinates.append((google_lat, google_lon, platform_lat, platform_lon))
+        
+        if not coordinates:
+            return 0
+        
+        # Calculate all distances between points in one batch
+        google_lats, google_lons, platform_lats, platform_lons = zip(*coordinates)
+        distances = haversine_pairwise(google_lats, google_lons, platform_lats, platform_lons)
+        
+        # Convert distance to accuracy score
+        # 0m = 100%, 100m = 50%, 200m or more = 0%
+        accuracies = (100 - distances * 1000 / 2).clip(min=0)
         
-        return total_accuracy / valid_matches if valid_matches > 0 else 0
+        return float(accuracies.mean())
     
     def _calculate_field_accuracy(self, matches: List[Dict]) -> Dict[str, float]:
         """
@@ -537,23 +537,7 @@ class RestaurantDataValidator:
         Returns:
             Distance in kilometers
         """
-        # Earth's radius in kilometers
-        earth_radius = 6371.0
-        
-        # Convert latitude and longitude from degrees to radians
-        lat1_rad = math.radians(lat1)
-        lon1_rad = math.radians(lon1)
-        lat2_rad = math.radians(lat2)
-        lon2_rad = math.radians(lon2)
-        
-        # Haversine formula
-        dlon = lon2_rad - lon1_rad
-        dlat = lat2_rad - lat1_rad
-        a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = earth_radius * c
-        
-        return distance
+        return haversine_distance(lat1, lon1, lat2, lon2)
     
     def _generate_recommendations(self, completeness_report: Dict, accuracy_report: Dict) -> List[str]:
         """
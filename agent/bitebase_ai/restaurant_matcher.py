@@ -9,19 +9,16 @@ import json
 import math
 import logging
 import argparse
-from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
 
-# Import fuzzy matching libraries
-try:
-    from fuzzywuzzy import fuzz
-    from fuzzywuzzy import process
-except ImportError:
-    print("fuzzywuzzy not installed. Installing...")
-    import subprocess
-    subprocess.check_call(["pip", "install", "fuzzywuzzy", "python-Levenshtein"])
-    from fuzzywuzzy import fuzz
-    from fuzzywuzzy import process
+import numpy as np
+
+from .core.geo import haversine_distance
+from .core.restaurant_batch import as_batches
+from .core.similarity import candidate_pairs, string_similarity, location_similarity, best_per_row
+from .core.assignment import assign_pairs
+from .core.entity_resolution import EntityResolver
+from .core.kv_cache import get_kv_cache
 
 # Configure logging
 logging.basicConfig(
@@ -45,6 +42,7 @@ class RestaurantMatcher:
         self.config = {
             "cache_dir": "cache",
             "cache_duration_hours": 24,
+            "cache_max_size_mb": 512,
             "match_thresholds": {
                 "name": 80,  # Minimum name similarity score (0-100)
                 "address": 60,  # Minimum address similarity score (0-100)
@@ -55,6 +53,14 @@ class RestaurantMatcher:
                 "name": 0.5,  # Weight for name similarity
                 "address": 0.3,  # Weight for address similarity
                 "location": 0.2  # Weight for location proximity
+            },
+            "blocking": {
+                "enabled": True,
+                "max_distance_km": 1.0,  # Only score restaurants within this distance
+                "name_prefix_length": 3  # Token prefix length for restaurants without coordinates
+            },
+            "assignment": {
+                "mode": "greedy"  # "greedy": best candidate per base restaurant, "optimal": one-to-one
             }
         }
         
@@ -64,15 +70,27 @@ class RestaurantMatcher:
                 user_config = json.load(f)
                 self.config.update(user_config)
         
-        # Create cache directory if it doesn't exist
-        os.makedirs(self.config["cache_dir"], exist_ok=True)
+        # Open the shared cache database (creates the cache directory if needed)
+        self.cache = get_kv_cache(
+            self.config["cache_dir"],
+            max_size_bytes=self.config["cache_max_size_mb"] * 1024 * 1024
+        )
+        
+        # Entities of every scrape passed to resolve_entities
+        self.entity_resolver = self.create_entity_resolver()
     
-    def match_restaurants(self, restaurant_lists: Dict[str, List[Dict]]) -> List[Dict]:
+    def match_restaurants(self, restaurant_lists: Dict[str, List[Dict]], mode: Optional[str] = None) -> List[Dict]:
         """
         Match restaurants across different platforms.
         
+        In greedy mode every base restaurant keeps its best candidate, so a
+        restaurant of another platform may match several base restaurants.
+        In optimal mode each platform is matched to the base one-to-one,
+        maximizing the total score of the pairs (see core.assignment).
+        
         Args:
             restaurant_lists: Dictionary of lists of restaurants from different platforms
+            mode: Assignment mode, "greedy" or "optimal" (default: from config)
             
         Returns:
             List of matched restaurants with data from all available platforms
@@ -83,124 +101,128 @@ class RestaurantMatcher:
         if not restaurant_lists or all(len(v) == 0 for v in restaurant_lists.values()):
             return []
         
+        # Normalize names and addresses and convert coordinates once per restaurant
+        batches = as_batches(restaurant_lists, self._normalize_name, self._normalize_address)
+        
         # Use the platform with the most restaurants as the base
-        base_platform = max(restaurant_lists.items(), key=lambda x: len(x[1]))[0]
-        base_restaurants = restaurant_lists[base_platform]
+        base_platform = max(batches.items(), key=lambda x: len(x[1]))[0]
+        base_batch = batches[base_platform]
         
-        logger.info(f"Using {base_platform} as base platform with {len(base_restaurants)} restaurants")
+        logger.info(f"Using {base_platform} as base platform with {len(base_batch)} restaurants")
         
-        # Process each base restaurant
-        for base_restaurant in base_restaurants:
-            matched_restaurant = {
-                "base_platform": base_platform,
-                "base_data": base_restaurant,
-                "matches": {}
-            }
+        blocking_config = self.config.get("blocking", {})
+        max_distance_km = None
+        if blocking_config.get("enabled", True):
+            max_distance_km = blocking_config.get("max_distance_km", 1.0)
+        
+        assignment_config = self.config.get("assignment", {})
+        mode = mode or assignment_config.get("mode", "greedy")
+        if mode not in ("greedy", "optimal"):
+            raise ValueError(f"Unknown assignment mode: {mode}")
+        
+        weights = self.config["match_weights"]
+        total_weight = sum(weights.values())
+        matches = [{} for _ in range(len(base_batch))]
+        
+        # Score each platform against the base in bulk; with blocking each base
+        # restaurant is only scored against nearby (or similarly named) restaurants
+        for platform, batch in batches.items():
+            if platform == base_platform:
+                continue
             
-            # Extract key matching fields
-            base_name = self._normalize_name(base_restaurant.get("name", ""))
-            base_address = self._normalize_address(base_restaurant.get("address", ""))
-            base_lat = base_restaurant.get("latitude")
-            base_lon = base_restaurant.get("longitude")
+            rows, cols = candidate_pairs(
+                base_batch, batch, max_distance_km, blocking_config.get("name_prefix_length", 3)
+            )
+            name_similarity = string_similarity(base_batch.names, batch.names, rows, cols)
+            address_similarity = string_similarity(base_batch.addresses, batch.addresses, rows, cols)
             
-            # Try to match with restaurants from other platforms
-            for platform, restaurants in restaurant_lists.items():
-                if platform == base_platform:
-                    continue
-                    
-                best_match = None
-                best_score = 0
-                
-                for restaurant in restaurants:
-                    # Calculate match score
-                    match_score, match_details = self._calculate_match_score(
-                        base_restaurant=base_restaurant,
-                        candidate_restaurant=restaurant
-                    )
-                    
-                    # Update best match if this is better
-                    if match_score > best_score and match_score >= self.config["match_thresholds"]["overall"]:
-                        best_match = {
-                            "data": restaurant,
-                            "confidence": match_score,
-                            "match_details": match_details
-                        }
-                        best_score = match_score
-                
-                if best_match:
-                    matched_restaurant["matches"][platform] = best_match
+            # Convert distance to similarity score (closer = higher score)
+            # 100m or less = 1.0, threshold km = 0.0
+            distances = base_batch.pair_distances(batch, rows, cols)
+            location = location_similarity(distances, self.config["match_thresholds"]["location"])
             
-            # Only include restaurants with at least one match
-            if matched_restaurant["matches"]:
-                matched_restaurants.append(matched_restaurant)
+            # Calculate overall match scores with weights, normalized to be between 0 and 1
+            scores = (
+                weights["name"] * name_similarity +
+                weights["address"] * address_similarity +
+                weights["location"] * location
+            )
+            if total_weight > 0:
+                scores /= total_weight
+            
+            threshold = self.config["match_thresholds"]["overall"]
+            if mode == "optimal":
+                best = assign_pairs(rows, cols, scores, len(base_batch), threshold)
+            else:
+                best = best_per_row(rows, scores, len(base_batch), threshold, inclusive=True)
+            for base_index in np.flatnonzero(best >= 0).tolist():
+                pair = best[base_index]
+                distance_km = float(distances[pair])
+                matches[base_index][platform] = {
+                    "data": batch[int(cols[pair])],
+                    "confidence": float(scores[pair]),
+                    "match_details": {
+                        "name_similarity": float(name_similarity[pair]),
+                        "address_similarity": float(address_similarity[pair]),
+                        "location_similarity": float(location[pair]),
+                        "distance_km": None if math.isnan(distance_km) else distance_km
+                    }
+                }
+        
+        # Only include restaurants with at least one match
+        for base_restaurant, restaurant_matches in zip(base_batch, matches):
+            if restaurant_matches:
+                matched_restaurants.append({
+                    "base_platform": base_platform,
+                    "base_data": base_restaurant,
+                    "matches": restaurant_matches
+                })
         
         logger.info(f"Found {len(matched_restaurants)} matched restaurants across platforms")
         return matched_restaurants
     
-    def _calculate_match_score(self, base_restaurant: Dict, candidate_restaurant: Dict) -> Tuple[float, Dict]:
+    def create_entity_resolver(self) -> EntityResolver:
         """
-        Calculate match score between two restaurants.
+        Create an entity resolver using this matcher's weights, thresholds and normalizers.
+        
+        The matcher keeps one in ``entity_resolver``; create another for an
+        independent set of entities.
         
-        Args:
-            base_restaurant: Restaurant from base platform
-            candidate_restaurant: Restaurant from another platform
-            
         Returns:
-            Tuple of (overall_score, match_details)
+            Empty entity resolver
         """
-        # Extract and normalize fields
-        base_name = self._normalize_name(base_restaurant.get("name", ""))
-        candidate_name = self._normalize_name(candidate_restaurant.get("name", ""))
-        
-        base_address = self._normalize_address(base_restaurant.get("address", ""))
-        candidate_address = self._normalize_address(candidate_restaurant.get("address", ""))
-        
-        base_lat = base_restaurant.get("latitude")
-        base_lon = base_restaurant.get("longitude")
-        candidate_lat = candidate_restaurant.get("latitude")
-        candidate_lon = candidate_restaurant.get("longitude")
-        
-        # Calculate name similarity
-        name_similarity = fuzz.ratio(base_name, candidate_name) / 100.0
-        
-        # Calculate address similarity
-        address_similarity = fuzz.ratio(base_address, candidate_address) / 100.0
-        
-        # Calculate location proximity (if coordinates available)
-        location_similarity = 0
-        distance_km = None
-        if all(x is not None for x in [base_lat, base_lon, candidate_lat, candidate_lon]):
-            distance_km = self._haversine_distance(
-                base_lat, base_lon, 
-                candidate_lat, candidate_lon
-            )
-            # Convert distance to similarity score (closer = higher score)
-            # 100m or less = 1.0, threshold km = 0.0
-            location_threshold = self.config["match_thresholds"]["location"]
-            location_similarity = max(0, 1 - (distance_km / location_threshold))
-        
-        # Calculate overall match score with weights
-        weights = self.config["match_weights"]
-        overall_score = (
-            weights["name"] * name_similarity + 
-            weights["address"] * address_similarity + 
-            weights["location"] * location_similarity
+        blocking_config = self.config.get("blocking", {})
+        return EntityResolver(
+            min_score=self.config["match_thresholds"]["overall"],
+            max_distance_km=blocking_config.get("max_distance_km", 1.0),
+            location_scale_km=self.config["match_thresholds"]["location"],
+            weights=self.config["match_weights"],
+            prefix_length=blocking_config.get("name_prefix_length", 3),
+            name_normalizer=self._normalize_name,
+            address_normalizer=self._normalize_address
         )
+    
+    def resolve_entities(self, restaurant_lists: Dict[str, List[Dict]], min_platforms: int = 2) -> List[Dict]:
+        """
+        Group restaurants from all platforms into entities, without a base platform.
         
-        # Normalize to ensure score is between 0 and 1
-        total_weight = sum(weights.values())
-        if total_weight > 0:
-            overall_score /= total_weight
-        
-        # Prepare match details
-        match_details = {
-            "name_similarity": name_similarity,
-            "address_similarity": address_similarity,
-            "location_similarity": location_similarity,
-            "distance_km": distance_km
-        }
+        Unlike match_restaurants, restaurants missing from the largest platform
+        are still linked across the other platforms. The restaurants are added
+        to the matcher's entity resolver, so restaurants of earlier calls are
+        linked too, and a restaurant scraped again keeps its entity ID.
+        
+        Args:
+            restaurant_lists: Dictionary of lists of restaurants from different platforms
+            min_platforms: Only include entities found on at least this many platforms
+            
+        Returns:
+            List of the entities of the given restaurants with their record on each platform
+        """
+        entity_ids = self.entity_resolver.add_records(restaurant_lists)
         
-        return overall_score, match_details
+        entities = self.entity_resolver.entities(min_platforms, entity_ids)
+        logger.info(f"Resolved {len(entities)} restaurant entities across platforms")
+        return entities
     
     def _normalize_name(self, name: str) -> str:
         """
@@ -285,42 +307,17 @@ class RestaurantMatcher:
         Returns:
             Distance in kilometers
         """
-        # Earth's radius in kilometers
-        earth_radius = 6371.0
-        
-        # Convert latitude and longitude from degrees to radians
-        lat1_rad = math.radians(lat1)
-        lon1_rad = math.radians(lon1)
-        lat2_rad = math.radians(lat2)
-        lon2_rad = math.radians(lon2)
-        
-        # Haversine formula
-        dlon = lon2_rad - lon1_rad
-        dlat = lat2_rad - lat1_rad
-        a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = earth_radius * c
-        
-        return distance
+        return haversine_distance(lat1, lon1, lat2, lon2)
     
     def _cache_data(self, cache_key: str, data: Any) -> None:
         """
-        Cache data to disk.
+        Cache data in the shared cache database.
         
         Args:
             cache_key: Unique identifier for the cached data
             data: Data to cache
         """
-        cache_path = os.path.join(self.config["cache_dir"], f"{cache_key}.json")
-        
-        cache_data = {
-            "data": data,
-            "timestamp": datetime.now().isoformat(),
-            "expiry": (datetime.now() + timedelta(hours=self.config["cache_duration_hours"])).isoformat()
-        }
-        
-        with open(cache_path, "w", encoding="utf-8") as f:
-            json.dump(cache_data, f, ensure_ascii=False, indent=2)
+        self.cache.set(f"matcher:{cache_key}", data, self.config["cache_duration_hours"] * 3600)
     
     def _get_cached_data(self, cache_key: str) -> Optional[Any]:
         """
@@ -332,25 +329,7 @@ class RestaurantMatcher:
         Returns:
             Cached data or None if not available or expired
         """
-        cache_path = os.path.join(self.config["cache_dir"], f"{cache_key}.json")
-        
-        if not os.path.exists(cache_path):
-            return None
-        
-        try:
-            with open(cache_path, "r", encoding="utf-8") as f:
-                cache_data = json.load(f)
-            
-            expiry = datetime.fromisoformat(cache_data["expiry"])
-            
-            if datetime.now() > expiry:
-                logger.info(f"Cache expired for {cache_key}")
-                return None
-            
-            return cache_data["data"]
-        except Exception as e:
-            logger.error(f"Error reading cache: {str(e)}")
-            return None
+        return self.cache.get(f"matcher:{cache_key}")
 
 def main():
     """
@@ -360,6 +339,7 @@ def main():
     parser.add_argument("--input", type=str, required=True, help="Path to input file with restaurant data (JSON)")
     parser.add_argument("--output", type=str, help="Path to output file (JSON)")
     parser.add_argument("--config", type=str, help="Path to configuration file")
+    parser.add_argument("--assignment", type=str, choices=["greedy", "optimal"], help="Assignment mode (default: from config)")
     
     args = parser.parse_args()
     
@@ -372,7 +352,7 @@ def main():
             restaurant_lists = json.load(f)
         
         # Match restaurants
-        matched_restaurants = matcher.match_restaurants(restaurant_lists)
+        matched_restaurants = matcher.match_restaurants(restaurant_lists, mode=args.assignment)
         
         # Output results
         output_data = {
@@ -61,9 +61,10 @@ def run_research(location: str, cuisine_type: str, additional_context: Optional[
         try:
             # Import the RestaurantDataAgent
             from .agents.restaurant_data_agent import RestaurantDataAgent
+            from .core.agent_registry import get_agent
             
-            # Create an instance of the agent
-            restaurant_data_agent = RestaurantDataAgent()
+            # Reuse the process-wide agent and its connection pools
+            restaurant_data_agent = get_agent(RestaurantDataAgent)
             
             # Get real restaurant data
             radius_km = 1.0  # Default radius
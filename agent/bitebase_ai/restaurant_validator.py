@@ -6,12 +6,16 @@ of restaurant data extracted from various platforms against Google Maps as a bas
 
 import os
 import json
-import math
 import logging
 import argparse
+import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
+from .core.geo import haversine_distance
+from .core.restaurant_batch import as_batch
+from .core.similarity import candidate_pairs, string_similarity, best_per_row
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -241,14 +245,6 @@ class RestaurantValidator:
         Returns:
             Comparison report
         """
-        try:
-            from fuzzywuzzy import fuzz
-        except ImportError:
-            logger.warning("fuzzywuzzy not installed. Installing...")
-            import subprocess
-            subprocess.check_call(["pip", "install", "fuzzywuzzy", "python-Levenshtein"])
-            from fuzzywuzzy import fuzz
-        
         # Metrics to compare
         metrics = {
             "name_similarity": [],
@@ -258,84 +254,51 @@ class RestaurantValidator:
             "price_level_difference": []
         }
         
-        # For each platform restaurant, find the best matching Google Maps restaurant
+        # Lowercase names and addresses and convert coordinates once per restaurant
+        # (the thresholds below are tuned for lowercased, otherwise raw strings)
+        platform_batch = as_batch(platform_restaurants, str.lower, str.lower)
+        google_maps_batch = as_batch(google_maps_restaurants, str.lower, str.lower)
+        
+        # Score every candidate pair in bulk. Located pairs more than 1 km apart
+        # have a zero distance factor and cannot pass the threshold, so the
+        # 1 km block only drops pairs that could never match; pairs where
+        # either side lacks coordinates are all scored, as before blocking
+        rows, cols = candidate_pairs(platform_batch, google_maps_batch, max_distance_km=1.0, pair_unlocated=True)
+        name_similarity = string_similarity(platform_batch.names, google_maps_batch.names, rows, cols)
+        address_similarity = string_similarity(platform_batch.addresses, google_maps_batch.addresses, rows, cols)
+        distances = platform_batch.pair_distances(google_maps_batch, rows, cols)
+        
+        # Calculate overall match scores, adjusted by distance where known (closer = better)
+        scores = name_similarity * 0.6 + address_similarity * 0.4
+        distance_factor = np.clip(1 - distances, 0, None)
+        scores = np.where(np.isnan(distances), scores, scores * 0.7 + distance_factor * 0.3)
+        best = best_per_row(rows, scores, len(platform_batch), 0.7)
+        
+        # For each platform restaurant with a matching Google Maps restaurant, compare the data
         matched_count = 0
-        for p_rest in platform_restaurants:
-            best_match = None
-            best_score = 0
+        for p_index in np.flatnonzero(best >= 0).tolist():
+            pair = best[p_index]
+            p_rest = platform_batch[p_index]
+            best_match = google_maps_batch[int(cols[pair])]
+            matched_count += 1
             
-            for g_rest in google_maps_restaurants:
-                # Calculate name similarity
-                p_name = p_rest.get("name", "").lower()
-                g_name = g_rest.get("name", "").lower()
-                name_similarity = fuzz.ratio(p_name, g_name) / 100.0
-                
-                # Calculate address similarity
-                p_address = p_rest.get("address", "").lower()
-                g_address = g_rest.get("address", "").lower()
-                address_similarity = fuzz.ratio(p_address, g_address) / 100.0
-                
-                # Calculate location proximity
-                location_distance = None
-                if all(x is not None for x in [
-                    p_rest.get("latitude"), p_rest.get("longitude"),
-                    g_rest.get("latitude"), g_rest.get("longitude")
-                ]):
-                    location_distance = self._haversine_distance(
-                        p_rest["latitude"], p_rest["longitude"],
-                        g_rest["latitude"], g_rest["longitude"]
-                    )
-                
-                # Calculate overall match score
-                match_score = name_similarity * 0.6 + address_similarity * 0.4
-                if location_distance is not None:
-                    # Adjust score based on distance (closer = better)
-                    distance_factor = max(0, 1 - location_distance)
-                    match_score = match_score * 0.7 + distance_factor * 0.3
-                
-                # Update best match
-                if match_score > best_score and match_score > 0.7:
-                    best_match = g_rest
-                    best_score = match_score
+            # Name and address similarity
+            metrics["name_similarity"].append(float(name_similarity[pair]))
+            metrics["address_similarity"].append(float(address_similarity[pair]))
             
-            # If a match was found, compare the data
-            if best_match:
-                matched_count += 1
-                
-                # Name similarity
-                name_similarity = fuzz.ratio(
-                    p_rest.get("name", "").lower(),
-                    best_match.get("name", "").lower()
-                ) / 100.0
-                metrics["name_similarity"].append(name_similarity)
-                
-                # Address similarity
-                address_similarity = fuzz.ratio(
-                    p_rest.get("address", "").lower(),
-                    best_match.get("address", "").lower()
-                ) / 100.0
-                metrics["address_similarity"].append(address_similarity)
-                
-                # Location distance
-                if all(x is not None for x in [
-                    p_rest.get("latitude"), p_rest.get("longitude"),
-                    best_match.get("latitude"), best_match.get("longitude")
-                ]):
-                    distance = self._haversine_distance(
-                        p_rest["latitude"], p_rest["longitude"],
-                        best_match["latitude"], best_match["longitude"]
-                    )
-                    metrics["location_distance"].append(distance)
-                
-                # Rating difference
-                if p_rest.get("rating") is not None and best_match.get("rating") is not None:
-                    rating_diff = abs(p_rest["rating"] - best_match["rating"])
-                    metrics["rating_difference"].append(rating_diff)
-                
-                # Price level difference
-                if p_rest.get("price_level") is not None and best_match.get("price_level") is not None:
-                    price_diff = abs(p_rest["price_level"] - best_match["price_level"])
-                    metrics["price_level_difference"].append(price_diff)
+            # Location distance
+            if not np.isnan(distances[pair]):
+                metrics["location_distance"].append(float(distances[pair]))
+            
+            # Rating difference
+            if p_rest.get("rating") is not None and best_match.get("rating") is not None:
+                rating_diff = abs(p_rest["rating"] - best_match["rating"])
+                metrics["rating_difference"].append(rating_diff)
+            
+            # Price level difference
+            if p_rest.get("price_level") is not None and best_match.get("price_level") is not None:
+                price_diff = abs(p_rest["price_level"] - best_match["price_level"])
+                metrics["price_level_difference"].append(price_diff)
         
         # Calculate average metrics
         avg_metrics = {}
@@ -455,23 +418,7 @@ class RestaurantValidator:
         Returns:
             Distance in kilometers
         """
-        # Earth's radius in kilometers
-        earth_radius = 6371.0
-        
-        # Convert latitude and longitude from degrees to radians
-        lat1_rad = math.radians(lat1)
-        lon1_rad = math.radians(lon1)
-        lat2_rad = math.radians(lat2)
-        lon2_rad = math.radians(lon2)
-        
-        # Haversine formula
-        dlon = lon2_rad - lon1_rad
-        dlat = lat2_rad - lat1_rad
-        a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = earth_radius * c
-        
-        return distance
+        return haversine_distance(lat1, lon1, lat2, lon2)
 
 def main():
     """
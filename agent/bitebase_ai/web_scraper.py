@@ -11,9 +11,11 @@ import math
 import random
 import logging
 import argparse
+import threading
 import requests
-from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple, Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlencode, quote_plus
 
@@ -45,6 +47,11 @@ except ImportError:
     from selenium.webdriver.support import expected_conditions as EC
     from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from .core.geo import haversine_distance, filter_by_radius
+from .core.restaurant_batch import as_batches
+from .core.similarity import candidate_pairs, string_similarity, location_similarity, best_per_row
+from .core.kv_cache import get_kv_cache, StaleDict
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -68,6 +75,8 @@ class RestaurantWebScraper:
         self.config = {
             "cache_dir": "cache",
             "cache_duration_hours": 24,
+            "cache_max_size_mb": 512,
+            "cache_max_stale_hours": 6,  # Serve expired results this long while a background scrape refreshes them
             "user_agents": [
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
                 "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Safari/605.1.15",
@@ -79,7 +88,12 @@ class RestaurantWebScraper:
                 "max": 5
             },
             "timeout": 30,
-            "max_retries": 3
+            "max_retries": 3,
+            "blocking": {
+                "enabled": True,
+                "max_distance_km": 2.0,  # Only score restaurants within this distance
+                "name_prefix_length": 3  # Token prefix length for restaurants without coordinates
+            }
         }
         
         # Load config from file if provided
@@ -88,12 +102,21 @@ class RestaurantWebScraper:
                 user_config = json.load(f)
                 self.config.update(user_config)
         
-        # Create cache directory if it doesn't exist
-        os.makedirs(self.config["cache_dir"], exist_ok=True)
+        # Open the shared cache database (creates the cache directory if needed)
+        self.cache = get_kv_cache(
+            self.config["cache_dir"],
+            max_size_bytes=self.config["cache_max_size_mb"] * 1024 * 1024
+        )
         
         # Initialize browser options
         self.headless = headless
         self.browser = None
+        
+        # The browser is shared, so scrapes (including background refreshes) take turns
+        self._browser_lock = threading.RLock()
+        self._refresh_executor = None
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
     
     def __del__(self):
         """
@@ -162,57 +185,117 @@ class RestaurantWebScraper:
         if platforms is None:
             platforms = ["foodpanda", "wongnai", "robinhood", "google_maps"]
         
-        # Check cache first
+        # Check cache first; an expired entry is served while a fresh scrape runs in the background
         cache_key = f"{latitude}_{longitude}_{radius_km}_{'-'.join(sorted(platforms))}"
-        cached_data = self._get_cached_data(cache_key)
+        cached_data = self._get_cached_data(
+            cache_key,
+            refresh=lambda stale: self._refresh_search(stale, latitude, longitude, radius_km, platforms)
+        )
         if cached_data:
-            logger.info(f"Using cached data for {latitude}, {longitude} with radius {radius_km}km")
+            if getattr(cached_data, "stale", False):
+                logger.info(f"Using stale cached data for {latitude}, {longitude} with radius {radius_km}km while refreshing")
+            else:
+                logger.info(f"Using cached data for {latitude}, {longitude} with radius {radius_km}km")
             return cached_data
         
-        # Create bounding box for initial filtering
-        bbox = self._create_bounding_box(latitude, longitude, radius_km)
+        results = self._scrape_platforms(latitude, longitude, radius_km, platforms)
+        
+        # Cache the results
+        self._cache_data(cache_key, results)
+        
+        return results
+    
+    def _refresh_search(self,
+                        stale: Dict[str, List[Dict]],
+                        latitude: float,
+                        longitude: float,
+                        radius_km: float,
+                        platforms: List[str]) -> Optional[Dict[str, List[Dict]]]:
+        """
+        Scrape fresh results to replace stale cached ones.
+        
+        A scrape in which a platform failed, or came back empty where the
+        stale results had restaurants, is discarded so that a transient
+        failure does not replace good stale data for the whole cache duration.
+        
+        Args:
+            stale: Stale cached results
+            latitude: Center point latitude
+            longitude: Center point longitude
+            radius_km: Search radius in kilometers
+            platforms: List of platforms to search
+            
+        Returns:
+            Fresh results, or None to keep the stale ones
+        """
+        failed = []
+        results = self._scrape_platforms(latitude, longitude, radius_km, platforms, failed)
+        emptied = [platform for platform, restaurants in results.items() if not restaurants and stale.get(platform)]
+        if failed or emptied:
+            logger.warning(f"Keeping stale data: failed platforms {failed}, empty platforms {emptied}")
+            return None
         
+        return results
+    
+    def _scrape_platforms(self,
+                          latitude: float,
+                          longitude: float,
+                          radius_km: float,
+                          platforms: List[str],
+                          failed: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Scrape restaurants from each platform and filter them by radius.
+        
+        Args:
+            latitude: Center point latitude
+            longitude: Center point longitude
+            radius_km: Search radius in kilometers
+            platforms: List of platforms to search
+            failed: List the platforms whose scrape raised are appended to
+            
+        Returns:
+            Dictionary of restaurant lists by platform (empty for failed platforms)
+        """
         # Initialize results dictionary
         results = {}
         
         # Search on each platform
         for platform in platforms:
             try:
-                if platform == "foodpanda":
-                    results[platform] = self._scrape_foodpanda_restaurants(latitude, longitude, radius_km)
-                elif platform == "wongnai":
-                    results[platform] = self._scrape_wongnai_restaurants(latitude, longitude, radius_km)
-                elif platform == "robinhood":
-                    results[platform] = self._scrape_robinhood_restaurants(latitude, longitude, radius_km)
-                elif platform == "google_maps":
-                    results[platform] = self._scrape_google_maps_restaurants(latitude, longitude, radius_km)
-                else:
+                with self._browser_lock:
+                    results[platform] = self._scrape_platform(platform, latitude, longitude, radius_km)
+                if results[platform] is None:
                     logger.warning(f"Unknown platform: {platform}")
+                    del results[platform]
                     continue
                 
                 logger.info(f"Found {len(results[platform])} restaurants on {platform}")
                 
                 # Filter results by exact radius
-                results[platform] = [
-                    r for r in results[platform] 
-                    if self._is_within_radius(
-                        latitude, longitude, 
-                        r.get("latitude"), r.get("longitude"), 
-                        radius_km
-                    )
-                ]
+                results[platform] = filter_by_radius(results[platform], latitude, longitude, radius_km)
                 
                 logger.info(f"After radius filtering: {len(results[platform])} restaurants on {platform}")
                 
             except Exception as e:
                 logger.error(f"Error searching {platform}: {str(e)}")
                 results[platform] = []
-        
-        # Cache the results
-        self._cache_data(cache_key, results)
+                if failed is not None:
+                    failed.append(platform)
         
         return results
     
+    def _scrape_platform(self, platform: str, latitude: float, longitude: float, radius_km: float) -> Optional[List[Dict]]:
+        """Scrape one platform, or return None for an unknown platform."""
+        if platform == "foodpanda":
+            return self._scrape_foodpanda_restaurants(latitude, longitude, radius_km)
+        elif platform == "wongnai":
+            return self._scrape_wongnai_restaurants(latitude, longitude, radius_km)
+        elif platform == "robinhood":
+            return self._scrape_robinhood_restaurants(latitude, longitude, radius_km)
+        elif platform == "google_maps":
+            return self._scrape_google_maps_restaurants(latitude, longitude, radius_km)
+        return None
+    
     def match_restaurants(self, restaurant_lists: Dict[str, List[Dict]]) -> List[Dict]:
         """
         Match restaurants across different platforms.
@@ -223,84 +306,57 @@ class RestaurantWebScraper:
         Returns:
             List of matched restaurants with data from all available platforms
         """
-        try:
-            from fuzzywuzzy import fuzz
-        except ImportError:
-            logger.warning("fuzzywuzzy not installed. Installing...")
-            import subprocess
-            subprocess.check_call(["pip", "install", "fuzzywuzzy", "python-Levenshtein"])
-            from fuzzywuzzy import fuzz
-        
-        matched_restaurants = []
-        
         # Skip if no data
         if not restaurant_lists or all(len(v) == 0 for v in restaurant_lists.values()):
             return []
         
+        # Lowercase names and addresses and convert coordinates once per restaurant
+        # (the thresholds below are tuned for lowercased, otherwise raw strings)
+        batches = as_batches(restaurant_lists, str.lower, str.lower)
+        
         # Use the platform with the most restaurants as the base
-        base_platform = max(restaurant_lists.items(), key=lambda x: len(x[1]))[0]
-        base_restaurants = restaurant_lists[base_platform]
+        base_platform = max(batches.items(), key=lambda x: len(x[1]))[0]
+        base_restaurants = batches[base_platform]
         
-        for base_restaurant in base_restaurants:
-            matched_restaurant = {
+        matched_restaurants = [
+            {
                 "base_platform": base_platform,
                 "base_data": base_restaurant,
                 "matches": {}
             }
+            for base_restaurant in base_restaurants
+        ]
+        
+        blocking_config = self.config.get("blocking", {})
+        max_distance_km = None
+        if blocking_config.get("enabled", True):
+            max_distance_km = blocking_config.get("max_distance_km", 2.0)
+        
+        # Score every nearby candidate pair of each platform against the base in bulk
+        for platform, restaurants in batches.items():
+            if platform == base_platform:
+                continue
+            
+            rows, cols = candidate_pairs(
+                base_restaurants, restaurants, max_distance_km, blocking_config.get("name_prefix_length", 3)
+            )
+            name_similarity = string_similarity(base_restaurants.names, restaurants.names, rows, cols)
+            address_similarity = string_similarity(base_restaurants.addresses, restaurants.addresses, rows, cols)
             
-            # Extract key matching fields
-            base_name = base_restaurant.get("name", "").lower()
-            base_address = base_restaurant.get("address", "").lower()
-            base_lat = base_restaurant.get("latitude")
-            base_lon = base_restaurant.get("longitude")
+            # Convert distance to similarity score (closer = higher score)
+            # 100m or less = 1.0, 1km = 0.5, 2km or more = 0.0
+            location = location_similarity(base_restaurants.pair_distances(restaurants, rows, cols), 2.0)
             
-            # Try to match with restaurants from other platforms
-            for platform, restaurants in restaurant_lists.items():
-                if platform == base_platform:
-                    continue
-                    
-                best_match = None
-                best_score = 0
-                
-                for restaurant in restaurants:
-                    # Calculate name similarity
-                    name = restaurant.get("name", "").lower()
-                    name_similarity = fuzz.ratio(base_name, name) / 100.0
-                    
-                    # Calculate address similarity
-                    address = restaurant.get("address", "").lower()
-                    address_similarity = fuzz.ratio(base_address, address) / 100.0
-                    
-                    # Calculate location proximity (if coordinates available)
-                    location_similarity = 0
-                    if base_lat and base_lon and restaurant.get("latitude") and restaurant.get("longitude"):
-                        distance = self._haversine_distance(
-                            base_lat, base_lon, 
-                            restaurant.get("latitude"), restaurant.get("longitude")
-                        )
-                        # Convert distance to similarity score (closer = higher score)
-                        # 100m or less = 1.0, 1km = 0.5, 2km or more = 0.0
-                        location_similarity = max(0, 1 - (distance / 2.0))
-                    
-                    # Calculate overall match score with weights
-                    score = (
-                        0.5 * name_similarity + 
-                        0.3 * address_similarity + 
-                        0.2 * location_similarity
-                    )
-                    
-                    # Update best match if this is better
-                    if score > best_score and score > 0.7:  # Threshold for considering a match
-                        best_match = restaurant
-                        best_score = score
-                
-                if best_match:
-                    matched_restaurant["matches"][platform] = {
-                        "data": best_match,
-                        "confidence": best_score
-                    }
+            # Calculate overall match score with weights; 0.7 is the threshold for considering a match
+            scores = 0.5 * name_similarity + 0.3 * address_similarity + 0.2 * location
+            best = best_per_row(rows, scores, len(base_restaurants), 0.7)
             
-            matched_restaurants.append(matched_restaurant)
+            for base_index in np.flatnonzero(best >= 0).tolist():
+                pair = best[base_index]
+                matched_restaurants[base_index]["matches"][platform] = {
+                    "data": restaurants[int(cols[pair])],
+                    "confidence": float(scores[pair])
+                }
         
         return matched_restaurants
     
@@ -906,23 +962,7 @@ class RestaurantWebScraper:
         Returns:
             Distance in kilometers
         """
-        # Earth's radius in kilometers
-        earth_radius = 6371.0
-        
-        # Convert latitude and longitude from degrees to radians
-        lat1_rad = math.radians(lat1)
-        lon1_rad = math.radians(lon1)
-        lat2_rad = math.radians(lat2)
-        lon2_rad = math.radians(lon2)
-        
-        # Haversine formula
-        dlon = lon2_rad - lon1_rad
-        dlat = lat2_rad - lat1_rad
-        a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = earth_radius * c
-        
-        return distance
+        return haversine_distance(lat1, lon1, lat2, lon2)
     
     def _get_point_at_distance(self, lat: float, lon: float, distance_km: float, bearing: float) -> Tuple[float, float]:
         """
@@ -963,52 +1003,77 @@ class RestaurantWebScraper:
     
     def _cache_data(self, cache_key: str, data: Any) -> None:
         """
-        Cache data to disk.
+        Cache data in the shared cache database.
         
         Args:
             cache_key: Unique identifier for the cached data
             data: Data to cache
         """
-        cache_path = os.path.join(self.config["cache_dir"], f"{cache_key}.json")
-        
-        cache_data = {
-            "data": data,
-            "timestamp": datetime.now().isoformat(),
-            "expiry": (datetime.now() + timedelta(hours=self.config["cache_duration_hours"])).isoformat()
-        }
-        
-        with open(cache_path, "w", encoding="utf-8") as f:
-            json.dump(cache_data, f, ensure_ascii=False, indent=2)
+        self.cache.set(
+            f"web_scraper:{cache_key}",
+            data,
+            self.config["cache_duration_hours"] * 3600,
+            self.config.get("cache_max_stale_hours", 0) * 3600
+        )
     
-    def _get_cached_data(self, cache_key: str) -> Optional[Any]:
+    def _get_cached_data(self, cache_key: str, refresh: Optional[Callable[[Any], Any]] = None) -> Optional[Any]:
         """
         Get cached data if available and not expired.
         
+        When a refresh function is given, data past its expiry but within
+        ``cache_max_stale_hours`` is returned as a StaleDict and the refresh
+        runs on a background worker to replace it.
+        
         Args:
             cache_key: Unique identifier for the cached data
+            refresh: Function producing fresh data for the key from the stale
+                data, or None to keep the stale data
             
         Returns:
             Cached data or None if not available or expired
         """
-        cache_path = os.path.join(self.config["cache_dir"], f"{cache_key}.json")
-        
-        if not os.path.exists(cache_path):
+        allow_stale = refresh is not None and self.config.get("cache_max_stale_hours", 0) > 0
+        entry = self.cache.get_entry(f"web_scraper:{cache_key}", allow_stale)
+        if entry is None:
             return None
         
-        try:
-            with open(cache_path, "r", encoding="utf-8") as f:
-                cache_data = json.load(f)
-            
-            expiry = datetime.fromisoformat(cache_data["expiry"])
-            
-            if datetime.now() > expiry:
-                logger.info(f"Cache expired for {cache_key}")
-                return None
-            
-            return cache_data["data"]
-        except Exception as e:
-            logger.error(f"Error reading cache: {str(e)}")
-            return None
+        data, stale = entry
+        if not stale:
+            return data
+        
+        self._refresh_in_background(cache_key, lambda: refresh(data))
+        return StaleDict(data) if isinstance(data, dict) else data
+    
+    def _refresh_in_background(self, cache_key: str, refresh: Callable[[], Any]) -> None:
+        """
+        Recompute and cache data for a key on a background worker.
+        
+        Args:
+            cache_key: Unique identifier for the cached data
+            refresh: Function producing fresh data for the key, or None to keep the cached data
+        """
+        with self._refreshing_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scraper-refresh")
+        
+        def run():
+            try:
+                data = refresh()
+                if data is None:
+                    logger.info(f"Kept stale cached data for {cache_key}")
+                    return
+                self._cache_data(cache_key, data)
+                logger.info(f"Refreshed cached data for {cache_key}")
+            except Exception as e:
+                logger.error(f"Error refreshing cached data for {cache_key}: {str(e)}")
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(cache_key)
+        
+        self._refresh_executor.submit(run)
 
 def main():
     """
@@ -1043,15 +1108,15 @@ def main():
             platforms=platforms
         )
         
+        # Expired cached results are served while they are refreshed in the background
+        output_data = {
+            "raw_results": results,
+            "metadata": {"stale": getattr(results, "stale", False)}
+        }
+        
         # Match restaurants if requested
         if args.match:
-            matched_results = scraper.match_restaurants(results)
-            output_data = {
-                "matched_restaurants": matched_results,
-                "raw_results": results
-            }
-        else:
-            output_data = results
+            output_data["matched_restaurants"] = scraper.match_restaurants(results)
         
         # Output results
         if args.output:
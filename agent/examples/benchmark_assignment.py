@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Assignment Benchmark - Compares greedy and optimal cross-platform matching.
+
+This script generates synthetic restaurant listings with known ground truth
+(restaurant chains with several nearby branches, renamed and slightly moved
+copies on each platform, platform-only restaurants) and matches them with
+RestaurantMatcher in greedy and optimal assignment mode, reporting the time,
+precision and recall of each mode and how many records were matched to more
+than one base restaurant.
+"""
+
+import json
+import time
+import random
+import logging
+import argparse
+from typing import Dict, List, Any
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("benchmark_assignment")
+
+from bitebase_ai.restaurant_matcher import RestaurantMatcher
+
+BRANDS = [
+    "Som Tam Nua", "Jay Fai", "Thipsamai", "After You", "MK Restaurants", "Fuji",
+    "Chabuton", "Nara Thai", "Baan Khanitha", "Krua Apsorn", "Boat Noodle", "Kuay Teow Reua",
+    "Pad Thai Pratu Pi", "Roti Mataba", "Khao Man Gai Pratunam", "Ohkajhu", "Greyhound Cafe",
+    "Savoey", "Laem Charoen Seafood", "Sukishi", "Bonchon", "Yayoi", "Coca Suki", "Gaggan"
+]
+STREETS = ["Sukhumvit", "Silom", "Ratchadamri", "Phahonyothin", "Rama IV", "Charoen Krung", "Phetchaburi"]
+SUFFIXES = ["", " Restaurant", " Bangkok", " (Official)", " Branch"]
+
+
+def generate_listings(size: int, seed: int) -> Dict[str, Any]:
+    """
+    Generate platform listings of synthetic restaurants with ground truth.
+
+    Args:
+        size: Number of real restaurants
+        seed: Random seed
+
+    Returns:
+        Dictionary with the listings per platform and the true pairs per platform
+    """
+    rng = random.Random(seed)
+    listings: Dict[str, List[Dict]] = {"google_maps": [], "wongnai": [], "foodpanda": []}
+    coverage = {"google_maps": 0.95, "wongnai": 0.7, "foodpanda": 0.5}
+
+    for entity_id in range(size):
+        # Chains get several branches close to each other
+        brand = rng.choice(BRANDS)
+        name = f"{brand} {rng.choice(STREETS)}" if rng.random() < 0.5 else f"{brand} {entity_id}"
+        latitude = 13.65 + rng.random() * 0.2
+        longitude = 100.45 + rng.random() * 0.2
+        address = f"{rng.randint(1, 999)} {rng.choice(STREETS)} Road, Soi {rng.randint(1, 60)}"
+
+        for platform, probability in coverage.items():
+            if rng.random() > probability:
+                continue
+            listings[platform].append({
+                "name": name + rng.choice(SUFFIXES),
+                "address": address if rng.random() < 0.8 else address.replace("Road", "Rd"),
+                "latitude": latitude + rng.gauss(0, 0.0003),
+                "longitude": longitude + rng.gauss(0, 0.0003),
+                "entity_id": entity_id
+            })
+
+    for restaurants in listings.values():
+        rng.shuffle(restaurants)
+
+    return listings
+
+
+def evaluate(matches: List[Dict], listings: Dict[str, List[Dict]]) -> Dict[str, Any]:
+    """
+    Score matcher output against the ground truth.
+
+    Args:
+        matches: Output of RestaurantMatcher.match_restaurants
+        listings: Generated listings
+
+    Returns:
+        Dictionary of precision, recall and duplicate counts
+    """
+    base_platform = matches[0]["base_platform"] if matches else "google_maps"
+    base_ids = {restaurant["entity_id"] for restaurant in listings[base_platform]}
+    true_pairs = sum(
+        1
+        for platform, restaurants in listings.items() if platform != base_platform
+        for restaurant in restaurants if restaurant["entity_id"] in base_ids
+    )
+
+    predicted = correct = 0
+    claims: Dict[int, int] = {}
+    for match in matches:
+        for platform_match in match["matches"].values():
+            predicted += 1
+            correct += platform_match["data"]["entity_id"] == match["base_data"]["entity_id"]
+            key = id(platform_match["data"])
+            claims[key] = claims.get(key, 0) + 1
+
+    return {
+        "pairs": predicted,
+        "precision": correct / predicted if predicted else 0.0,
+        "recall": correct / true_pairs if true_pairs else 0.0,
+        "records_matched_more_than_once": sum(1 for count in claims.values() if count > 1)
+    }
+
+
+def main():
+    """
+    Main function for command-line usage.
+    """
+    parser = argparse.ArgumentParser(description="Compare greedy and optimal restaurant assignment")
+    parser.add_argument("--size", type=int, default=20000, help="Number of real restaurants")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--config", type=str, help="Path to matcher configuration file")
+    args = parser.parse_args()
+
+    listings = generate_listings(args.size, args.seed)
+    print("Listings: " + ", ".join(f"{platform}={len(v)}" for platform, v in listings.items()))
+
+    matcher = RestaurantMatcher(config_path=args.config)
+    results = {}
+    for mode in ("greedy", "optimal"):
+        start = time.perf_counter()
+        matches = matcher.match_restaurants(listings, mode=mode)
+        elapsed = time.perf_counter() - start
+
+        results[mode] = {"seconds": round(elapsed, 3), **evaluate(matches, listings)}
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
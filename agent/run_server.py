@@ -35,6 +35,7 @@ try:
     )
     from bitebase_ai.search import search_for_places, get_place_details
     from bitebase_ai.agents.restaurant_research_agent import RestaurantResearchAgent
+    from bitebase_ai.core.streaming import WebSocketWatcher, ClientDisconnected, get_cancellation_stats
     
     # Try initializing the agent
     agent = RestaurantResearchAgent()
@@ -43,6 +44,17 @@ try:
 except Exception as e:
     logger.error(f"Failed to load agent components: {e}")
     logger.warning("Running in fallback mode with limited functionality")
+
+    # The streaming helpers only need the standard library, so load them on their own
+    import importlib.util
+    _streaming_spec = importlib.util.spec_from_file_location(
+        "bitebase_streaming", os.path.join(os.path.dirname(os.path.abspath(__file__)), "bitebase_ai", "core", "streaming.py")
+    )
+    _streaming = importlib.util.module_from_spec(_streaming_spec)
+    _streaming_spec.loader.exec_module(_streaming)
+    WebSocketWatcher = _streaming.WebSocketWatcher
+    ClientDisconnected = _streaming.ClientDisconnected
+    get_cancellation_stats = _streaming.get_cancellation_stats
     
     # Define dummy implementations for missing functions
     async def generate_insights(data):
@@ -152,7 +164,8 @@ async def status():
     return {
         "status": "ok",
         "agent_loaded": AGENT_LOADED,
-        "version": "0.1.0"
+        "version": "0.1.0",
+        "cancellations": get_cancellation_stats()
     }
 
 @app.get("/health")
@@ -302,10 +315,12 @@ async def conduct_research(request: ResearchRequest):
 @app.websocket("/ws/research")
 async def websocket_research(websocket: WebSocket):
     await websocket.accept()
+    # Receives in the background so a disconnect cancels the running research
+    watcher = WebSocketWatcher(websocket)
     try:
         while True:
             # Receive request from client
-            data = await websocket.receive_text()
+            data = await watcher.receive_text()
             request_data = json.loads(data)
             
             # Extract parameters
@@ -318,21 +333,26 @@ async def websocket_research(websocket: WebSocket):
                 await websocket.send_text(chunk)
             
             # Run agent with streaming
-            result = await agent.run_async(
-                latitude=latitude,
-                longitude=longitude,
-                radius_km=radius_km,
-                stream_callback=stream_callback
+            result = await watcher.run(
+                agent.run_async(
+                    latitude=latitude,
+                    longitude=longitude,
+                    radius_km=radius_km,
+                    stream_callback=stream_callback
+                ),
+                source="ws_research"
             )
             
             # Send final result
             await websocket.send_json({"status": "complete", "result": result})
             
-    except WebSocketDisconnect:
+    except (WebSocketDisconnect, ClientDisconnected):
         logger.info("WebSocket client disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
         await websocket.send_json({"status": "error", "message": str(e)})
+    finally:
+        watcher.close()
 
 # Serve static files
 try:
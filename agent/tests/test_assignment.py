@@ -0,0 +1,97 @@
+"""
+Tests for the one-to-one assignment solver.
+
+Run with: python -m unittest discover tests
+"""
+
+import itertools
+import random
+import unittest
+from typing import List, Tuple
+
+import numpy as np
+
+from bitebase_ai.core.assignment import assign_pairs
+
+
+def make_pairs(pairs: List[Tuple[int, int, float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split (row, col, score) triples into the solver's aligned arrays."""
+    rows, cols, scores = zip(*pairs) if pairs else ((), (), ())
+    return (
+        np.asarray(rows, dtype=np.int64),
+        np.asarray(cols, dtype=np.int64),
+        np.asarray(scores, dtype=np.float64)
+    )
+
+
+def brute_force_total(rows: np.ndarray, cols: np.ndarray, scores: np.ndarray, min_score: float) -> float:
+    """Best total score over every one-to-one subset of the eligible pairs."""
+    eligible = [i for i in range(len(scores)) if scores[i] >= min_score and scores[i] > 0]
+    best = 0.0
+    for size in range(1, len(eligible) + 1):
+        for subset in itertools.combinations(eligible, size):
+            if len({rows[i] for i in subset}) < size or len({cols[i] for i in subset}) < size:
+                continue
+            best = max(best, sum(scores[i] for i in subset))
+    return best
+
+
+class AssignPairsTest(unittest.TestCase):
+    """Tests for assign_pairs."""
+
+    def assert_one_to_one(self, assigned: np.ndarray, rows: np.ndarray, cols: np.ndarray):
+        """Check every assigned pair belongs to its row and no column is used twice."""
+        positions = assigned[assigned >= 0]
+        self.assertTrue(np.all(rows[positions] == np.flatnonzero(assigned >= 0)))
+        self.assertEqual(len(set(cols[positions].tolist())), len(positions))
+
+    def test_empty(self):
+        rows, cols, scores = make_pairs([])
+        assigned = assign_pairs(rows, cols, scores, 3, 0.5)
+        self.assertEqual(assigned.tolist(), [-1, -1, -1])
+
+    def test_resolves_contested_column(self):
+        # Greedy would give column 0 to both rows; the optimum moves row 0 to column 1
+        rows, cols, scores = make_pairs([(0, 0, 0.9), (0, 1, 0.8), (1, 0, 0.85)])
+        assigned = assign_pairs(rows, cols, scores, 2, 0.5)
+        self.assertEqual(cols[assigned].tolist(), [1, 0])
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            n_rows, n_cols = rng.randint(1, 5), rng.randint(1, 5)
+            pairs = [
+                (row, col, round(rng.random(), 2))
+                for row in range(n_rows)
+                for col in range(n_cols)
+                if rng.random() < 0.6
+            ]
+            rows, cols, scores = make_pairs(pairs)
+            min_score = rng.choice([0.0, 0.3, 0.5])
+
+            assigned = assign_pairs(rows, cols, scores, n_rows, min_score)
+
+            self.assert_one_to_one(assigned, rows, cols)
+            total = float(scores[assigned[assigned >= 0]].sum())
+            self.assertAlmostEqual(total, brute_force_total(rows, cols, scores, min_score))
+
+    def test_min_score_filters_pairs(self):
+        rows, cols, scores = make_pairs([(0, 0, 0.69), (1, 1, 0.7), (2, 2, 0.71)])
+        assigned = assign_pairs(rows, cols, scores, 3, 0.7)
+        # A pair exactly at the minimum score is kept
+        self.assertEqual(assigned.tolist(), [-1, 1, 2])
+
+    def test_min_score_does_not_displace_eligible_pairs(self):
+        # Unfiltered, rows 0 -> 1 and 1 -> 0 would total more, but row 1's pair is below the minimum
+        rows, cols, scores = make_pairs([(0, 0, 0.8), (0, 1, 0.75), (1, 0, 0.69)])
+        assigned = assign_pairs(rows, cols, scores, 2, 0.7)
+        self.assertEqual(assigned.tolist(), [0, -1])
+
+    def test_zero_scores_are_never_assigned(self):
+        rows, cols, scores = make_pairs([(0, 0, 0.0)])
+        assigned = assign_pairs(rows, cols, scores, 1, 0.0)
+        self.assertEqual(assigned.tolist(), [-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
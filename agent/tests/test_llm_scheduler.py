@@ -0,0 +1,146 @@
+"""
+Tests for the LLM request scheduler.
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import unittest
+
+from bitebase_ai.core.llm_client import LLMScheduler
+
+
+async def settle():
+    """Let pending tasks run until they block again."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class LLMSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for LLMScheduler admission, lanes and token accounting."""
+
+    def scheduler(self, **config) -> LLMScheduler:
+        """Create a scheduler without a token budget unless one is given."""
+        return LLMScheduler({"max_in_flight": 1, "interactive_reserved": 0, "tokens_per_minute": 0, **config})
+
+    async def test_interactive_lane_goes_first(self):
+        scheduler = self.scheduler()
+        held = await scheduler.acquire("openai", "background")
+
+        admitted = []
+
+        async def request(lane: str):
+            reservation = await scheduler.acquire("openai", lane)
+            admitted.append(lane)
+            return reservation
+
+        # The background request queues before the interactive one
+        background = asyncio.create_task(request("background"))
+        await settle()
+        interactive = asyncio.create_task(request("interactive"))
+        await settle()
+        self.assertEqual(admitted, [])
+
+        scheduler.release(held)
+        scheduler.release(await asyncio.wait_for(interactive, timeout=1))
+        scheduler.release(await asyncio.wait_for(background, timeout=1))
+        self.assertEqual(admitted, ["interactive", "background"])
+
+    async def test_background_waits_behind_queued_interactive(self):
+        scheduler = self.scheduler(max_in_flight=2)
+        first = await scheduler.acquire("openai", "interactive")
+        second = await scheduler.acquire("openai", "interactive")
+
+        interactive = asyncio.create_task(scheduler.acquire("openai", "interactive"))
+        await settle()
+        background = asyncio.create_task(scheduler.acquire("openai", "background"))
+        await settle()
+
+        # One slot frees up: the queued interactive request takes it
+        scheduler.release(first)
+        await settle()
+        self.assertTrue(interactive.done())
+        self.assertFalse(background.done())
+
+        scheduler.release(second)
+        scheduler.release(await asyncio.wait_for(interactive, timeout=1))
+        scheduler.release(await asyncio.wait_for(background, timeout=1))
+
+    async def test_reserved_slots_are_interactive_only(self):
+        scheduler = self.scheduler(max_in_flight=2, interactive_reserved=1)
+        background = await scheduler.acquire("openai", "background")
+
+        # The remaining slot is reserved, so another background request waits
+        waiting = asyncio.create_task(scheduler.acquire("openai", "background"))
+        await settle()
+        self.assertFalse(waiting.done())
+
+        # while an interactive request is admitted straight away
+        interactive = await asyncio.wait_for(scheduler.acquire("openai", "interactive"), timeout=1)
+        self.assertEqual(scheduler.get_stats()["providers"]["openai"]["in_flight"], 2)
+
+        scheduler.release(interactive)
+        await settle()
+        self.assertFalse(waiting.done())
+
+        scheduler.release(background)
+        scheduler.release(await asyncio.wait_for(waiting, timeout=1))
+
+    async def test_unused_tokens_are_refunded(self):
+        scheduler = self.scheduler(tokens_per_minute=1000)
+        reservation = await scheduler.acquire("openai", "interactive", tokens=800)
+        self.assertLess(scheduler.get_stats()["providers"]["openai"]["tokens_available"], 210)
+
+        reservation.used_tokens = 200
+        scheduler.release(reservation)
+
+        tokens_available = scheduler.get_stats()["providers"]["openai"]["tokens_available"]
+        self.assertGreaterEqual(tokens_available, 800)
+        self.assertLess(tokens_available, 810)
+
+    async def test_oversized_request_is_capped_to_budget(self):
+        scheduler = self.scheduler(tokens_per_minute=1000)
+        reservation = await asyncio.wait_for(scheduler.acquire("openai", "interactive", tokens=5000), timeout=1)
+        self.assertEqual(reservation.tokens, 1000)
+        scheduler.release(reservation)
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        scheduler = self.scheduler()
+        held = await scheduler.acquire("openai", "interactive")
+
+        waiting = asyncio.create_task(scheduler.acquire("openai", "background"))
+        await settle()
+        self.assertEqual(scheduler.get_stats()["lanes"]["background"]["queue_depth"], 1)
+
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await asyncio.wait_for(waiting, timeout=1)
+        self.assertEqual(scheduler.get_stats()["lanes"]["background"]["queue_depth"], 0)
+
+        # The freed slot goes to the next request rather than the cancelled one
+        scheduler.release(held)
+        reservation = await asyncio.wait_for(scheduler.acquire("openai", "background"), timeout=1)
+        self.assertEqual(scheduler.get_stats()["providers"]["openai"]["in_flight"], 1)
+        scheduler.release(reservation)
+
+    async def test_waiter_cancelled_after_admission_releases_slot(self):
+        scheduler = self.scheduler()
+        held = await scheduler.acquire("openai", "interactive")
+
+        waiting = asyncio.create_task(scheduler.acquire("openai", "interactive"))
+        await settle()
+
+        # Admit the waiter, then cancel it before it resumes
+        scheduler.release(held)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await asyncio.wait_for(waiting, timeout=1)
+        self.assertEqual(scheduler.get_stats()["providers"]["openai"]["in_flight"], 0)
+
+    async def test_unknown_lane(self):
+        with self.assertRaises(ValueError):
+            await self.scheduler().acquire("openai", "batch")
+
+
+if __name__ == "__main__":
+    unittest.main()